@@ -0,0 +1,82 @@
+"""Add contact full-text search
+
+Revision ID: 5c1e0f9a7b21
+Revises: 890219d70e96
+Create Date: 2026-10-19 15:40:12.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e0f9a7b21'
+down_revision: Union[str, None] = '890219d70e96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.models.CONTACTS_FTS_DDL at this revision (migrations must not change with the app)
+FTS_COLUMNS = "name, role, category, phone, phone_digits"
+
+def _fold(column: str) -> str:
+    """lower() + æ/ø/å -> ae/oe/aa, both cases (SQLite's lower() only folds ASCII)."""
+    expression = f"lower({column})"
+    for letter, replacement in (("æ", "ae"), ("ø", "oe"), ("å", "aa")):
+        expression = f"replace(replace({expression}, '{letter.upper()}', '{replacement}'), '{letter}', '{replacement}')"
+    return expression
+
+def _values(row: str) -> str:
+    return f"{row}.id, {_fold(row + '.name')}, {_fold(row + '.role')}, {_fold(row + '.category')}, {row}.phone, {row}.phone_digits"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('contacts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('phone_digits', sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_contacts_phone_digits'), ['phone_digits'], unique=False)
+
+    # Backfill the digits-only phone numbers
+    bind = op.get_bind()
+    contacts = sa.table('contacts', sa.column('id', sa.Integer), sa.column('phone', sa.String), sa.column('phone_digits', sa.String))
+    for contact_id, phone in bind.execute(sa.select(contacts.c.id, contacts.c.phone)).all():
+        digits = "".join(ch for ch in phone if ch.isdigit()) if phone else ""
+        # Without the Danish country code, as app.utils.phone_digits
+        if phone and phone.lstrip().startswith("+45"):
+            digits = digits[2:]
+        elif digits.startswith("0045"):
+            digits = digits[4:]
+        bind.execute(contacts.update().where(contacts.c.id == contact_id).values(phone_digits=digits))
+
+    if bind.dialect.name != 'sqlite':
+        return # Other databases search with ILIKE (see crud.get_all_contacts)
+
+    op.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        {FTS_COLUMNS}, tokenize = "unicode61 remove_diacritics 2")""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts (rowid, {FTS_COLUMNS}) VALUES ({_values("new")});
+    END""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+        DELETE FROM contacts_fts WHERE rowid = old.id;
+        INSERT INTO contacts_fts (rowid, {FTS_COLUMNS}) VALUES ({_values("new")});
+    END""")
+    op.execute("""CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+        DELETE FROM contacts_fts WHERE rowid = old.id;
+    END""")
+    # Index the existing contacts
+    op.execute("DELETE FROM contacts_fts")
+    op.execute(f"INSERT INTO contacts_fts (rowid, {FTS_COLUMNS}) SELECT {_values('contacts')} FROM contacts")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS contacts_fts_insert")
+        op.execute("DROP TRIGGER IF EXISTS contacts_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS contacts_fts_delete")
+        op.execute("DROP TABLE IF EXISTS contacts_fts")
+
+    with op.batch_alter_table('contacts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_contacts_phone_digits'))
+        batch_op.drop_column('phone_digits')
@@ -0,0 +1,97 @@
+"""Add change log
+
+Revision ID: b7e4c1d9f062
+Revises: a3f9d2c4e8b1
+Create Date: 2026-10-19 17:12:30.845210
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c1d9f062'
+down_revision: Union[str, None] = 'a3f9d2c4e8b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of the key/data layout in app/change_log.py at this revision
+ARTIST_FIELDS = ('title', 'nationality', 'image_url', 'spotify_link')
+ASSESSMENT_FIELDS = ('risk_level', 'intensity_level', 'density_level', 'remarks', 'crowd_profile', 'notes')
+CONTACT_FIELDS = ('category', 'role', 'name', 'phone', 'channel', 'notes', 'sort_order')
+
+
+def _snapshot(connection, now):
+    """The current artists, events, assessments and active contacts as change-log upserts."""
+    def rows(sql, **types):
+        # Typed columns, so DateTime values come back as datetimes on SQLite too
+        return connection.execute(sa.text(sql).columns(**types)).mappings().all()
+
+    def iso(value):
+        return value.isoformat() if value else None
+
+    entries = []
+    for row in rows(f"SELECT slug, {', '.join(ARTIST_FIELDS)} FROM artists ORDER BY id"):
+        entries.append(('artist', row['slug'], {f: row[f] for f in ARTIST_FIELDS}))
+    for row in rows("SELECT e.artist_slug, s.name AS stage, e.start_time, e.end_time FROM events e "
+                    "JOIN stages s ON s.id = e.stage_id ORDER BY e.start_time, e.event_id",
+                    start_time=sa.DateTime(), end_time=sa.DateTime()):
+        start = iso(row['start_time'])
+        entries.append(('event', f"{row['artist_slug']}|{start}", {
+            'artist_slug': row['artist_slug'], 'stage': row['stage'], 'start_time': start, 'end_time': iso(row['end_time']),
+        }))
+    for row in rows(f"SELECT artist_slug, {', '.join(ASSESSMENT_FIELDS)} FROM risk_assessments ORDER BY id"):
+        entries.append(('assessment', row['artist_slug'], {f: row[f] for f in ASSESSMENT_FIELDS}))
+    for row in rows(f"SELECT id, {', '.join(CONTACT_FIELDS)} FROM contacts WHERE is_active ORDER BY id"):
+        entries.append(('contact', str(row['id']), {f: row[f] for f in CONTACT_FIELDS}))
+    return [
+        {'entity': entity, 'key': key, 'operation': 'upsert', 'data': data, 'changed_at': now}
+        for entity, key, data in entries
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    change_log = op.create_table('change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('operation', sa.String(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.create_index('ix_change_log_entity_id', ['entity', 'id'], unique=False)
+        batch_op.create_index('ix_change_log_entity_key_id', ['entity', 'key', 'id'], unique=False)
+
+    op.create_table('change_log_compactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('compacted_through', sa.Integer(), nullable=False),
+    sa.Column('removed', sa.Integer(), nullable=False),
+    sa.Column('compacted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('change_log_compactions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_change_log_compactions_compacted_through'), ['compacted_through'], unique=False)
+
+    # Start the log with a snapshot of the existing data, so a client reading from version 0 gets everything
+    entries = _snapshot(op.get_bind(), datetime.utcnow())
+    if entries:
+        op.bulk_insert(change_log, entries)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('change_log_compactions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_change_log_compactions_compacted_through'))
+
+    op.drop_table('change_log_compactions')
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_change_log_entity_key_id')
+        batch_op.drop_index('ix_change_log_entity_id')
+
+    op.drop_table('change_log')
@@ -0,0 +1,45 @@
+"""Restrict deleting an artist that has a risk assessment
+
+Revision ID: f4b9d6e2a815
+Revises: e8a3c5f1b274
+Create Date: 2026-10-19 23:12:08.441927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b9d6e2a815'
+down_revision: Union[str, None] = 'e8a3c5f1b274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema using batch mode for SQLite compatibility."""
+    # Assessments can't be re-synced, so a sync must not take them with a removed artist
+    with op.batch_alter_table('risk_assessments', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_risk_assessments_artist_slug_artists_cascade', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'fk_risk_assessments_artist_slug_artists_restrict',
+            'artists',
+            ['artist_slug'],
+            ['slug'],
+            ondelete='RESTRICT'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema using batch mode for SQLite compatibility."""
+    with op.batch_alter_table('risk_assessments', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_risk_assessments_artist_slug_artists_restrict', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'fk_risk_assessments_artist_slug_artists_cascade',
+            'artists',
+            ['artist_slug'],
+            ['slug'],
+            ondelete='CASCADE'
+        )
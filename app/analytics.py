@@ -0,0 +1,188 @@
+"""
+Crowd-load and risk heatmap for a festival day (the `/analytics` page).
+
+The day's sets and their RiskAssessment levels are turned into NumPy arrays over 15-minute slots x
+stages (festival day 06:00-05:59, trimmed to the slots that have sets):
+  - every set adds its scores to the slots it covers on its stage (a difference array + cumsum,
+    so building the grid is O(sets + slots x stages) with no Python loop over slots),
+  - load = capacity weight x (risk + intensity + density) / 3, with low/medium/high = 1/2/3 and
+    the capacity weight = stage capacity / median capacity of the stages that have one (1.0 for
+    stages without a capacity),
+  - peak windows are the highest rolling sums of the total load over PEAK_WINDOW_SLOTS, picked
+    greedily so they don't overlap.
+
+Results are cached per (festival day, data version); the version covers the synced data, the
+assessments and the stage capacities, so a new assessment or capacity shows up on the next request.
+NumPy is imported with this module, which `app.main` only loads on the first /analytics request.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import String, select, func
+from sqlalchemy.orm import Session
+
+from . import crud, models
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FESTIVAL_DAY_START_HOUR = 6 # Festival day 06:00-05:59, as in crud.get_events_for_festival_day
+DEFAULT_SET_LENGTH = timedelta(hours=1) # Same assumption as the calendar for sets without an end time
+LEVEL_SCORES = {'low': 1.0, 'medium': 2.0, 'high': 3.0} # Unassessed levels score 0
+PEAK_WINDOW_SLOTS = 4 # One hour
+MAX_PEAK_WINDOWS = 5
+CACHE_SIZE = 16 # (day, version) entries
+
+events = models.Event.__table__
+stages = models.Stage.__table__
+assessments = models.RiskAssessment.__table__
+artists = models.Artist.__table__
+
+# "<stage id>:<capacity>" per stage, in id order: any change to any stage's capacity changes the
+# concatenation (a sum or count wouldn't see capacities swapped or moved between stages)
+stage_capacities = (
+    select((stages.c.id.cast(String) + ":" + func.coalesce(stages.c.capacity.cast(String), "")).label("capacity"))
+    .order_by(stages.c.id)
+    .subquery()
+)
+
+def get_analytics_version(db: Session) -> Tuple[Any, ...]:
+    """crud.get_data_version plus the assessments and stage capacities the scores depend on (one statement)."""
+    return tuple(db.execute(select(
+        *crud.data_version_columns(),
+        select(func.count()).select_from(assessments).scalar_subquery(),
+        select(func.max(assessments.c.updated_at)).scalar_subquery(),
+        select(func.group_concat(stage_capacities.c.capacity, ",")).scalar_subquery(),
+    )).one())
+
+def _load_day(db: Session, day_start: datetime) -> List[Any]:
+    """The festival day's sets with stage, capacity and assessment levels (one projection query)."""
+    return db.execute(
+        select(events.c.start_time, events.c.end_time, events.c.artist_slug, artists.c.title,
+               stages.c.name.label("stage_name"), stages.c.capacity,
+               assessments.c.risk_level, assessments.c.intensity_level, assessments.c.density_level)
+        .select_from(
+            events
+            .join(stages, stages.c.id == events.c.stage_id)
+            .outerjoin(artists, artists.c.slug == events.c.artist_slug)
+            .outerjoin(assessments, assessments.c.artist_slug == events.c.artist_slug)
+        )
+        .where(events.c.start_time >= day_start, events.c.start_time < day_start + timedelta(days=1),
+               stages.c.name != 'TBA')
+        .order_by(events.c.start_time)
+    ).all()
+
+def _slot_grid(starts: np.ndarray, ends: np.ndarray, stage_index: np.ndarray, values: np.ndarray,
+               num_stages: int) -> np.ndarray:
+    """Sums `values` over the slots each set covers: a (slots x stages) array."""
+    diff = np.zeros((SLOTS_PER_DAY + 1, num_stages))
+    np.add.at(diff, (starts, stage_index), values)
+    np.add.at(diff, (ends, stage_index), -values)
+    return np.cumsum(diff[:-1], axis=0)
+
+def _peak_windows(total: np.ndarray, window: int, count: int) -> List[Tuple[int, float]]:
+    """(first slot, load) of the `count` highest non-overlapping rolling sums of `window` slots."""
+    if len(total) == 0:
+        return []
+    window = min(window, len(total))
+    sums = np.convolve(total, np.ones(window), mode="valid")
+    peaks = []
+    taken = np.zeros(len(sums), dtype=bool)
+    for start in np.argsort(-sums, kind="stable"):
+        if sums[start] <= 0 or len(peaks) == count:
+            break
+        if taken[start]:
+            continue
+        peaks.append((int(start), float(sums[start])))
+        taken[max(0, start - window + 1):start + window] = True # No other window may overlap this one
+    return peaks
+
+def compute_day(db: Session, festival_day: date) -> Dict[str, Any]:
+    """Builds the heatmap and peak windows for one festival day."""
+    day_start = datetime.combine(festival_day, datetime.min.time()).replace(hour=FESTIVAL_DAY_START_HOUR)
+    rows = _load_day(db, day_start)
+    stage_names = sorted({row.stage_name for row in rows})
+    result: Dict[str, Any] = {
+        "date": festival_day, "stages": [], "slots": [], "load": [], "total": [], "high_acts": [],
+        "max_load": 0.0, "peaks": [], "unassessed_sets": 0,
+    }
+    if not rows:
+        return result
+
+    # --- Per-set arrays ---
+    stage_position = {name: i for i, name in enumerate(stage_names)}
+    stage_index = np.array([stage_position[row.stage_name] for row in rows])
+    start_minutes = np.array([(row.start_time - day_start).total_seconds() / 60 for row in rows])
+    end_minutes = np.array([((row.end_time or row.start_time + DEFAULT_SET_LENGTH) - day_start).total_seconds() / 60
+                            for row in rows])
+    starts = np.clip(np.floor(start_minutes / SLOT_MINUTES).astype(int), 0, SLOTS_PER_DAY - 1)
+    ends = np.clip(np.ceil(end_minutes / SLOT_MINUTES).astype(int), starts + 1, SLOTS_PER_DAY)
+    risk = np.array([LEVEL_SCORES.get(row.risk_level, 0.0) for row in rows])
+    intensity = np.array([LEVEL_SCORES.get(row.intensity_level, 0.0) for row in rows])
+    density = np.array([LEVEL_SCORES.get(row.density_level, 0.0) for row in rows])
+
+    # --- Capacity weights per stage ---
+    capacities = {row.stage_name: row.capacity for row in rows}
+    known = np.array([c for c in capacities.values() if c], dtype=float)
+    median_capacity = float(np.median(known)) if len(known) else None
+    stage_weights = np.array([
+        capacities[name] / median_capacity if capacities[name] and median_capacity else 1.0 for name in stage_names
+    ])
+
+    # --- Grids (slots x stages) ---
+    num_stages = len(stage_names)
+    load = _slot_grid(starts, ends, stage_index, (risk + intensity + density) / 3, num_stages) * stage_weights
+    high = (risk == 3) | (intensity == 3) | (density == 3)
+    high_acts = _slot_grid(starts, ends, stage_index, high.astype(float), num_stages).sum(axis=1)
+
+    # Trim to the slots with sets
+    first_slot, last_slot = int(starts.min()), int(ends.max())
+    load = load[first_slot:last_slot]
+    high_acts = high_acts[first_slot:last_slot]
+    total = load.sum(axis=1)
+
+    slot_times = [day_start + timedelta(minutes=SLOT_MINUTES * (first_slot + i)) for i in range(last_slot - first_slot)]
+    peaks = []
+    for start, window_load in _peak_windows(total, PEAK_WINDOW_SLOTS, MAX_PEAK_WINDOWS):
+        end = min(start + PEAK_WINDOW_SLOTS, len(total))
+        stage_loads = load[start:end].sum(axis=0)
+        peaks.append({
+            "start": slot_times[start],
+            "end": slot_times[end - 1] + timedelta(minutes=SLOT_MINUTES),
+            "load": round(window_load, 2),
+            "max_high_acts": int(high_acts[start:end].max()),
+            "stages": [stage_names[i] for i in np.argsort(-stage_loads, kind="stable") if stage_loads[i] > 0][:3],
+        })
+
+    result.update({
+        "stages": [{"name": name, "capacity": capacities[name], "weight": round(float(w), 2)}
+                   for name, w in zip(stage_names, stage_weights)],
+        "slots": slot_times,
+        "load": np.round(load, 2).tolist(),
+        "total": np.round(total, 2).tolist(),
+        "high_acts": high_acts.astype(int).tolist(),
+        "max_load": float(load.max()) if load.size else 0.0,
+        "peaks": peaks,
+        "unassessed_sets": int(np.count_nonzero((risk == 0) & (intensity == 0) & (density == 0))),
+    })
+    return result
+
+# --- Cache ---
+_cache: "OrderedDict[Tuple[date, Tuple[Any, ...]], Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def get_day(db: Session, festival_day: date) -> Dict[str, Any]:
+    """compute_day, cached per (festival day, analytics version)."""
+    key = (festival_day, get_analytics_version(db))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    result = compute_day(db, festival_day)
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
@@ -0,0 +1,115 @@
+"""
+Fuzzy artist search (`GET /api/artists/search`) over an in-memory character-trigram index.
+
+Titles and slugs are normalised (lowercase, æ/ø/å -> ae/oe/aa, other accents stripped), split into
+words and each word padded as "  word " before taking its trigrams, as pg_trgm does. A query is
+scored against every artist sharing at least one trigram with it:
+  - similarity: the share of the query's trigrams found in the artist (tolerates typos and
+    unfinished words: "beyonse" and "beyo" both find "Beyoncé"),
+  - the Jaccard overlap of the two trigram sets breaks ties, so closer-length names rank first.
+
+The overview's name filter (`?q=`) uses `matching_slugs()`: every artist whose normalised title
+contains the query, plus the fuzzy matches above.
+
+The index is rebuilt when the artist set changes: `invalidate()` is called after `run_sync`
+commits, and `get_index()` compares `crud.get_data_version` with the version it was built from.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .utils import fold_danish
+from .versioned_cache import VersionedCache
+
+DEFAULT_RESULTS = 10
+MAX_RESULTS = 50
+MIN_SIMILARITY = 0.5 # Share of the query's trigrams an artist must contain
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+artists = models.Artist.__table__
+
+def normalize(text: str) -> str:
+    """Lowercase, Danish letters transliterated, accents removed, words separated by single spaces."""
+    text = unicodedata.normalize("NFKD", fold_danish(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(WORD_PATTERN.findall(text))
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of every word of an already normalised text ("mø" -> "moe" -> {"  m", " mo", "moe", "oe "})."""
+    result = set()
+    for word in text.split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+class ArtistSearchIndex:
+    """Trigram -> artist positions, plus the trigram count of every artist."""
+
+    def __init__(self, rows: List[Any], version: Tuple[Any, ...]):
+        self.version = version
+        self.items: List[Dict[str, Any]] = []
+        self.trigram_counts: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.normalized_titles: List[str] = []
+        for position, row in enumerate(rows):
+            self.items.append({"slug": row.slug, "title": row.title, "image_url": row.image_url})
+            normalized_title = normalize(row.title or "")
+            self.normalized_titles.append(normalized_title)
+            artist_trigrams = trigrams(normalized_title) | trigrams(normalize(row.slug.replace("-", " ")))
+            self.trigram_counts.append(len(artist_trigrams))
+            for trigram in artist_trigrams:
+                self.postings.setdefault(trigram, []).append(position)
+
+    def search(self, query: str, limit: int = DEFAULT_RESULTS) -> List[Dict[str, Any]]:
+        """Artists similar to `query`, most similar first, each with its similarity score."""
+        query_trigrams = trigrams(normalize(query))
+        if not query_trigrams:
+            return []
+        shared: Dict[int, int] = {}
+        for trigram in query_trigrams:
+            for position in self.postings.get(trigram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        scored = []
+        for position, count in shared.items():
+            similarity = count / len(query_trigrams)
+            if similarity < MIN_SIMILARITY:
+                continue
+            jaccard = count / (len(query_trigrams) + self.trigram_counts[position] - count)
+            scored.append((-similarity, -jaccard, position))
+        scored.sort()
+        return [dict(self.items[position], score=round(-similarity, 3)) for similarity, _, position in scored[:limit]]
+
+    def matching_slugs(self, query: str) -> FrozenSet[str]:
+        """Slugs of every artist whose title contains `query` (normalised) or is similar to it."""
+        normalized_query = normalize(query)
+        if not normalized_query:
+            return frozenset()
+        slugs = {self.items[position]["slug"] for position, title in enumerate(self.normalized_titles)
+                 if normalized_query in title}
+        slugs.update(item["slug"] for item in self.search(query, limit=MAX_RESULTS))
+        return frozenset(slugs)
+
+def build_index(db: Session, version: Optional[Tuple[Any, ...]] = None) -> ArtistSearchIndex:
+    """Loads slug/title/image of every artist (by title, like the overview) and builds a fresh index."""
+    if version is None:
+        version = crud.get_data_version(db)
+    rows = db.execute(
+        select(artists.c.slug, artists.c.title, artists.c.image_url).order_by(artists.c.title, artists.c.id)
+    ).all()
+    return ArtistSearchIndex(rows, version)
+
+_cache: VersionedCache[ArtistSearchIndex] = VersionedCache(build_index, crud.get_data_version)
+
+def get_index(db: Session) -> ArtistSearchIndex:
+    """Returns the current index, rebuilding it if the artists changed since it was built."""
+    return _cache.get(db)
+
+def invalidate() -> None:
+    """Drops the index; the next search rebuilds it."""
+    _cache.invalidate()
@@ -1,10 +1,10 @@
 from fastapi import Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
 from typing import Optional
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 
@@ -28,7 +28,11 @@ if not SECRET_KEY:
     raise EnvironmentError("SECRET_KEY not found in environment variables. Please set it in .env")
 
 # --- Password Hashing --- 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Only logins and user seeding hash passwords, so passlib is loaded on first use rather than at startup
+@lru_cache(maxsize=1)
+def _pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Pydantic model for data within the JWT token
 class TokenData(BaseModel):
@@ -41,11 +45,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token") # Adjust tokenUrl if need
 
 # --- Password Verification --- 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 # --- Password Hashing --- 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 # --- User Authentication --- 
 def authenticate_user(db: Session, username: str, password: str) -> Optional[models.User]:
@@ -0,0 +1,177 @@
+"""
+Append-only change log behind the incremental change feed (`GET /api/changes?since=`).
+
+Every change to the data the app serves adds one `change_log` row in the same transaction as the
+change itself: `sync_database` (artists and events that actually changed), `upsert_assessment(s)`
+and the contact CRUD functions. A row holds the entity ("artist", "event", "assessment",
+"contact"), its key, the operation ("upsert" or "delete"), the new values in compact form and a
+timestamp. The row id is the version: a client stores the last version it has seen and asks for
+the changes after it.
+
+Keys and data per entity:
+  - artist: slug; title, nationality, image_url, spotify_link (descriptions are left out)
+  - event: "<artist_slug>|<start time>" (a sync recreates the event rows, so their ids aren't
+    stable); artist_slug, stage, start_time, end_time
+  - assessment: artist slug; the levels and texts
+  - contact: id; the contact fields (a soft-deleted contact is a "delete")
+
+Compaction keeps the log bounded: everything older than the newest CHANGE_LOG_RETAIN versions is
+collapsed to the latest row per key, and deletes are dropped from that part. That older part is
+then a snapshot of the current state. A client whose `since` falls before the compacted
+version gets `reset: true` and the whole log from the start. It should drop its local copy
+and apply the changes from there. When that takes more than one page, each page carries
+`reset_through`, which the client passes back with the next `since` to continue the same reset
+(without it, a `since` inside the compacted part would reset again on every page).
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, insert, func, and_, exists
+from sqlalchemy.orm import Session, aliased
+
+from . import models
+
+CHANGE_LOG_RETAIN = 10000 # Newest versions kept exactly; older ones are compacted
+DEFAULT_CHANGES = 500
+MAX_CHANGES = 5000
+
+ARTIST_FIELDS = ('title', 'nationality', 'image_url', 'spotify_link')
+ASSESSMENT_FIELDS = ('risk_level', 'intensity_level', 'density_level', 'remarks', 'crowd_profile', 'notes')
+CONTACT_FIELDS = ('category', 'role', 'name', 'phone', 'channel', 'notes', 'sort_order')
+
+change_log = models.ChangeLog.__table__
+compactions = models.ChangeLogCompaction.__table__
+
+# --- Keys and compact data ---
+
+def event_key(artist_slug: str, start_time: datetime) -> str:
+    return f"{artist_slug}|{start_time.isoformat()}"
+
+def event_data(artist_slug: str, stage_name: Optional[str], start_time: datetime, end_time: Optional[datetime]) -> Dict[str, Any]:
+    return {
+        'artist_slug': artist_slug,
+        'stage': stage_name,
+        'start_time': start_time.isoformat(),
+        'end_time': end_time.isoformat() if end_time else None,
+    }
+
+def fields_data(obj: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    """The given attributes of an ORM object or row (or keys of a dict) as a JSON-ready dict."""
+    get = obj.get if isinstance(obj, dict) else lambda field: getattr(obj, field)
+    return {field: get(field) for field in fields}
+
+# --- Writing ---
+
+def record(db: Session, entity: str, key: Any, operation: str = 'upsert', data: Optional[Dict[str, Any]] = None) -> None:
+    """Adds one change to the current transaction (not committed here)."""
+    record_many(db, [(entity, key, operation, data)])
+
+def record_many(db: Session, changes: List[Tuple[str, Any, str, Optional[Dict[str, Any]]]]) -> None:
+    """Adds (entity, key, operation, data) changes, in order, with one multi-row INSERT (not committed here)."""
+    if not changes:
+        return
+    now = datetime.utcnow()
+    db.execute(insert(models.ChangeLog), [
+        {'entity': entity, 'key': str(key), 'operation': operation, 'data': data, 'changed_at': now}
+        for entity, key, operation, data in changes
+    ])
+
+def record_snapshot(db: Session, entities: Iterable[str] = ('artist', 'event', 'assessment', 'contact')) -> int:
+    """
+    Logs the current rows of `entities` as upserts, for data written without the log (bulk loads).
+    Returns the number of rows logged. Not committed here.
+    """
+    changes: List[Tuple[str, Any, str, Optional[Dict[str, Any]]]] = []
+    if 'artist' in entities:
+        for row in db.execute(select(models.Artist.slug, *[getattr(models.Artist, f) for f in ARTIST_FIELDS]).order_by(models.Artist.id)):
+            changes.append(('artist', row.slug, 'upsert', fields_data(row, ARTIST_FIELDS)))
+    if 'event' in entities:
+        for row in db.execute(
+            select(models.Event.artist_slug, models.Stage.name, models.Event.start_time, models.Event.end_time)
+            .join(models.Stage, models.Stage.id == models.Event.stage_id)
+            .order_by(models.Event.start_time, models.Event.event_id)
+        ):
+            changes.append(('event', event_key(row.artist_slug, row.start_time), 'upsert', event_data(*row)))
+    if 'assessment' in entities:
+        for row in db.execute(select(models.RiskAssessment).order_by(models.RiskAssessment.id)).scalars():
+            changes.append(('assessment', row.artist_slug, 'upsert', fields_data(row, ASSESSMENT_FIELDS)))
+    if 'contact' in entities:
+        for row in db.execute(select(models.Contact).where(models.Contact.is_active == True).order_by(models.Contact.id)).scalars():
+            changes.append(('contact', row.id, 'upsert', fields_data(row, CONTACT_FIELDS)))
+    record_many(db, changes)
+    return len(changes)
+
+# --- Reading ---
+
+def head(db: Session) -> int:
+    """The newest version (0 for an empty log). Changes with any data the pages show."""
+    return db.execute(select(func.coalesce(func.max(change_log.c.id), 0))).scalar_one()
+
+def compacted_through(db: Session) -> int:
+    """The newest version that has been compacted (0 if the log was never compacted)."""
+    return db.execute(select(func.coalesce(func.max(compactions.c.compacted_through), 0))).scalar_one()
+
+def get_changes(db: Session, since: int = 0, limit: int = DEFAULT_CHANGES, reset_through: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The changes after version `since`, oldest first, at most `limit`. If `since` is before the
+    compacted part of the log, the changes start from the beginning and `reset` is True.
+
+    A reset read that takes more than one page is continued with `reset_through` (returned with
+    each of its pages while the next one is still in the compacted part): with the same
+    compacted_through, the changes after `since` are returned as usual and `reset` is False. If the
+    log was compacted again in the meantime, the read starts over with a new reset.
+    """
+    horizon = compacted_through(db)
+    resumed = reset_through is not None and reset_through == horizon
+    reset = since < horizon and not resumed
+    start = 0 if reset else since
+    rows = db.execute(
+        select(change_log.c.id, change_log.c.entity, change_log.c.key, change_log.c.operation,
+               change_log.c.data, change_log.c.changed_at)
+        .where(change_log.c.id > start)
+        .order_by(change_log.c.id)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_since = rows[-1].id if rows else start
+    return {
+        "since": since,
+        "next_since": next_since,
+        "has_more": has_more,
+        "reset": reset,
+        "compacted_through": horizon,
+        # Still inside the compacted part: the next page must be read as part of this reset
+        "reset_through": horizon if (reset or resumed) and has_more and next_since < horizon else None,
+        "changes": [
+            {"version": r.id, "entity": r.entity, "key": r.key, "operation": r.operation,
+             "changed_at": r.changed_at, "data": r.data}
+            for r in rows
+        ],
+    }
+
+# --- Compaction ---
+
+def compact(db: Session, retain: int = CHANGE_LOG_RETAIN) -> int:
+    """
+    Collapses every version older than the newest `retain` to the latest row per (entity, key)
+    and drops deletes from that part. Returns the number of rows removed. Commits.
+    """
+    horizon = head(db) - retain
+    if horizon <= compacted_through(db):
+        return 0
+    newer = aliased(models.ChangeLog)
+    superseded = exists().where(and_(
+        newer.entity == models.ChangeLog.entity,
+        newer.key == models.ChangeLog.key,
+        newer.id > models.ChangeLog.id,
+    ))
+    result = db.execute(
+        delete(models.ChangeLog)
+        .where(models.ChangeLog.id <= horizon)
+        .where((models.ChangeLog.operation == 'delete') | superseded)
+        .execution_options(synchronize_session=False)
+    )
+    db.add(models.ChangeLogCompaction(compacted_through=horizon, removed=result.rowcount, compacted_at=datetime.utcnow()))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,257 @@
+"""
+Gzip compression of dynamic responses (pure ASGI middleware).
+
+The overview page (hundreds of artist cards with repeated Tailwind classes) and the calendar (the
+day's events as JSON) compress to a fraction of their size, which matters on the festival site's
+mobile connections.
+
+  - Only responses with a content type in COMPRESSIBLE_TYPES are compressed (HTML, JSON, CSS, JS,
+    text, SVG). The live-update stream (text/event-stream) is never touched, nor are responses
+    that already have a Content-Encoding (the precompressed static files) or `no-transform`.
+  - A whole body (the usual HTMLResponse/JSONResponse) below MINIMUM_SIZE is sent as is. A larger
+    one is compressed in one go, on a worker thread when it is large, and the result is kept in
+    an LRU cache keyed by the body's hash. The same rendered page (same data and role) is then
+    compressed once and served many times.
+  - A streamed body is compressed chunk by chunk with a sync flush after each one, so the browser
+    still gets the start of the page early.
+  - Partial responses (206, or any response with a Content-Range) are passed through: the range
+    refers to the uncompressed bytes.
+  - A strong ETag of a compressed response is made weak (W/"..."), so the gzip and identity
+    representations don't share a strong validator. Routes that compare If-None-Match themselves
+    use `etag_matches()`, which accepts the weak form.
+
+`get_metrics()` (`GET /api/compression-stats`, admin only) reports bytes in/out, the CPU time spent
+compressing and the cache hit rate.
+"""
+import gzip
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+from .static_assets import accepts_gzip
+
+MINIMUM_SIZE = 1024 # Bytes; smaller bodies gain too little to be worth compressing
+COMPRESS_LEVEL = 6
+THREAD_SIZE = 64 * 1024 # Bodies at least this big are compressed off the event loop
+CACHE_MAX_BYTES = 16 * 1024 * 1024 # Compressed bytes kept in the LRU cache
+CACHE_MAX_BODY = 32 * 1024 * 1024 # Larger bodies are compressed but not cached
+
+COMPRESSIBLE_TYPES = {
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+}
+
+class _CompressedCache:
+    """LRU of compressed bodies by SHA-1 of the uncompressed body, bounded by total compressed size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: bytes) -> None:
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+_cache = _CompressedCache(CACHE_MAX_BYTES)
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, float] = {}
+
+def _reset_counters() -> None:
+    _metrics.update({
+        "responses_compressed": 0,
+        "responses_streamed": 0,
+        "responses_too_small": 0,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "cpu_seconds": 0.0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+    })
+
+_reset_counters()
+
+def _count(**deltas: float) -> None:
+    with _metrics_lock:
+        for name, delta in deltas.items():
+            _metrics[name] += delta
+
+def get_metrics() -> Dict[str, Any]:
+    with _metrics_lock:
+        metrics: Dict[str, Any] = dict(_metrics)
+    with _cache.lock:
+        metrics["cache_entries"] = len(_cache.entries)
+        metrics["cache_bytes"] = _cache.size
+    metrics["bytes_saved"] = metrics["bytes_in"] - metrics["bytes_out"]
+    metrics["ratio"] = round(metrics["bytes_out"] / metrics["bytes_in"], 4) if metrics["bytes_in"] else None
+    lookups = metrics["cache_hits"] + metrics["cache_misses"]
+    metrics["cache_hit_rate"] = round(metrics["cache_hits"] / lookups, 4) if lookups else None
+    metrics["cpu_seconds"] = round(metrics["cpu_seconds"], 6)
+    metrics.update({
+        "minimum_size": MINIMUM_SIZE,
+        "compress_level": COMPRESS_LEVEL,
+        "cache_max_bytes": CACHE_MAX_BYTES,
+    })
+    return metrics
+
+def reset_metrics() -> None:
+    """Zeroes the counters and empties the compressed-body cache."""
+    with _metrics_lock:
+        _reset_counters()
+    _cache.clear()
+
+def _compress(body: bytes):
+    """(compressed body, CPU seconds spent). CPU time of the calling thread, so it works on a worker thread too."""
+    started = time.thread_time()
+    compressed = gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+    return compressed, time.thread_time() - started
+
+async def compress_body(body: bytes) -> bytes:
+    """The gzip of a whole body, from the cache when the same body was compressed before."""
+    cacheable = len(body) <= CACHE_MAX_BODY
+    key = hashlib.sha1(body).digest() if cacheable else b""
+    compressed = _cache.get(key) if cacheable else None
+    if compressed is not None:
+        _count(cache_hits=1)
+        return compressed
+    if len(body) >= THREAD_SIZE:
+        compressed, cpu = await anyio.to_thread.run_sync(_compress, body)
+    else:
+        compressed, cpu = _compress(body)
+    _count(cpu_seconds=cpu, cache_misses=1 if cacheable else 0)
+    if cacheable:
+        _cache.put(key, compressed)
+    return compressed
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return (
+        content_type in COMPRESSIBLE_TYPES
+        and "content-encoding" not in headers
+        and "no-transform" not in headers.get("cache-control", "")
+    )
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag`, weakly (W/"x" matches "x"), as for GET in RFC 9110."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == opaque
+        for tag in (tag.strip() for tag in if_none_match.split(","))
+    )
+
+class GzipMiddleware:
+    """Compresses eligible responses for clients that accept gzip (see the module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        responder = _GzipResponder(send, accepts_gzip(scope))
+        await self.app(scope, receive, responder.send)
+
+class _GzipResponder:
+    """Per-response state: holds back the start message until the first body chunk decides how to send."""
+
+    def __init__(self, send, client_accepts_gzip: bool):
+        self._send = send
+        self.accepts = client_accepts_gzip
+        self.start_message: Optional[Dict[str, Any]] = None
+        self.active = None # None: undecided, False: pass through, True: compressing a stream
+        self.compressor = None
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if message["status"] in (204, 206, 304) or "content-range" in headers or not _is_compressible(headers):
+                self.active = False
+                await self._send(message)
+                return
+            MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            if not self.accepts:
+                self.active = False
+                await self._send(message)
+                return
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.active is False:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.active is None:
+            headers = MutableHeaders(scope=self.start_message)
+            if not more_body:
+                # The whole body at once
+                self.active = False
+                if len(body) < MINIMUM_SIZE:
+                    _count(responses_too_small=1)
+                    await self._send(self.start_message)
+                    await self._send(message)
+                    return
+                compressed = await compress_body(body)
+                _count(responses_compressed=1, bytes_in=len(body), bytes_out=len(compressed))
+                headers["Content-Encoding"] = "gzip"
+                headers["Content-Length"] = str(len(compressed))
+                _weaken_etag(headers)
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            # A stream: compress as it goes
+            self.active = True
+            self.compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31) # wbits 31: gzip container
+            headers["Content-Encoding"] = "gzip"
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            _weaken_etag(headers)
+            _count(responses_compressed=1, responses_streamed=1)
+            await self._send(self.start_message)
+
+        started = time.thread_time()
+        chunk = self.compressor.compress(body)
+        chunk += self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+        _count(cpu_seconds=time.thread_time() - started, bytes_in=len(body), bytes_out=len(chunk))
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
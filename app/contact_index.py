@@ -0,0 +1,119 @@
+"""
+In-memory prefix index for the contact type-ahead (`GET /api/contacts/suggest`).
+
+Every word of a contact's name, role, category and channel (folded with `utils.fold_danish`) and
+its digits-only phone number is a key in one sorted array; a query word is answered with a
+`bisect` to the first key >= the word and a scan while the keys still start with it. The contact
+list is small (hundreds of rows), so the whole index is rebuilt rather than updated in place:
+  - `invalidate()` is called by the contact writes in `app/crud.py`, and
+  - `get_index()` compares a cheap version query (row count, max id, max updated_at) with the
+    version the index was built from, so other workers pick up a write on their next request.
+"""
+import bisect
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from . import models
+from .utils import fold_danish, phone_digits
+from .versioned_cache import VersionedCache
+
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+
+# Score of a prefix hit per field; a hit on a whole word scores EXACT_WORD_BONUS more
+FIELD_WEIGHTS = {"name": 8, "phone": 8, "role": 4, "category": 2, "channel": 1}
+EXACT_WORD_BONUS = 1
+
+WORD_PATTERN = re.compile(r"\w+")
+
+contacts = models.Contact.__table__
+
+def get_contacts_version(db: Session) -> Tuple[Any, ...]:
+    """Changes whenever a contact is created, updated, soft deleted or removed."""
+    return tuple(db.execute(
+        select(func.count(), func.max(contacts.c.id), func.max(contacts.c.updated_at)).select_from(contacts)
+    ).one())
+
+class ContactIndex:
+    """Sorted (key, contact, score) arrays over the active contacts."""
+
+    def __init__(self, rows: List[Any], version: Tuple[Any, ...]):
+        self.version = version
+        # Compact JSON items, in the contact list's display order (ties in the ranking keep this order)
+        self.items: List[Dict[str, Any]] = []
+        entries: List[Tuple[str, int, str]] = []
+        for position, row in enumerate(rows):
+            item = {"id": row.id, "name": row.name, "role": row.role, "category": row.category, "phone": row.phone}
+            if row.channel:
+                item["channel"] = row.channel
+            self.items.append(item)
+            for field in ("name", "role", "category", "channel"):
+                for word in WORD_PATTERN.findall(fold_danish(getattr(row, field) or "")):
+                    entries.append((word, position, field))
+            digits = row.phone_digits or phone_digits(row.phone)
+            if digits:
+                entries.append((digits, position, "phone"))
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.postings = [(position, field) for _, position, field in entries]
+
+    def _match_word(self, word: str) -> Dict[int, int]:
+        """Best score per contact position for one query word (prefix match on the keys)."""
+        scores: Dict[int, int] = {}
+        i = bisect.bisect_left(self.keys, word)
+        while i < len(self.keys) and self.keys[i].startswith(word):
+            position, field = self.postings[i]
+            score = FIELD_WEIGHTS[field] + (EXACT_WORD_BONUS if self.keys[i] == word else 0)
+            if score > scores.get(position, 0):
+                scores[position] = score
+            i += 1
+        return scores
+
+    def search(self, query: str, limit: int = DEFAULT_SUGGESTIONS) -> List[Dict[str, Any]]:
+        """Contacts matching every word of `query` as a prefix, best matches first."""
+        words = WORD_PATTERN.findall(fold_danish(query))
+        if not words:
+            return []
+        # A query that is only a phone number ("23 46 43", "+45 2346") is looked up as one run of digits
+        if all(word.isdigit() for word in words):
+            words = [phone_digits(query)]
+            if not words[0]:
+                return []
+
+        totals: Optional[Dict[int, int]] = None
+        for word in words:
+            scores = self._match_word(word)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {position: totals[position] + score for position, score in scores.items() if position in totals}
+            if not totals:
+                return []
+
+        ranked = sorted(totals, key=lambda position: (-totals[position], position))
+        return [self.items[position] for position in ranked[:limit]]
+
+def build_index(db: Session, version: Optional[Tuple[Any, ...]] = None) -> ContactIndex:
+    """Loads the active contacts (in the contact list's order) and builds a fresh index."""
+    if version is None:
+        version = get_contacts_version(db)
+    rows = db.execute(
+        select(contacts.c.id, contacts.c.name, contacts.c.role, contacts.c.category, contacts.c.phone,
+               contacts.c.phone_digits, contacts.c.channel)
+        .where(contacts.c.is_active == True)
+        .order_by(contacts.c.sort_order, contacts.c.category, contacts.c.role, contacts.c.name)
+    ).all()
+    return ContactIndex(rows, version)
+
+_cache: VersionedCache[ContactIndex] = VersionedCache(build_index, get_contacts_version)
+
+def get_index(db: Session) -> ContactIndex:
+    """Returns the current index, rebuilding it if the contacts changed since it was built."""
+    return _cache.get(db)
+
+def invalidate() -> None:
+    """Drops the index; the next suggestion request rebuilds it."""
+    _cache.invalidate()
@@ -1,12 +1,127 @@
 from sqlalchemy.orm import Session, joinedload, contains_eager
-from sqlalchemy import select, update, delete, func
-from typing import List, Optional, Dict, Any
+from sqlalchemy import select, update, delete, func, and_, or_, literal_column, table as sql_table, column as sql_column
+from sqlalchemy.exc import IntegrityError
+from typing import Iterator, List, Optional, Dict, Any, Sequence, Tuple, Union
 from datetime import datetime, timedelta
+import base64
+import json
+import re
 
 # Import ORM models from models.py
 from . import models
 # Import Pydantic schemas from schemas.py
 from . import schemas
+from . import contact_index
+from . import change_log
+from .utils import fold_danish, phone_digits
+
+# --- Keyset Pagination & Streaming ---
+
+STREAM_BATCH_SIZE = 500 # Rows fetched per round trip when streaming a full result set (limit=None)
+
+def _stream_all(db: Session, stmt) -> Iterator[Any]:
+    """
+    Iterates over every row of `stmt`, fetching STREAM_BATCH_SIZE rows at a time (yield_per), so only
+    one batch is held in memory. Consume it before the session is closed.
+    """
+    return iter(db.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE)).scalars())
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encodes the ordering key of the last row on a page as an opaque, URL-safe cursor."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Decodes a cursor made by encode_cursor for `columns`. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor: wrong number of values")
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, column.type.python_type):
+                raise TypeError
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid cursor: bad value for {column.key}")
+        decoded.append(value)
+    return decoded
+
+def _keyset_after(columns: Sequence[Any], values: Sequence[Any]):
+    """(c1, c2, ...) > (v1, v2, ...), spelled out so it works on every dialect and uses the index on c1."""
+    clause = columns[-1] > values[-1]
+    for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+        clause = or_(column > value, and_(column == value, clause))
+    return clause
+
+def _keyset_page(db: Session, stmt, columns: Sequence[Any], limit: int, cursor: Optional[str]) -> Tuple[List[Any], Optional[str]]:
+    """
+    Returns one page of `stmt` ordered by `columns` (the last one must be unique) after `cursor`,
+    and the cursor of the next page (None on the last page).
+    """
+    if cursor:
+        stmt = stmt.where(_keyset_after(columns, decode_cursor(cursor, columns)))
+    rows = db.execute(stmt.order_by(*columns).limit(limit + 1)).scalars().all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor([getattr(last, column.key) for column in columns])
+
+# --- Generic Upsert ---
+
+def upsert(db: Session, model, rows: List[Dict[str, Any]], conflict_columns: Sequence[str],
+           update_columns: Optional[Sequence[str]] = None) -> List[Any]:
+    """
+    Inserts `rows` into `model`'s table in a single INSERT ... ON CONFLICT (conflict_columns) DO UPDATE
+    ... RETURNING statement and returns the resulting ORM objects, in row order.
+
+    On conflict only `update_columns` are overwritten (default: every column in the rows except the
+    conflict columns). All rows must have the same keys. Supports SQLite (3.35+) and PostgreSQL.
+    Does not commit.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"upsert() does not support the '{dialect}' dialect")
+
+    if not rows:
+        return []
+    if update_columns is None:
+        update_columns = [key for key in rows[0] if key not in conflict_columns]
+
+    stmt = insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(conflict_columns),
+        set_={column: stmt.excluded[column] for column in update_columns},
+    ).returning(model)
+    # populate_existing: objects already in the session get the values the database returned
+    return list(db.execute(stmt, execution_options={"populate_existing": True}).scalars())
+
+# --- Data Version ---
+
+def data_version_columns() -> List[Any]:
+    """The scalar subqueries behind get_data_version, for callers that extend the fingerprint."""
+    log = models.ChangeLog.__table__
+    return [
+        select(func.max(log.c.id)).where(log.c.entity == entity).scalar_subquery() # ix_change_log_entity_id
+        for entity in ('artist', 'event')
+    ]
+
+def get_data_version(db: Session) -> Tuple[Any, ...]:
+    """
+    A cheap fingerprint of the synced data (artists and events), used by the in-memory indexes to
+    notice a sync made by another worker: the latest change-log versions of artists and events.
+    sync_database only logs rows that actually changed, so a sync that changed nothing keeps the version.
+    """
+    return tuple(db.execute(select(*data_version_columns())).one())
 
 # --- Artist CRUD ---
 
@@ -18,11 +133,16 @@ def get_artist_by_slug(db: Session, artist_slug: str) -> Optional[models.Artist]
     """Fetches an artist by slug."""
     return db.execute(select(models.Artist).filter(models.Artist.slug == artist_slug)).scalar_one_or_none()
 
-def get_all_artists(db: Session, skip: int = 0, limit: int = 100) -> List[models.Artist]:
-    """Fetches all artists with pagination."""
-    return db.execute(
-        select(models.Artist).order_by(models.Artist.title).offset(skip).limit(limit)
-    ).scalars().all()
+def get_all_artists(db: Session, skip: int = 0, limit: Optional[int] = 100) -> Union[List[models.Artist], Iterator[models.Artist]]:
+    """Fetches all artists with pagination. limit=None returns an iterator streaming every artist."""
+    stmt = select(models.Artist).order_by(models.Artist.title, models.Artist.id)
+    if limit is None:
+        return _stream_all(db, stmt.offset(skip))
+    return db.execute(stmt.offset(skip).limit(limit)).scalars().all()
+
+def get_artists_page(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[models.Artist], Optional[str]]:
+    """Keyset-paginated artists ordered by (title, id). Returns (artists, next_cursor)."""
+    return _keyset_page(db, select(models.Artist), [models.Artist.title, models.Artist.id], limit, cursor)
 
 def create_artist(db: Session, artist: schemas.ArtistCreate) -> models.Artist:
     """Creates a new artist."""
@@ -50,7 +170,8 @@ def update_artist(db: Session, artist_slug: str, artist_update: schemas.ArtistCr
     return updated_artist
 
 def delete_artist(db: Session, artist_slug: str) -> bool:
-    """Deletes an artist by slug. Returns True if deleted, False otherwise."""
+    """Deletes an artist by slug. Returns True if deleted, False otherwise.
+    Raises IntegrityError if the artist has a risk assessment (the foreign key restricts the delete)."""
     result = db.execute(
         delete(models.Artist).where(models.Artist.slug == artist_slug)
     )
@@ -80,15 +201,22 @@ def get_all_events(db: Session, skip: int = 0, limit: int = 100) -> List[models.
         select(models.Event).order_by(models.Event.start_time).offset(skip).limit(limit)
     ).scalars().all()
 
-def get_all_events_with_artists_stages(db: Session, skip: int = 0, limit: int = 500) -> List[models.Event]:
-    """Fetches all events, eagerly loading artist and stage info."""
-    return db.execute(
+def get_all_events_with_artists_stages(db: Session, skip: int = 0, limit: Optional[int] = 500) -> Union[List[models.Event], Iterator[models.Event]]:
+    """Fetches all events, eagerly loading artist and stage info. limit=None returns an iterator streaming every event."""
+    stmt = (
         select(models.Event)
         .options(joinedload(models.Event.artist), joinedload(models.Event.stage))
-        .order_by(models.Event.start_time)
+        .order_by(models.Event.start_time, models.Event.event_id)
         .offset(skip)
-        .limit(limit) # Limit results for performance
-    ).scalars().all()
+    )
+    if limit is None:
+        return _stream_all(db, stmt)
+    return db.execute(stmt.limit(limit)).scalars().all()
+
+def get_events_page(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[models.Event], Optional[str]]:
+    """Keyset-paginated events (with artist and stage) ordered by (start_time, event_id). Returns (events, next_cursor)."""
+    stmt = select(models.Event).options(joinedload(models.Event.artist), joinedload(models.Event.stage))
+    return _keyset_page(db, stmt, [models.Event.start_time, models.Event.event_id], limit, cursor)
 
 def create_event(db: Session, event: schemas.EventCreate) -> models.Event:
     # Add validation? Check if artist_slug and stage_id exist?
@@ -154,6 +282,16 @@ def create_stage(db: Session, stage: schemas.StageCreate) -> models.Stage:
     db.refresh(db_stage)
     return db_stage
 
+def update_stage_capacity(db: Session, stage_id: int, capacity: Optional[int]) -> Optional[models.Stage]:
+    """Sets (or clears) a stage's audience capacity. Returns None if the stage doesn't exist."""
+    db_stage = db.get(models.Stage, stage_id)
+    if not db_stage:
+        return None
+    db_stage.capacity = capacity
+    db.commit()
+    db.refresh(db_stage)
+    return db_stage
+
 # --- Risk Assessment CRUD --- 
 
 def get_assessment(db: Session, artist_slug: str) -> Optional[models.RiskAssessment]:
@@ -162,54 +300,117 @@ def get_assessment(db: Session, artist_slug: str) -> Optional[models.RiskAssessm
         select(models.RiskAssessment).filter(models.RiskAssessment.artist_slug == artist_slug)
     ).scalar_one_or_none()
 
-def get_all_assessments(db: Session, skip: int = 0, limit: int = 100) -> List[models.RiskAssessment]:
-    """Fetches all risk assessments."""
-    return db.execute(
-        select(models.RiskAssessment).order_by(models.RiskAssessment.artist_slug).offset(skip).limit(limit)
-    ).scalars().all()
+def get_all_assessments(db: Session, skip: int = 0, limit: Optional[int] = 100) -> Union[List[models.RiskAssessment], Iterator[models.RiskAssessment]]:
+    """Fetches all risk assessments. limit=None returns an iterator streaming every assessment."""
+    stmt = select(models.RiskAssessment).order_by(models.RiskAssessment.artist_slug).offset(skip)
+    if limit is None:
+        return _stream_all(db, stmt)
+    return db.execute(stmt.limit(limit)).scalars().all()
 
-def get_all_assessments_with_artists(db: Session, skip: int = 0, limit: int = 500) -> List[models.RiskAssessment]:
-    """ Fetches all risk assessments, eagerly loading the associated artist. """ 
-    return db.execute(
+def get_all_assessments_with_artists(db: Session, skip: int = 0, limit: Optional[int] = 500) -> Union[List[models.RiskAssessment], Iterator[models.RiskAssessment]]:
+    """ Fetches all risk assessments, eagerly loading the associated artist. limit=None returns an iterator streaming every assessment. """ 
+    stmt = (
         select(models.RiskAssessment)
         .options(joinedload(models.RiskAssessment.artist))
         .order_by(models.RiskAssessment.artist_slug)
         .offset(skip)
-        .limit(limit)
-    ).scalars().all()
+    )
+    if limit is None:
+        return _stream_all(db, stmt)
+    return db.execute(stmt.limit(limit)).scalars().all()
+
+def get_assessments_page(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[models.RiskAssessment], Optional[str]]:
+    """Keyset-paginated risk assessments ordered by artist_slug (unique). Returns (assessments, next_cursor)."""
+    return _keyset_page(db, select(models.RiskAssessment), [models.RiskAssessment.artist_slug], limit, cursor)
     
 def get_all_risk_assessments_dict(db: Session) -> Dict[str, models.RiskAssessment]:
     """ Fetches all assessments and returns them as a dict keyed by artist_slug. """
-    assessments = get_all_assessments(db, limit=1000) # Fetch a large number
+    assessments = get_all_assessments(db, limit=None)
     return {a.artist_slug: a for a in assessments}
 
-def upsert_assessment(db: Session, artist_slug: str, assessment_data: schemas.RiskAssessmentCreate) -> models.RiskAssessment:
-    """Creates or updates a risk assessment for an artist."""
-    existing_assessment = get_assessment(db, artist_slug)
-    
-    if existing_assessment:
-        # Update existing
-        update_values = assessment_data.model_dump(exclude_unset=True) # Only update provided fields
-        update_values['updated_at'] = datetime.utcnow() # Manually update timestamp
-        
-        db.execute(
-            update(models.RiskAssessment)
-            .where(models.RiskAssessment.artist_slug == artist_slug)
-            .values(**update_values)
-        )
+def upsert_assessment(db: Session, artist_slug: str, assessment_data: schemas.RiskAssessmentCreate) -> Optional[models.RiskAssessment]:
+    """
+    Creates or updates the risk assessment for an artist with a single INSERT ... ON CONFLICT ... RETURNING.
+    A new assessment gets all fields; an existing one only has the fields set in `assessment_data` updated.
+    Returns None if the artist doesn't exist (rejected by the artist_slug foreign key); other
+    integrity errors are raised.
+    """
+    values = assessment_data.model_dump()
+    values['artist_slug'] = artist_slug
+    values['updated_at'] = datetime.utcnow() # Manually update timestamp
+    update_columns = list(assessment_data.model_dump(exclude_unset=True)) + ['updated_at'] # Only update provided fields
+
+    try:
+        assessment = upsert(db, models.RiskAssessment, [values], ['artist_slug'], update_columns)[0]
+        change_log.record(db, 'assessment', artist_slug, data=change_log.fields_data(assessment, change_log.ASSESSMENT_FIELDS))
+        # Detach before committing so the returned values aren't expired (no refresh SELECT needed)
+        db.expunge(assessment)
         db.commit()
-        db.refresh(existing_assessment) # Refresh to get updated values
-        return existing_assessment
-    else:
-        # Create new
-        db_assessment = models.RiskAssessment(
-            artist_slug=artist_slug,
-            **assessment_data.model_dump()
-        )
-        db.add(db_assessment)
+    except IntegrityError as e:
+        db.rollback()
+        if not _is_foreign_key_violation(e):
+            raise
+        print(f"Could not upsert assessment for '{artist_slug}' (unknown artist): {e.orig}")
+        return None
+    return assessment
+
+def _is_foreign_key_violation(error: IntegrityError) -> bool:
+    """True if `error` is a foreign key violation (SQLite's message, PostgreSQL's SQLSTATE 23503)."""
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return sqlstate == "23503" or "FOREIGN KEY constraint failed" in str(error.orig)
+
+def upsert_assessments(db: Session, items: List[schemas.RiskAssessmentBatchItem]) -> List[Dict[str, Any]]:
+    """
+    Saves many assessments in one transaction: one SELECT to validate the artist slugs, then one
+    multi-row upsert per set of sent fields (usually just one). Same update semantics as upsert_assessment.
+    Returns one {'artist_slug', 'status', 'assessment'} dict per item, in order. Nothing is saved if
+    the statement fails.
+    """
+    slugs = {item.artist_slug for item in items}
+    existing_slugs = set(db.execute(select(models.Artist.slug).where(models.Artist.slug.in_(slugs))).scalars())
+
+    # The last item for an artist wins; a row can only be upserted once per statement
+    last_index = {item.artist_slug: index for index, item in enumerate(items)}
+    now = datetime.utcnow()
+    groups: Dict[tuple, List[Dict[str, Any]]] = {} # Sent fields -> rows
+    for index, item in enumerate(items):
+        if item.artist_slug not in existing_slugs or last_index[item.artist_slug] != index:
+            continue
+        sent_fields = tuple(sorted(item.model_dump(exclude_unset=True, exclude={'artist_slug'})))
+        values = item.model_dump()
+        values['updated_at'] = now
+        groups.setdefault(sent_fields, []).append(values)
+
+    saved: Dict[str, models.RiskAssessment] = {}
+    try:
+        for sent_fields, rows in groups.items():
+            for assessment in upsert(db, models.RiskAssessment, rows, ['artist_slug'], list(sent_fields) + ['updated_at']):
+                saved[assessment.artist_slug] = assessment
+        change_log.record_many(db, [
+            ('assessment', slug, 'upsert', change_log.fields_data(assessment, change_log.ASSESSMENT_FIELDS))
+            for slug, assessment in saved.items()
+        ])
+        for assessment in saved.values():
+            db.expunge(assessment) # Keep the returned values after commit (see upsert_assessment)
         db.commit()
-        db.refresh(db_assessment)
-        return db_assessment
+    except Exception:
+        db.rollback()
+        raise
+
+    results = []
+    for index, item in enumerate(items):
+        if item.artist_slug not in existing_slugs:
+            status = 'not_found'
+        elif last_index[item.artist_slug] != index:
+            status = 'duplicate'
+        else:
+            status = 'saved'
+        results.append({
+            'artist_slug': item.artist_slug,
+            'status': status,
+            'assessment': saved.get(item.artist_slug) if status == 'saved' else None,
+        })
+    return results
 
 # --- User CRUD --- 
 
@@ -241,23 +442,62 @@ def get_contact(db: Session, contact_id: int) -> Optional[models.Contact]:
     """Get a single contact by ID."""
     return db.get(models.Contact, contact_id)
 
+# FTS5 index over contacts (see models.CONTACTS_FTS_DDL); rowid is the contact id
+contacts_fts = sql_table("contacts_fts", sql_column("rowid"))
+# bm25 column weights in models.CONTACTS_FTS_COLUMNS order: a hit in the name counts most
+CONTACTS_FTS_WEIGHTS = (10.0, 4.0, 2.0, 1.0, 1.0)
+MIN_PHONE_SEARCH_DIGITS = 3 # Shorter digit runs would match most phone numbers
+
+def contact_match_expression(search: str) -> Optional[str]:
+    """
+    Builds an FTS5 MATCH expression for a contact search: every word must match as a prefix
+    (after Danish folding), or the search's digits must prefix-match the digits-only phone,
+    so "23464319" finds "23 46 43 19". Returns None if the search has no words.
+    """
+    terms = re.findall(r"\w+", fold_danish(search))
+    if not terms:
+        return None
+    expression = " AND ".join(f'"{term}"*' for term in terms)
+    digits = phone_digits(search)
+    if len(digits) >= MIN_PHONE_SEARCH_DIGITS:
+        expression = f'({expression}) OR phone_digits : "{digits}"*'
+    return expression
+
 def get_all_contacts(db: Session, skip: int = 0, limit: int = 1000, search: Optional[str] = None, category: Optional[str] = None) -> List[models.Contact]:
-    """Get all active contacts with optional search and category filtering."""
+    """
+    Get all active contacts with optional search and category filtering.
+    On SQLite the search uses the contacts_fts index and ranks the best matches first;
+    other databases fall back to ILIKE over the same columns.
+    """
     query = select(models.Contact).where(models.Contact.is_active == True)
+    order_by = [models.Contact.sort_order, models.Contact.category, models.Contact.role, models.Contact.name]
     
-    if search:
+    if search and db.get_bind().dialect.name == "sqlite":
+        match_expression = contact_match_expression(search)
+        if match_expression:
+            fts = literal_column("contacts_fts")
+            query = (
+                query.join(contacts_fts, contacts_fts.c.rowid == models.Contact.id)
+                .where(fts.op("MATCH")(match_expression))
+            )
+            order_by.insert(0, func.bm25(fts, *CONTACTS_FTS_WEIGHTS))
+    elif search:
         search_term = f"%{search}%"
-        query = query.where(
-            (models.Contact.name.ilike(search_term)) |
-            (models.Contact.phone.ilike(search_term)) |
-            (models.Contact.role.ilike(search_term)) |
-            (models.Contact.category.ilike(search_term))
-        )
+        conditions = [
+            models.Contact.name.ilike(search_term),
+            models.Contact.phone.ilike(search_term),
+            models.Contact.role.ilike(search_term),
+            models.Contact.category.ilike(search_term),
+        ]
+        digits = phone_digits(search)
+        if len(digits) >= MIN_PHONE_SEARCH_DIGITS:
+            conditions.append(models.Contact.phone_digits.like(f"%{digits}%"))
+        query = query.where(or_(*conditions))
     
     if category:
         query = query.where(models.Contact.category == category)
     
-    query = query.order_by(models.Contact.sort_order, models.Contact.category, models.Contact.role, models.Contact.name)
+    query = query.order_by(*order_by)
     return db.execute(query.offset(skip).limit(limit)).scalars().all()
 
 def get_contact_categories(db: Session) -> List[str]:
@@ -273,7 +513,10 @@ def create_contact(db: Session, contact: schemas.ContactCreate) -> models.Contac
     """Create a new contact."""
     db_contact = models.Contact(**contact.model_dump())
     db.add(db_contact)
+    db.flush() # Assigns the id for the change log
+    change_log.record(db, 'contact', db_contact.id, data=change_log.fields_data(db_contact, change_log.CONTACT_FIELDS))
     db.commit()
+    contact_index.invalidate()
     db.refresh(db_contact)
     return db_contact
 
@@ -288,8 +531,10 @@ def update_contact(db: Session, contact_id: int, contact_update: schemas.Contact
     
     for field, value in update_data.items():
         setattr(existing_contact, field, value)
+    change_log.record(db, 'contact', contact_id, data=change_log.fields_data(existing_contact, change_log.CONTACT_FIELDS))
     
     db.commit()
+    contact_index.invalidate()
     db.refresh(existing_contact)
     return existing_contact
 
@@ -301,7 +546,9 @@ def delete_contact(db: Session, contact_id: int) -> bool:
     
     existing_contact.is_active = False
     existing_contact.updated_at = datetime.utcnow()
+    change_log.record(db, 'contact', contact_id, 'delete')
     db.commit()
+    contact_index.invalidate()
     return True
 
 # --- Deprecated Functions (Commented out) ---
@@ -1,7 +1,8 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from .models import Base # Import the Base from models
+from . import query_log # Slow-query log hooks
 
 # Read database URL from environment variable, default to mounted path
 # The default path corresponds to the volume mount in docker-compose.yml
@@ -14,6 +15,18 @@ engine = create_engine(
     DATABASE_URL, connect_args={"check_same_thread": False}
 )
 
+# SQLite only enforces foreign keys when asked to, per connection. The assessment upsert relies on
+# the artist_slug FK to reject unknown artists, and to refuse deleting an artist that has an assessment.
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+# Time every statement and record the slow ones (see app/query_log.py)
+query_log.install(engine)
+
 # SQLAlchemy session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,143 @@
+"""
+Danish date and time formatting for the templates (the `datetimeformat` and
+`datetimeformat_festival` filters, via `utils.format_datetime`).
+
+The filters used to call `strftime` under `locale.setlocale(LC_TIME, 'da_DK.UTF-8')`, which changes
+process-wide state (not thread-safe), needs the locale to be installed in the container and printed
+English names when it wasn't. Here the Danish names come from built-in tables instead:
+
+  - `compile_format()` turns a strftime format once into a `str.format` template plus one small
+    function per directive. %a, %A, %b, %B and %h are looked up in the tables (the same names as
+    glibc's da_DK locale: lowercase) and %p is empty, as in da_DK. Compiled formats are cached.
+  - `format_datetime()` caches its results in an LRU cache keyed by (value, time zone, format,
+    festival mode), so the same event time formatted by many rows and page views is formatted once.
+    ISO strings are parsed with `datetime.fromisoformat` (dateutil only as a fallback).
+  - Festival mode: a time before FESTIVAL_DAY_START_HOUR belongs to the previous day's program, so
+    %A/%a show that day's name, capitalized ("Onsdag", "Ons") as the schedule has always shown it.
+
+No C locale is touched, so the output doesn't depend on the container's locales.
+"""
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# Indexed by datetime.weekday() / month - 1
+DAY_NAMES = ("mandag", "tirsdag", "onsdag", "torsdag", "fredag", "lørdag", "søndag")
+DAY_ABBREVIATIONS = ("man", "tir", "ons", "tor", "fre", "lør", "søn")
+MONTH_NAMES = ("januar", "februar", "marts", "april", "maj", "juni",
+               "juli", "august", "september", "oktober", "november", "december")
+MONTH_ABBREVIATIONS = ("jan", "feb", "mar", "apr", "maj", "jun", "jul", "aug", "sep", "okt", "nov", "dec")
+FESTIVAL_DAY_NAMES = tuple(name.capitalize() for name in DAY_NAMES) # "Mandag", ... (utils.get_festival_day_name)
+
+FESTIVAL_DAY_START_HOUR = 6 # Events between 00:00 and 05:59 belong to the previous day's program
+DEFAULT_FORMAT = "%a, %d %b %H:%M"
+RESULT_CACHE_SIZE = 16384 # Formatted values; a 10x festival has a few thousand event times
+
+def _day_name(dt: datetime, use_festival_day: bool) -> str:
+    if use_festival_day and dt.hour < FESTIVAL_DAY_START_HOUR:
+        return FESTIVAL_DAY_NAMES[(dt.weekday() - 1) % 7]
+    return DAY_NAMES[dt.weekday()]
+
+def _day_abbreviation(dt: datetime, use_festival_day: bool) -> str:
+    if use_festival_day and dt.hour < FESTIVAL_DAY_START_HOUR:
+        return FESTIVAL_DAY_NAMES[(dt.weekday() - 1) % 7][:3]
+    return DAY_ABBREVIATIONS[dt.weekday()]
+
+# Directive -> (replacement field, value). The names are Danish; the numbers match strftime.
+# "%-d" etc. are the glibc "no padding" variants the templates use.
+DIRECTIVES: Dict[str, Tuple[str, Optional[Callable[[datetime, bool], Any]]]] = {
+    "A": ("{}", _day_name),
+    "a": ("{}", _day_abbreviation),
+    "B": ("{}", lambda dt, _: MONTH_NAMES[dt.month - 1]),
+    "b": ("{}", lambda dt, _: MONTH_ABBREVIATIONS[dt.month - 1]),
+    "h": ("{}", lambda dt, _: MONTH_ABBREVIATIONS[dt.month - 1]),
+    "p": ("", None), # Danish uses the 24-hour clock: da_DK has no AM/PM strings
+    "d": ("{:02d}", lambda dt, _: dt.day),
+    "-d": ("{}", lambda dt, _: dt.day),
+    "e": ("{:>2}", lambda dt, _: dt.day),
+    "m": ("{:02d}", lambda dt, _: dt.month),
+    "-m": ("{}", lambda dt, _: dt.month),
+    "Y": ("{}", lambda dt, _: dt.year),
+    "y": ("{:02d}", lambda dt, _: dt.year % 100),
+    "H": ("{:02d}", lambda dt, _: dt.hour),
+    "-H": ("{}", lambda dt, _: dt.hour),
+    "M": ("{:02d}", lambda dt, _: dt.minute),
+    "-M": ("{}", lambda dt, _: dt.minute),
+    "S": ("{:02d}", lambda dt, _: dt.second),
+    "%": ("%", None),
+}
+
+@lru_cache(maxsize=256)
+def compile_format(format_str: str) -> Tuple[str, Tuple[Callable[[datetime, bool], Any], ...]]:
+    """
+    Compiles a strftime format into a `str.format` template and the functions that produce its
+    fields, e.g. "%A %H:%M" -> ("{} {:02d}:{:02d}", (day name, hour, minute)). Directives without
+    an entry in DIRECTIVES are passed to `strftime` on their own.
+    """
+    template = []
+    fields = []
+    i = 0
+    while i < len(format_str):
+        char = format_str[i]
+        if char == "%" and i + 1 < len(format_str):
+            directive = format_str[i + 1]
+            if directive == "-" and i + 2 < len(format_str):
+                directive = format_str[i + 1:i + 3]
+            i += 1 + len(directive)
+            field, value = DIRECTIVES.get(directive, ("{}", lambda dt, _, d=directive: dt.strftime("%" + d)))
+            template.append(field)
+            if value is not None:
+                fields.append(value)
+            continue
+        template.append("{{" if char == "{" else "}}" if char == "}" else char)
+        i += 1
+    return "".join(template), tuple(fields)
+
+def render(dt: datetime, format_str: str, use_festival_day: bool = False) -> str:
+    """`dt` formatted with the Danish names (uncached)."""
+    template, fields = compile_format(format_str)
+    return template.format(*[field(dt, use_festival_day) for field in fields])
+
+def parse_iso(value: str) -> Optional[datetime]:
+    """An ISO 8601 string as a datetime; None if it can't be parsed."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    from dateutil import parser # Imported on first use; fromisoformat handles the app's own strings
+    try:
+        return parser.isoparse(value)
+    except (ValueError, parser.ParserError):
+        return None
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _format_cached(value: Union[datetime, str], tz: Optional[tzinfo], format_str: str, use_festival_day: bool) -> str:
+    # `tz` is part of the key because aware datetimes in different zones can compare (and hash) equal
+    dt = value if isinstance(value, datetime) else parse_iso(value)
+    if dt is None:
+        return "N/A"
+    try:
+        return render(dt, format_str, use_festival_day)
+    except (ValueError, TypeError) as e:
+        # Handle errors during formatting (e.g., invalid format string)
+        print(f"[ERROR] Failed to format datetime '{dt}': {e}")
+        return "Invalid Date"
+
+def format_datetime(value: Union[datetime, str, None], format_str: str = DEFAULT_FORMAT, use_festival_day: bool = False) -> str:
+    """
+    Formats a datetime object or an ISO string with Danish day and month names; "N/A" for None or
+    an unparsable string.
+
+    Args:
+        value: Datetime object, ISO string, or None
+        format_str: strftime format string
+        use_festival_day: If True, adjusts day names for the festival schedule (00:00-05:59 = previous day)
+    """
+    if isinstance(value, datetime):
+        return _format_cached(value, value.tzinfo, format_str, use_festival_day)
+    if isinstance(value, str):
+        return _format_cached(value, None, format_str, use_festival_day)
+    return "N/A"
+
+def clear_cache() -> None:
+    _format_cached.cache_clear()
@@ -0,0 +1,229 @@
+"""
+Artist image proxy: `/img/{slug}/{size}` serves resized copies of the artists' images.
+
+The artist cards and schedule rows used to hot-link `artist.image_url` from the Smukfest CDN at
+full resolution and scale it down to 40x40 or 192px in the browser. Here every upstream image is
+fetched once, stored on disk under IMAGE_CACHE_DIR (data/images by default) and resized to the
+few sizes the pages actually show (SIZES):
+
+  - The files are kept per upstream URL: `<key>/original` and `<key>/<size>`, where the key is a
+    hash of the URL. `image_src()` (a Jinja global) puts the key in the page URL
+    (`/img/<slug>/thumb?v=<key>`), so a proxied image can be cached by the browser for a year
+    (`immutable`); when the artist gets a new image URL, the pages link to a new key.
+  - A request whose variant is already on disk is served straight from the file, without a
+    database lookup. Otherwise the artist's image URL is looked up, the original is fetched (once;
+    concurrent requests for the same image wait for the first) and the variant is written.
+  - If the upstream image can't be fetched, the request is redirected to the upstream URL, so the
+    page still shows the image; the failed URL isn't retried for RETRY_AFTER seconds.
+  - `prewarm()` fetches and resizes every artist image that isn't on disk yet and removes the
+    files of images no artist uses anymore. `run_sync` calls it after each sync.
+
+Resizing uses Pillow, loaded on first use. Without it, the original image is served for every
+size (still from disk and with the same caching).
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_DIR = os.getenv(
+    "IMAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "images"),
+)
+FETCH_TIMEOUT = 10 # Seconds per upstream request
+MAX_UPSTREAM_BYTES = 15 * 1024 * 1024 # Larger upstream images are not proxied
+RETRY_AFTER = 600 # Seconds before an upstream URL that failed is tried again
+PREWARM_WORKERS = 4
+JPEG_QUALITY = 82
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+SHORT_CACHE = "public, max-age=3600" # Requests without (or with an outdated) ?v=
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+@dataclass(frozen=True)
+class ImageSize:
+    width: int # Maximum width (and height) in pixels
+    square: bool = False # Crop to a centered square of `width`
+
+# Twice the CSS size the templates display, for high-density screens
+SIZES: Dict[str, ImageSize] = {
+    "thumb": ImageSize(80, square=True), # 40x40 avatars in the schedule and admin tables
+    "card": ImageSize(640), # The h-48 (192px) cards on the overview
+    "detail": ImageSize(1024), # The artist page
+}
+
+# Upstream content we are willing to serve, by leading bytes (no SVG: it can carry scripts)
+MAGIC_TYPES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+def image_type(head: bytes) -> Optional[str]:
+    """The content type of an image from its first bytes; None if it isn't a supported image."""
+    for magic, content_type in MAGIC_TYPES:
+        if head.startswith(magic):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+def url_key(image_url: str) -> str:
+    return hashlib.sha1(image_url.encode("utf-8")).hexdigest()[:16]
+
+def image_src(slug: str, image_url: Optional[str], size: str) -> str:
+    """The proxied URL of an artist's image (Jinja global); "" when the artist has no image."""
+    if not image_url:
+        return ""
+    return f"/img/{quote(slug, safe='')}/{size}?v={url_key(image_url)}"
+
+# --- Disk cache ---
+
+_key_locks: Dict[str, threading.Lock] = {}
+_key_locks_guard = threading.Lock()
+_failed: Dict[str, float] = {} # Upstream URL -> time.monotonic() of the last failed fetch
+_prewarm_lock = threading.Lock()
+_pillow_missing_logged = False
+
+def _key_lock(key: str) -> threading.Lock:
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+def _path(key: str, name: str) -> str:
+    return os.path.join(IMAGE_CACHE_DIR, key, name)
+
+def _write_atomic(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def cached_variant(key: str, size: str) -> Optional[str]:
+    """Path of a variant already on disk, or None. No locking and no database: the fast path."""
+    if not KEY_PATTERN.match(key) or size not in SIZES:
+        return None
+    path = _path(key, size)
+    return path if os.path.exists(path) else None
+
+def _fetch(image_url: str) -> Optional[bytes]:
+    """The upstream image, or None (and the URL is not retried for RETRY_AFTER seconds)."""
+    failed_at = _failed.get(image_url)
+    if failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER:
+        return None
+    import requests # Imported lazily (slow import, only needed on a cache miss)
+
+    try:
+        with requests.get(image_url, timeout=FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            content = response.raw.read(MAX_UPSTREAM_BYTES + 1, decode_content=True)
+        if len(content) > MAX_UPSTREAM_BYTES:
+            raise ValueError(f"larger than {MAX_UPSTREAM_BYTES} bytes")
+        if image_type(content[:16]) is None:
+            raise ValueError("not a JPEG, PNG, GIF or WebP image")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        _failed[image_url] = time.monotonic()
+        logger.warning(f"Image proxy: could not fetch {image_url}: {e}")
+        return None
+    _failed.pop(image_url, None)
+    return content
+
+def _resize(original: bytes, size: ImageSize) -> Optional[bytes]:
+    """The original resized to `size` as JPEG; None if Pillow is missing or the image can't be decoded."""
+    global _pillow_missing_logged
+    try:
+        from PIL import Image, ImageOps # Imported lazily (optional dependency)
+    except ImportError:
+        if not _pillow_missing_logged:
+            _pillow_missing_logged = True
+            logger.warning("Image proxy: Pillow is not installed, serving the original images unresized.")
+        return None
+    try:
+        with Image.open(io.BytesIO(original)) as source:
+            image = ImageOps.exif_transpose(source)
+            if image.mode in ("RGBA", "LA", "P", "PA"):
+                # JPEG has no alpha: put transparent images on white
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, "white")
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            if size.square:
+                image = ImageOps.fit(image, (size.width, size.width), Image.Resampling.LANCZOS)
+            else:
+                image.thumbnail((size.width, size.width), Image.Resampling.LANCZOS) # Never enlarges
+            output = io.BytesIO()
+            image.save(output, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    except Exception as e: # Pillow raises a variety of errors for broken or unsupported images
+        logger.warning(f"Image proxy: could not resize image: {e}")
+        return None
+    return output.getvalue()
+
+def ensure_variant(image_url: str, size: str) -> Optional[str]:
+    """Path of the `size` variant of an upstream image, fetching and resizing it if needed; None if unavailable."""
+    key = url_key(image_url)
+    path = _path(key, size)
+    if os.path.exists(path):
+        return path
+    with _key_lock(key):
+        if os.path.exists(path): # Written while we waited for the lock
+            return path
+        original_path = _path(key, "original")
+        if os.path.exists(original_path):
+            with open(original_path, "rb") as f:
+                original = f.read()
+        else:
+            original = _fetch(image_url)
+            if original is None:
+                return None
+            _write_atomic(original_path, original)
+        resized = _resize(original, SIZES[size])
+        if resized is None or len(resized) >= len(original):
+            if image_type(original[:16]) is None:
+                return None
+            resized = original # Already small enough (or can't be resized): serve the original bytes
+        _write_atomic(path, resized)
+    return path
+
+def content_type(path: str) -> str:
+    with open(path, "rb") as f:
+        return image_type(f.read(16)) or "application/octet-stream"
+
+# --- Prewarming ---
+
+def prewarm(image_urls: Iterable[str], prune: bool = True) -> Dict[str, int]:
+    """
+    Fetches and resizes every image in `image_urls` that isn't fully on disk yet, then (with
+    `prune`) removes the cached files of every other image. Runs one prewarm at a time.
+    """
+    urls = sorted(set(url for url in image_urls if url))
+    with _prewarm_lock:
+        missing = [url for url in urls if any(not os.path.exists(_path(url_key(url), size)) for size in SIZES)]
+
+        def warm(url: str) -> bool:
+            return all(ensure_variant(url, size) is not None for size in SIZES)
+
+        with ThreadPoolExecutor(max_workers=PREWARM_WORKERS) as pool:
+            warmed = sum(pool.map(warm, missing))
+
+        removed = 0
+        if prune and os.path.isdir(IMAGE_CACHE_DIR):
+            keep = {url_key(url) for url in urls}
+            for name in os.listdir(IMAGE_CACHE_DIR):
+                if KEY_PATTERN.match(name) and name not in keep:
+                    shutil.rmtree(os.path.join(IMAGE_CACHE_DIR, name), ignore_errors=True)
+                    removed += 1
+    return {"images": len(urls), "warmed": warmed, "failed": len(missing) - warmed, "removed": removed}
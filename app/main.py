@@ -1,26 +1,37 @@
 import os
 import sys
-from datetime import datetime, timezone, timedelta, time
-import locale # Import locale module
+from datetime import date, datetime, timedelta, time
 import logging # Add logging import
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI, Request, Depends, Form, HTTPException, status, Response, Path, Query
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, FileResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-from dateutil import parser # Added for date parsing
-from typing import Optional, List
+from jinja2 import FileSystemBytecodeCache
+from typing import Optional, List, Tuple
+from urllib.parse import urlencode
 
 # Import SQLAlchemy Session for dependency injection
 from sqlalchemy.orm import Session
 
 # Import database and auth functions
 from app import database, models, schemas, crud # Ensure all necessary modules are imported
+from app import query_log # Slow-query log (ring buffer + route context)
+from app import read_models # Column-projection read path for the template routes
+from app import contact_index # In-memory prefix index for the contact type-ahead
+from app import artist_search # In-memory trigram index for the fuzzy artist search
+from app import schedule_index # In-memory per-stage schedule index for "now and next"
+from app import pubsub # In-process pub/sub behind the live-update stream
+from app import change_log # Append-only change log behind the incremental change feed
+from app import static_assets # Fingerprinted, precompressed static files (static_url, /static handler)
+from app import compression # Gzip middleware for dynamic responses
+from app import image_proxy # Resized, disk-cached artist images (/img/{slug}/{size})
+from app import overview_index # Compact JSON index behind the client-side overview grid and table
+from app import sync_runs # Sync run history with per-phase timings and anomaly flags
+from app.streaming import StreamingTemplateResponse # Streamed rendering for the large pages
 from app.auth import ( # Import specific auth functions and dependencies
     create_access_token, 
     authenticate_user, 
@@ -31,25 +42,11 @@ from app.auth import ( # Import specific auth functions and dependencies
     ACCESS_TOKEN_EXPIRE_MINUTES
     # RoleChecker removed from this import
 )
-from app.users import User # Specifically import the User model for type hinting
 from app.utils import format_datetime, datetime_now # Import utils
-from app.database import SessionLocal, engine, create_db_tables # Import engine and table creation function
+from app.database import SessionLocal # Session factory for the get_db dependency
 
-# --- Scheduler Imports & Setup ---
-from apscheduler.schedulers.background import BackgroundScheduler
-from scripts.sync_artists_db import run_sync as run_hourly_sync # Rename import to avoid clash if needed
-import atexit # To ensure scheduler shutdown
-# --- End Scheduler Setup ---
-
-# --- Set Locale for Danish Weekday Names ---
-try:
-    # Sæt locale specifikt for tidsformatering til dansk
-    locale.setlocale(locale.LC_TIME, 'da_DK.UTF-8')
-    print("Locale for LC_TIME set to da_DK.UTF-8") # Til debugging
-except locale.Error as e:
-    print(f"Warning: Could not set locale to da_DK.UTF-8: {e}")
-    # Overvej fallback eller yderligere fejlhåndtering her
-# --- End Locale Setting ---
+# Note: APScheduler and the sync script (which pulls in requests/dateutil) are imported in the
+# startup handler and the sync job, not here, so importing app.main stays fast for worker boot.
 
 # Determine the base directory of the app
 # This assumes main.py is in the app directory
@@ -93,11 +90,25 @@ app.add_middleware(
     allow_headers=["*"],  # Consider restricting this too in the future
 )
 
-# Mount static files (like CSS if not using CDN)
-app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
+# Tag each request with its route so slow queries can be traced back to it
+app.add_middleware(query_log.RouteContextMiddleware)
+
+# Gzip large HTML/JSON responses (outermost, so it sees the final response)
+app.add_middleware(compression.GzipMiddleware)
+
+# Mount static files: fingerprinted copies (scripts/build_static.py) are served immutable and precompressed
+app.mount("/static", static_assets.PrecompressedStaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 
 # Setup Jinja2 templates
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+# Cache compiled template bytecode on disk so restarted workers skip parsing/compiling the templates.
+# Jinja checks the template's mtime, so edited templates are still recompiled.
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(os.path.dirname(BASE_DIR), "data", "jinja_cache"))
+try:
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    templates.env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+except OSError as e:
+    print(f"Warning: Could not use Jinja bytecode cache at {JINJA_CACHE_DIR}: {e}")
 
 # --- Custom Jinja2 Filter for Date Formatting --- 
 # Removed definition from here, it's now in utils.py
@@ -115,6 +126,16 @@ def datetimeformat_festival(value, format_str="%A %H:%M, %d/%m-%Y"):
 
 templates.env.filters['datetimeformat_festival'] = datetimeformat_festival
 templates.env.globals['now'] = datetime_now # Make now() available (import from utils)
+templates.env.globals['static_url'] = static_assets.static_url # Fingerprinted URL of a file in app/static
+templates.env.globals['image_src'] = image_proxy.image_src # Proxied URL of an artist image
+
+def precompile_templates():
+    """Loads every template once at startup (from the bytecode cache when warm), so the first requests don't compile them."""
+    for name in templates.env.list_templates(extensions=["html"]):
+        try:
+            templates.env.get_template(name)
+        except Exception as e:
+            print(f"Warning: Could not precompile template {name}: {e}")
 # --- End Custom Filter ---
 
 # --- Dependency for Authentication (REMOVED - Now imported from app/auth.py) ---
@@ -159,10 +180,10 @@ def get_db():
 # --- Routes --- 
 
 @app.get("/login", response_class=HTMLResponse, tags=["Authentication"])
-async def login_form(request: Request, error: Optional[str] = None, next: Optional[str] = None):
+async def login_form(request: Request, error: Optional[str] = None, next: Optional[str] = None, db: Session = Depends(get_db)):
     """ Displays the login page. Includes error message if login failed."""
     # Check if user is already logged in, redirect to root if so
-    if get_current_user_from_cookie(request):
+    if get_current_user_from_cookie(request, db):
         return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     return templates.TemplateResponse("login.html", {"request": request, "error": error, "next_url": next})
 
@@ -218,61 +239,191 @@ async def logout_and_redirect():
     return response
 
 # --- Protected Main Route --- 
+ARTISTS_PAGE_SIZE = 48 # Artist cards per overview page
+SCHEDULE_PAGE_SIZE = 100 # Schedule rows per overview page
+RISK_FILTER_VALUES = ("low", "medium", "high", "none")
+
 @app.get("/", response_class=HTMLResponse)
 def read_root(
     request: Request,
+    filter_date: Optional[str] = None, # Festival day (YYYY-MM-DD); "all" or invalid = every day
+    filter_stage: Optional[str] = None, # Stage name; "all" = every stage
+    filter_risk: Optional[str] = None, # low/medium/high/none; "all" = every risk level
+    q: Optional[str] = None, # Artist name (substring or fuzzy match)
+    page: Optional[str] = None, # Artist grid page (1-based)
+    schedule_page: Optional[str] = None, # Schedule table page (1-based)
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """ Fetches artists, events, and assessments, renders the main overview page. Requires login."""
+    """
+    Renders the main overview page (streamed): the artists and schedule matching the filters, one
+    page of each. The filters are plain query parameters, so the page works without JavaScript;
+    the script on the page only fetches the same URLs in the background. Requires login.
+    """
     print(f"User '{current_user.username}' (Role: {current_user.role.value}) accessing root route...")
-    events = crud.get_all_events_with_artists_stages(db, limit=500)
-    assessments = crud.get_all_risk_assessments_dict(db)
-    all_artists = crud.get_all_artists(db, limit=500)
-    
-    # --- Logic to prepare data for template --- 
-    # (This logic might need adjustment based on how templates use the data)
-    artist_events_map = {artist.slug: [] for artist in all_artists}
-    for event in events:
-        # Access related artist via ORM relationship if needed and available
-        # Assuming events from get_all_events_with_artists_stages have artist loaded
-        if event.artist and event.artist.slug in artist_events_map:
-            artist_events_map[event.artist.slug].append(event)
-        elif event.artist_slug in artist_events_map:
-             artist_events_map[event.artist_slug].append(event)
-        else:
-             # Handle cases where event might not have artist linked correctly
-             print(f"Warning: Event {event.id} artist slug '{event.artist_slug}' not found in artist map or event.artist is None.")
-    
-    # Create a combined list for the template
-    artist_card_data = []
-    for artist in all_artists:
-        artist_card_data.append({
-            'artist': artist, # Pass the ORM Artist object
-            'events': artist_events_map.get(artist.slug, []) # Pass list of ORM Event objects
-        })
-        
-    # Sort artist cards alphabetically by artist title
-    artist_card_data.sort(key=lambda x: x['artist'].title)
-    # --- End template data preparation --- 
+    filters = parse_overview_filters(db, filter_date, filter_stage, filter_risk, q)
+    context = overview_context(request, db, current_user, filters, (q or "").strip(), parse_page(page), parse_page(schedule_page))
+    db.close() # Everything is loaded; don't hold the connection while the page streams
+    return StreamingTemplateResponse(templates, "index.html", context)
 
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "artists": all_artists, # Pass artists directly for filtering/card generation
-            "events": events, # Pass events directly for table/filtering
-            "assessments": assessments, # Pass assessments dict keyed by slug
-            "current_user_role": current_user.role.value, # Pass role value
-            "current_user": current_user.username # ADDED: Pass username for base template
-        }
-    )
+def parse_page(value: Optional[str]) -> int:
+    """A 1-based page number from a query parameter; 1 if missing or invalid."""
+    try:
+        return max(1, int(value or 1))
+    except ValueError:
+        return 1
+
+def parse_overview_filters(
+    db: Session,
+    filter_date: Optional[str],
+    filter_stage: Optional[str],
+    filter_risk: Optional[str],
+    q: Optional[str],
+) -> read_models.OverviewFilters:
+    """The overview's query parameters as filters. Invalid values are ignored (treated as "all")."""
+    festival_day = None
+    if filter_date and filter_date != "all":
+        try:
+            festival_day = date.fromisoformat(filter_date)
+        except ValueError:
+            pass
+    stage = filter_stage.strip() if filter_stage and filter_stage.strip() not in ("", "all") else None
+    risk = filter_risk if filter_risk in RISK_FILTER_VALUES else None
+    query = (q or "").strip()
+    # The name search resolves to slugs in the in-memory search index (no LIKE scan of the table)
+    artist_slugs = artist_search.get_index(db).matching_slugs(query) if query else None
+    return read_models.OverviewFilters(festival_day=festival_day, stage=stage, risk=risk, artist_slugs=artist_slugs)
+
+def overview_url(params: dict, **overrides) -> str:
+    """The overview URL for `params` with `overrides`; empty values and page 1 are left out."""
+    merged = {**params, **overrides}
+    query = urlencode({key: value for key, value in merged.items() if value not in (None, "", 1)})
+    return f"/?{query}" if query else "/"
+
+def overview_context(
+    request: Request,
+    db: Session,
+    current_user: models.User,
+    filters: Optional[read_models.OverviewFilters] = None,
+    query: str = "",
+    page: int = 1,
+    schedule_page: int = 1,
+) -> dict:
+    """ Template context for index.html, fully loaded (plain rows, no lazy ORM attributes)."""
+    if filters is None:
+        filters = read_models.OverviewFilters()
+    # Lightweight read models: column projections, no ORM entities (see app/read_models.py)
+    artists_page = read_models.get_artists_page(db, filters, page, ARTISTS_PAGE_SIZE)
+    # The cards list every appearance of their artist, not just the ones matching the filters
+    card_events = read_models.get_schedule_for_artists(db, [item.artist.slug for item in artists_page.items])
+    schedule = read_models.get_schedule_page(db, filters, schedule_page, SCHEDULE_PAGE_SIZE)
+    params = {
+        "filter_date": filters.festival_day.isoformat() if filters.festival_day else None,
+        "filter_stage": filters.stage,
+        "filter_risk": filters.risk,
+        "q": query,
+        "page": artists_page.page,
+        "schedule_page": schedule.page,
+    }
+    return {
+        "request": request,
+        "artists": artists_page.items, # Artist cards of this page, sorted by title, with assessment
+        "artists_page": artists_page,
+        "events": schedule.items, # Schedule rows of this page
+        "schedule_page": schedule,
+        "events_by_artist": read_models.group_schedule_by_artist(card_events), # Events per artist slug for the cards
+        "festival_days": [(day.isoformat(), format_datetime(day.isoformat(), "%a %-d. %b %Y")) for day in crud.get_festival_dates(db)],
+        "stage_names": read_models.get_stage_names_with_events(db),
+        "filter_params": params, # Current filter values (form fields and pager links)
+        "filters_active": any(params[key] for key in ("filter_date", "filter_stage", "filter_risk", "q")),
+        "overview_url": overview_url,
+        "current_user_role": current_user.role.value, # Pass role value
+        "current_user": current_user.username # ADDED: Pass username for base template
+    }
+
+@app.get("/api/overview-index", tags=["API"])
+def overview_index_api(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Every artist and event of the overview as one compact JSON document (format in
+    app/overview_index.py), for the client-side grid and table on `/`. The ETag is the change-log
+    version; a matching If-None-Match is answered with 304. Requires login.
+    """
+    version = change_log.head(db)
+    etag = overview_index.etag(version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if compression.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    _, body = overview_index.get_index_json(db, version)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # Old basic root (can be removed or kept for API check)
 @app.get("/api-status")
 def api_status():
     return {"message": "Welcome to the Smukfest Artist Risk Assessment Tool API"}
 
+# --- Offline Support (Service Worker) ---
+
+@app.get("/sw.js", include_in_schema=False)
+def service_worker():
+    """ The service worker, served from the root so its scope covers every page. Always revalidated."""
+    return FileResponse(
+        os.path.join(BASE_DIR, "static", "sw.js"),
+        media_type="application/javascript",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+@app.get("/api/data-version", tags=["API"])
+def get_data_version_api(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    The app's data version: the newest change-log version, which moves with every change to artists,
+    events, assessments or contacts. The service worker compares it with the version its cached
+    pages were fetched under. Requires login.
+    """
+    response.headers["Cache-Control"] = "no-store"
+    return {"version": change_log.head(db)}
+
+# --- Artist Images ---
+
+@app.get("/img/{slug}/{size}", include_in_schema=False)
+def artist_image(
+    slug: str,
+    size: str,
+    v: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    An artist's image resized to one of `image_proxy.SIZES`, from the disk cache (see
+    app/image_proxy.py). With the current `?v=` (as `image_src()` links it) the image is cached
+    for a year. Redirects to the upstream image if it can't be fetched. No login required: the
+    images are public on the festival site.
+    """
+    if size not in image_proxy.SIZES:
+        raise HTTPException(status_code=404, detail="Unknown image size")
+    if v:
+        path = image_proxy.cached_variant(v, size)
+        if path is not None: # Fast path: no database lookup
+            return FileResponse(path, media_type=image_proxy.content_type(path),
+                                headers={"Cache-Control": image_proxy.IMMUTABLE})
+    image_url = read_models.get_artist_image_url(db, slug)
+    if not image_url:
+        raise HTTPException(status_code=404, detail="Artist image not found")
+    if v and v != image_proxy.url_key(image_url):
+        # A page from before the artist's image changed
+        return RedirectResponse(image_proxy.image_src(slug, image_url, size), status_code=302)
+    path = image_proxy.ensure_variant(image_url, size)
+    if path is None:
+        return RedirectResponse(image_url, status_code=302, headers={"Cache-Control": "no-store"})
+    cache_control = image_proxy.IMMUTABLE if v else image_proxy.SHORT_CACHE
+    return FileResponse(path, media_type=image_proxy.content_type(path), headers={"Cache-Control": cache_control})
+
 # --- Add other protected routes below using Depends(get_current_active_user) --- 
 # Example:
 # @app.get("/some_other_page")
@@ -291,37 +442,42 @@ async def read_assessments_page(
     db: Session = Depends(get_db), # Need DB session
     admin_user: models.User = Depends(get_admin_user) # Protects route, provides admin user object
 ):
-    """ Serves the HTML page for viewing and editing risk assessments. Admin only."""
+    """ Serves the HTML page for viewing and editing risk assessments (streamed). Admin only."""
     print(f"Admin user '{admin_user.username}' accessing assessments page...")
-    # Fetch artists and their assessments using CRUD functions
-    # Use get_all_assessments_with_artists to get assessments with artist loaded
-    assessments_with_artists = crud.get_all_assessments_with_artists(db, limit=500)
-    # Fetch all artists separately in case some don't have assessments yet
-    all_artists = crud.get_all_artists(db, limit=500)
-    
-    # Create a dictionary of assessments keyed by artist slug for quick lookup
-    assessments_dict = {a.artist_slug: a for a in assessments_with_artists}
-    
-    # Prepare data for the template: list of dicts containing artist and their assessment (or None)
-    artists_assessments_data = []
-    for artist in all_artists:
-        artists_assessments_data.append({
-            "artist": artist, # Pass ORM Artist object
-            "assessment": assessments_dict.get(artist.slug) # Pass ORM RiskAssessment or None
-        })
-
-    # Sort by artist title
-    artists_assessments_data.sort(key=lambda x: x['artist'].title)
+    context = admin_assessments_context(request, db, admin_user)
+    db.close() # Everything is loaded; don't hold the connection while the page streams
+    return StreamingTemplateResponse(templates, "admin_assessments.html", context)
+
+def admin_assessments_context(request: Request, db: Session, admin_user: models.User) -> dict:
+    """ Template context for admin_assessments.html, fully loaded."""
+    # Artists (sorted by title) with their assessment or None, in a single LEFT JOIN
+    artists_assessments_data = read_models.get_artists_with_assessments(db)
+    return {
+        "request": request,
+        "current_user": admin_user.username, # For base template display
+        "current_user_role": admin_user.role.value, # Pass role value
+        "artists_assessments": artists_assessments_data # Pass combined data
+    }
 
-    return templates.TemplateResponse(
-        "admin_assessments.html", 
-        {
-            "request": request, 
-            "current_user": admin_user.username, # For base template display
-            "current_user_role": admin_user.role.value, # Pass role value
-            "artists_assessments": artists_assessments_data # Pass combined data
-        }
-    )
+# Must be registered before /api/assessments/{artist_slug}, which would otherwise match "batch"
+@app.post("/api/assessments/batch", response_model=schemas.RiskAssessmentBatchResponse, tags=["Admin API"])
+def save_artist_assessments_batch(
+    batch: schemas.RiskAssessmentBatch,
+    db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_admin_user) # Protects route
+):
+    """ Creates or updates many risk assessments in one transaction and returns a result per item. Admin only."""
+    print(f"Admin user '{admin_user.username}' saving {len(batch.items)} assessments in one batch...")
+    try:
+        results = crud.upsert_assessments(db, batch.items)
+    except Exception as e:
+        print(f"Error saving assessment batch: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to save assessments: {e}")
+    saved = sum(1 for r in results if r['status'] == 'saved')
+    failed = sum(1 for r in results if r['status'] == 'not_found')
+    if saved:
+        publish_assessments([r['assessment'] for r in results if r['status'] == 'saved'])
+    return {"saved": saved, "failed": failed, "results": results}
 
 @app.post("/api/assessments/{artist_slug}", response_model=schemas.RiskAssessment, tags=["Admin API"])
 async def save_artist_assessment(
@@ -332,21 +488,212 @@ async def save_artist_assessment(
 ):
     """ API endpoint to create or update a risk assessment for an artist. Admin only."""
     print(f"Admin user '{admin_user.username}' saving assessment for {artist_slug}...")
-    # Check if artist actually exists using CRUD function
-    artist = crud.get_artist_by_slug(db, artist_slug=artist_slug)
-    if not artist:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artist with slug '{artist_slug}' not found")
-
-    # Use the upsert CRUD function
+    # Use the upsert CRUD function (one statement; the artist FK rejects unknown slugs)
     try:
         updated_assessment = crud.upsert_assessment(db, artist_slug, assessment_data)
-        return updated_assessment # crud function returns the ORM model, FastAPI converts based on response_model
     except Exception as e:
         # Catch potential errors during upsert (e.g., DB constraints)
         print(f"Error upserting assessment for {artist_slug}: {e}")
         # Rollback might be needed if crud function doesn't handle it
         # db.rollback() # Depends on crud implementation
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to save assessment: {e}")
+    if updated_assessment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artist with slug '{artist_slug}' not found")
+    publish_assessments([updated_assessment])
+    return updated_assessment # crud function returns the ORM model, FastAPI converts based on response_model
+
+def publish_assessments(assessments: List[models.RiskAssessment]) -> None:
+    """Tells open pages about saved assessments (levels, texts and timestamp per artist)."""
+    pubsub.publish("assessment", {"items": [
+        schemas.RiskAssessment.model_validate(a).model_dump(mode="json", exclude={"id"}) for a in assessments
+    ]})
+
+@app.get("/api/slow-queries", tags=["Admin API"])
+def get_slow_queries(admin_user: models.User = Depends(get_admin_user)):
+    """ Dumps the slow-query ring buffer (newest first). Admin only."""
+    samples = query_log.get_samples()
+    return {
+        "threshold_ms": query_log.SLOW_QUERY_THRESHOLD_MS,
+        "capacity": query_log.SLOW_QUERY_LOG_SIZE,
+        "count": len(samples),
+        "samples": samples,
+    }
+
+@app.delete("/api/slow-queries", tags=["Admin API"])
+def clear_slow_queries(admin_user: models.User = Depends(get_admin_user)):
+    """ Empties the slow-query ring buffer. Admin only."""
+    removed = query_log.clear_samples()
+    return {"message": f"Cleared {removed} slow-query samples"}
+
+@app.get("/api/compression-stats", tags=["Admin API"])
+def get_compression_stats(admin_user: models.User = Depends(get_admin_user)):
+    """ Response compression metrics: bytes in/out and saved, CPU time, compressed-body cache hits. Admin only."""
+    return compression.get_metrics()
+
+@app.delete("/api/compression-stats", tags=["Admin API"])
+def reset_compression_stats(admin_user: models.User = Depends(get_admin_user)):
+    """ Zeroes the compression metrics and empties the compressed-body cache. Admin only."""
+    compression.reset_metrics()
+    return {"message": "Compression metrics reset"}
+
+# --- Sync Run History ---
+
+def sync_run_history(db: Session, limit: int) -> schemas.SyncRunHistory:
+    """The newest `limit` sync runs with their anomalies (see app/sync_runs.py)."""
+    runs = []
+    for item in sync_runs.get_history(db, limit):
+        run = item["run"]
+        runs.append(schemas.SyncRun(
+            id=run.id,
+            trigger=run.trigger,
+            status=run.status,
+            started_at=run.started_at,
+            finished_at=run.finished_at,
+            error=run.error,
+            payload_bytes=run.payload_bytes,
+            phases_ms={name: getattr(run, f"{name}_ms") for name in sync_runs.PHASES},
+            total_ms=run.total_ms,
+            counts={name: getattr(run, name) for name in sync_runs.COUNTS},
+            anomalies=item["anomalies"],
+        ))
+    return schemas.SyncRunHistory(
+        baseline_runs=sync_runs.BASELINE_RUNS,
+        drop_threshold=sync_runs.DROP_THRESHOLD,
+        count=len(runs),
+        runs=runs,
+    )
+
+@app.get("/api/sync-runs", response_model=schemas.SyncRunHistory, tags=["Admin API"])
+def get_sync_runs(
+    limit: int = Query(sync_runs.DEFAULT_RUNS, ge=1, le=sync_runs.MAX_RUNS),
+    db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_admin_user)
+):
+    """ The newest sync runs (newest first): phase timings, payload size, row counts, errors and anomalies. Admin only."""
+    return sync_run_history(db, limit)
+
+@app.get("/admin/sync-runs", response_class=HTMLResponse, tags=["Admin"])
+def admin_sync_runs_view(
+    request: Request,
+    limit: int = Query(sync_runs.DEFAULT_RUNS, ge=1, le=sync_runs.MAX_RUNS),
+    db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_admin_user)
+):
+    """Admin view of the sync history, with anomalous runs highlighted."""
+    history = sync_run_history(db, limit)
+    return templates.TemplateResponse(
+        "admin_sync_runs.html",
+        {
+            "request": request,
+            "history": history,
+            "phases": sync_runs.PHASES,
+            "current_user": admin_user.username,
+            "current_user_role": admin_user.role.value,
+        }
+    )
+
+# --- Live Updates (Server-Sent Events) ---
+
+@app.get("/api/stream", tags=["API"])
+async def live_update_stream(
+    request: Request,
+    last_event_id: Optional[str] = Query(None, description="Resume after this message (for a new EventSource)"),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Server-Sent Events stream of changes: "assessment" (saved assessments), "sync" (summary of an
+    applied sync), "contact" (created/updated/deleted contact), plus "heartbeat" and "resync". Requires login.
+    """
+    try:
+        pubsub.check_capacity() # The stream itself subscribes once its body starts (see app/pubsub.py)
+    except pubsub.TooManySubscribers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live-update connections",
+            headers={"Retry-After": "30"},
+        )
+    return StreamingResponse(
+        # EventSource sends Last-Event-ID itself when it reconnects; the query parameter covers a new EventSource
+        pubsub.stream(request.headers.get("last-event-id") or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # No buffering in nginx
+    )
+
+# --- Incremental Change Feed ---
+
+@app.get("/api/changes", response_model=schemas.ChangeFeed, tags=["API"])
+def list_changes_api(
+    since: int = Query(0, ge=0, description="Last version already applied (0 for everything)"),
+    limit: int = Query(change_log.DEFAULT_CHANGES, ge=1, le=change_log.MAX_CHANGES),
+    reset_through: Optional[int] = Query(None, ge=0, description="reset_through of the previous page, while a reset read continues"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Changes to artists, events, assessments and contacts after version `since`, oldest first.
+    Repeat with ?since=next_since while has_more is true. If reset is true the log was compacted
+    past `since`: the changes start from the beginning, so replace the local copy. While a page
+    has reset_through, pass it back with the next since (?since=&reset_through=) to continue the
+    same reset. Requires login.
+    """
+    return change_log.get_changes(db, since, limit, reset_through)
+
+# --- Artist Search ---
+@app.get("/api/artists/search", response_model=schemas.ArtistSearchResults, tags=["API"])
+def search_artists_api(
+    q: str = Query("", max_length=100),
+    limit: int = Query(artist_search.DEFAULT_RESULTS, ge=1, le=artist_search.MAX_RESULTS),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """ Typo-tolerant, accent-insensitive artist search on title and slug, most similar first. Requires login."""
+    return {"q": q, "items": artist_search.get_index(db).search(q, limit)}
+
+# --- Keyset-Paginated JSON API ---
+# Follow next_cursor (pass it back as ?cursor=) until it is null. Cursors stay valid while rows are added.
+MAX_PAGE_SIZE = 500
+
+@app.get("/api/artists", response_model=schemas.ArtistPage, tags=["API"])
+def list_artists_api(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """ Artists ordered by title, one page at a time. Requires login."""
+    try:
+        artists, next_cursor = crud.get_artists_page(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": artists, "next_cursor": next_cursor}
+
+@app.get("/api/events", response_model=schemas.EventPage, tags=["API"])
+def list_events_api(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """ Events (with artist and stage) ordered by start time, one page at a time. Requires login."""
+    try:
+        events, next_cursor = crud.get_events_page(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": events, "next_cursor": next_cursor}
+
+@app.get("/api/assessments", response_model=schemas.RiskAssessmentPage, tags=["API"])
+def list_assessments_api(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """ Risk assessments ordered by artist slug, one page at a time. Requires login."""
+    try:
+        assessments, next_cursor = crud.get_assessments_page(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": assessments, "next_cursor": next_cursor}
 
 # Artist Detail Page Route
 @app.get("/artists/{artist_slug}", response_class=HTMLResponse)
@@ -385,13 +732,14 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 # --- Scheduler Definition & Job ---
-scheduler = BackgroundScheduler(daemon=True, timezone="Europe/Copenhagen") # Set timezone
+scheduler = None # BackgroundScheduler, created in startup_event
 
 def hourly_sync_job():
     """Job function to run the hourly sync."""
     try:
         logger.info("APScheduler: Starting hourly artist sync job...")
-        run_hourly_sync() # Call the imported sync function
+        from scripts.sync_artists_db import run_sync as run_hourly_sync # Imported lazily (pulls in requests)
+        run_hourly_sync(trigger="scheduled") # Call the imported sync function
         logger.info("APScheduler: Hourly artist sync job finished successfully.")
     except Exception as e:
         logger.error(f"APScheduler: Error during hourly sync job: {e}", exc_info=True)
@@ -399,8 +747,12 @@ def hourly_sync_job():
 # --- FastAPI Event Handlers for Scheduler ---
 @app.on_event("startup")
 async def startup_event():
+    global scheduler
+    precompile_templates()
     logger.info("FastAPI startup: Initializing scheduler...")
     try:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        scheduler = BackgroundScheduler(daemon=True, timezone="Europe/Copenhagen") # Set timezone
         # Add the job to run every hour
         scheduler.add_job(
             hourly_sync_job, 
@@ -422,6 +774,8 @@ async def startup_event():
 
 @app.on_event("shutdown")
 def shutdown_event():
+    if scheduler is None:
+        return
     logger.info("FastAPI shutdown: Shutting down APScheduler...")
     try:
         scheduler.shutdown()
@@ -437,6 +791,62 @@ def shutdown_event():
 # atexit.register(shutdown_scheduler_on_exit)
 # --- End Scheduler Logic --- 
 
+def build_calendar_grid(events, stage_names: List[str], target_date: datetime):
+    """
+    Builds the 15-minute slot grid used by the calendar view.
+
+    Returns (time_slots, events_by_stage_and_time) where events_by_stage_and_time[stage][slot]
+    is either {"event_data": event, "span": 4} or a placeholder for slots covered by an event.
+    """
+    # Generate 15-min time slots for the day (08:00 to 03:00 next day)
+    start_time = datetime.combine(target_date.date(), time(8, 0))
+    end_time = start_time + timedelta(hours=19)
+
+    # If there are events, trim the time range to first/last event
+    if events:
+        def round_down(dt):
+            return dt - timedelta(minutes=dt.minute % 15, seconds=dt.second, microseconds=dt.microsecond)
+        def round_up(dt):
+            add = (15 - (dt.minute % 15)) % 15
+            if add == 0 and (dt.second > 0 or dt.microsecond > 0):
+                add = 15
+            return (dt + timedelta(minutes=add)).replace(second=0, microsecond=0)
+        first_event_start = min(e.start_time for e in events if e.start_time)
+        last_event_end = max((e.end_time or (e.start_time + timedelta(hours=1))) for e in events if e.start_time)
+        start_time = round_down(first_event_start)
+        end_time = round_up(last_event_end)
+
+    time_slots = []
+    t = start_time
+    while t <= end_time:
+        time_slots.append(t)
+        t += timedelta(minutes=15)
+
+    # Build grid: events_by_stage_and_time[stage][slot] = {event_data, span} or placeholder
+    events_by_stage_and_time = {stage: {} for stage in stage_names}
+    for event in events:
+        if not event.stage or event.stage.name not in events_by_stage_and_time:
+            continue # No stage, or a stage that isn't shown (e.g. 'TBA')
+        stage = event.stage.name
+        # Find the slot index for the event's start_time
+        slot_idx = None
+        for idx, slot in enumerate(time_slots):
+            if slot <= event.start_time < slot + timedelta(minutes=15):
+                slot_idx = idx
+                break
+        if slot_idx is None:
+            continue  # Event not in visible range
+        # Set span to 4 (1 hour)
+        span = 4
+        # Mark the main slot
+        events_by_stage_and_time[stage][time_slots[slot_idx]] = {"event_data": event, "span": span}
+        # Mark covered slots
+        for i in range(1, span):
+            if slot_idx + i < len(time_slots):
+                events_by_stage_and_time[stage][time_slots[slot_idx + i]] = {"covered_by_event_id": event.event_id, "is_empty_placeholder": True}
+
+    return time_slots, events_by_stage_and_time
+
 @app.get("/calendar", response_class=HTMLResponse)
 def calendar_view(
     request: Request,
@@ -516,54 +926,8 @@ def calendar_view(
     events = crud.get_events_for_festival_day(db, target_date)
     # Fetch all risk assessments as a dict keyed by artist_slug
     assessments = crud.get_all_risk_assessments_dict(db)
-    # Generate 15-min time slots for the day (08:00 to 03:00 next day)
-    start_time = datetime.datetime.combine(target_date.date(), time(8, 0))
-    end_time = start_time + timedelta(hours=19)
-
-    # If there are events, trim the time range to first/last event
-    if events:
-        def round_down(dt):
-            return dt - timedelta(minutes=dt.minute % 15, seconds=dt.second, microseconds=dt.microsecond)
-        def round_up(dt):
-            add = (15 - (dt.minute % 15)) % 15
-            if add == 0 and (dt.second > 0 or dt.microsecond > 0):
-                add = 15
-            return (dt + timedelta(minutes=add)).replace(second=0, microsecond=0)
-        first_event_start = min(e.start_time for e in events if e.start_time)
-        last_event_end = max((e.end_time or (e.start_time + timedelta(hours=1))) for e in events if e.start_time)
-        start_time = round_down(first_event_start)
-        end_time = round_up(last_event_end)
-
-    time_slots = []
-    t = start_time
-    while t <= end_time:
-        time_slots.append(t)
-        t += timedelta(minutes=15)
-
-    # Build grid: events_by_stage_and_time[stage][slot] = {event_data, span} or placeholder
-    events_by_stage_and_time = {stage: {} for stage in stage_names}
-    event_id_to_event = {}
-    for event in events:
-        if not event.stage:
-            continue
-        stage = event.stage.name
-        event_id_to_event[event.event_id] = event
-        # Find the slot index for the event's start_time
-        slot_idx = None
-        for idx, slot in enumerate(time_slots):
-            if slot <= event.start_time < slot + timedelta(minutes=15):
-                slot_idx = idx
-                break
-        if slot_idx is None:
-            continue  # Event not in visible range
-        # Set span to 4 (1 hour)
-        span = 4
-        # Mark the main slot
-        events_by_stage_and_time[stage][time_slots[slot_idx]] = {"event_data": event, "span": span}
-        # Mark covered slots
-        for i in range(1, span):
-            if slot_idx + i < len(time_slots):
-                events_by_stage_and_time[stage][time_slots[slot_idx + i]] = {"covered_by_event_id": event.event_id, "is_empty_placeholder": True}
+    # Build the 15-min slot grid for the day
+    time_slots, events_by_stage_and_time = build_calendar_grid(events, stage_names, target_date)
 
     # Pass all events as JSON for modal
     from app.schemas import Event as EventSchema
@@ -767,7 +1131,7 @@ def calendar_print_view(
 
         svg_parts.append(f'<rect width="{svg_width}" height="{svg_height}" fill="{colors["textWhite"]}"/>')
         
-        date_str = target_date.strftime("%d. %B %Y")
+        date_str = format_datetime(target_date, "%d. %B %Y")
         svg_parts.append(f'''<text x="{svg_width/2}" y="28" text-anchor="middle" font-size="20" font-weight="bold" fill="{colors["textDark"]}">Smukfest Program: {date_str}</text>''') # Y reduced, font size reduced
         
         for i, stage in enumerate(stages):
@@ -877,12 +1241,111 @@ def calendar_print_view(
             "request": request,
             "svg_calendar": svg_calendar_str,
             "selected_date": target_date.strftime("%Y-%m-%d"),
-            "selected_date_display": target_date.strftime("%d. %B %Y"),
+            "selected_date_display": format_datetime(target_date, "%d. %B %Y"),
             "current_user": current_user.username,
             "current_user_role": current_user.role.value,
         }
     )
 
+# --- Now & Next ---
+
+@app.get("/api/now-next", response_model=schemas.NowNext, tags=["API"])
+def now_next_api(
+    at: Optional[datetime] = Query(None, description="Festival-local time to look at (default: now)"),
+    next_count: int = Query(schedule_index.DEFAULT_NEXT, alias="next", ge=0, le=schedule_index.MAX_NEXT),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """ Per stage: the set playing now and the next sets, with risk/intensity/density. Requires login."""
+    at = at.replace(tzinfo=None) if at else schedule_index.festival_now()
+    return {"at": at, "stages": schedule_index.get_now_next(db, at, next_count)}
+
+@app.get("/now", response_class=HTMLResponse)
+def now_next_view(
+    request: Request,
+    at: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Compact dashboard of what is playing on each stage now and what comes next."""
+    at = at.replace(tzinfo=None) if at else schedule_index.festival_now()
+    return templates.TemplateResponse(
+        "now_next.html",
+        {
+            "request": request,
+            "at": at,
+            "at_is_fixed": request.query_params.get("at") is not None, # Don't auto-refresh a fixed time
+            "stages": schedule_index.get_now_next(db, at),
+            "current_user": current_user.username,
+            "current_user_role": current_user.role.value,
+        }
+    )
+
+# --- Analytics ---
+# app.analytics imports NumPy, so it is only loaded on the first analytics request (see scripts/profile_startup.py)
+
+def pick_festival_date(db: Session, selected_date: Optional[str]) -> Tuple[List[date], Optional[date]]:
+    """The festival dates and the one to show: ?date= if valid, else today/the next festival day, else the last one."""
+    festival_dates = crud.get_festival_dates(db)
+    if selected_date:
+        try:
+            return festival_dates, datetime.strptime(selected_date, "%Y-%m-%d").date()
+        except ValueError:
+            pass
+    if not festival_dates:
+        return festival_dates, None
+    today = schedule_index.festival_now().date()
+    return festival_dates, next((d for d in festival_dates if d >= today), festival_dates[-1])
+
+@app.get("/api/analytics", response_model=schemas.AnalyticsDay, tags=["API"])
+def analytics_api(
+    selected_date: Optional[str] = Query(None, alias="date"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """ Crowd-load heatmap (15-min slots x stages) and peak windows for a festival day. Requires login."""
+    from app import analytics
+    festival_dates, target_date = pick_festival_date(db, selected_date)
+    if target_date is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No festival days with events")
+    return analytics.get_day(db, target_date)
+
+@app.get("/analytics", response_class=HTMLResponse)
+def analytics_view(
+    request: Request,
+    selected_date: Optional[str] = Query(None, alias="date"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Heatmap of the crowd load per stage and 15-minute slot, with the day's peak windows."""
+    from app import analytics
+    festival_dates, target_date = pick_festival_date(db, selected_date)
+    return templates.TemplateResponse(
+        "analytics.html",
+        {
+            "request": request,
+            "festival_dates": festival_dates,
+            "selected_date": target_date,
+            "day": analytics.get_day(db, target_date) if target_date else None,
+            "all_stages": crud.get_all_stages(db) if current_user.role == models.UserRoleEnum.ADMIN else [],
+            "current_user": current_user.username,
+            "current_user_role": current_user.role.value,
+        }
+    )
+
+@app.put("/api/stages/{stage_id}/capacity", response_model=schemas.Stage, tags=["Admin API"])
+def update_stage_capacity_api(
+    stage_id: int,
+    update: schemas.StageCapacityUpdate,
+    db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_admin_user)
+):
+    """Set or clear a stage's audience capacity (Admin only)."""
+    stage = crud.update_stage_capacity(db, stage_id, update.capacity)
+    if not stage:
+        raise HTTPException(status_code=404, detail="Stage not found")
+    return stage
+
 # --- Contact Routes ---
 
 @app.get("/contacts", response_class=HTMLResponse)
@@ -935,6 +1398,19 @@ def admin_contacts_view(
         }
     )
 
+@app.get("/api/contacts/suggest", response_model=schemas.ContactSuggestions, response_model_exclude_none=True, tags=["API"])
+def suggest_contacts_api(
+    response: Response,
+    q: str = Query("", max_length=100),
+    limit: int = Query(contact_index.DEFAULT_SUGGESTIONS, ge=1, le=contact_index.MAX_SUGGESTIONS),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """ Type-ahead suggestions for the contact search (prefix match on words and phone digits). Requires login."""
+    items = contact_index.get_index(db).search(q, limit)
+    response.headers["Cache-Control"] = "private, max-age=10" # Repeated keystrokes are served by the browser
+    return {"q": q, "items": items}
+
 @app.post("/api/contacts", response_model=schemas.Contact, tags=["Admin API"])
 def create_contact_api(
     contact: schemas.ContactCreate,
@@ -942,7 +1418,9 @@ def create_contact_api(
     admin_user: models.User = Depends(get_admin_user)
 ):
     """Create a new contact (Admin only)."""
-    return crud.create_contact(db, contact)
+    db_contact = crud.create_contact(db, contact)
+    pubsub.publish("contact", {"action": "created", "id": db_contact.id})
+    return db_contact
 
 @app.put("/api/contacts/{contact_id}", response_model=schemas.Contact, tags=["Admin API"])
 def update_contact_api(
@@ -955,6 +1433,7 @@ def update_contact_api(
     updated_contact = crud.update_contact(db, contact_id, contact)
     if not updated_contact:
         raise HTTPException(status_code=404, detail="Contact not found")
+    pubsub.publish("contact", {"action": "updated", "id": contact_id})
     return updated_contact
 
 @app.delete("/api/contacts/{contact_id}", tags=["Admin API"])
@@ -966,4 +1445,5 @@ def delete_contact_api(
     """Delete a contact (Admin only)."""
     if not crud.delete_contact(db, contact_id):
         raise HTTPException(status_code=404, detail="Contact not found")
+    pubsub.publish("contact", {"action": "deleted", "id": contact_id})
     return {"message": "Contact deleted successfully"}
\ No newline at end of file
@@ -1,12 +1,14 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Boolean # Import SQLAlchemy components
-from sqlalchemy.orm import relationship, declarative_base # Import relationship and base
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Boolean, DDL, JSON, Index, event # Import SQLAlchemy components
+from sqlalchemy.orm import relationship, declarative_base, validates # Import relationship and base
 # from pydantic import BaseModel, Field # No longer needed here
 # from typing import Optional, Literal, List # No longer needed here
 from typing import Optional, Literal # Keep Optional for relationships, ADD Literal back
 from datetime import datetime
 from enum import Enum
 
+from .utils import DANISH_FOLDS, phone_digits
+
 # --- SQLAlchemy Setup --- 
 Base = declarative_base()
 # --- End SQLAlchemy Setup ---
@@ -43,7 +45,8 @@ class Stage(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
-    # Add other stage details if needed (capacity, location, etc.)
+    capacity = Column(Integer, nullable=True) # Audience capacity; weights the crowd-load scores in app/analytics.py
+    # Add other stage details if needed (location, etc.)
 
     # Relationships
     events = relationship("Event", back_populates="stage")
@@ -64,11 +67,16 @@ class Event(Base):
     artist = relationship("Artist", back_populates="events")
     stage = relationship("Stage", back_populates="events")
 
+    __table_args__ = (
+        Index("ix_events_stage_id_start_time", "stage_id", "start_time"), # Overview filter: one stage (and day)
+        Index("ix_events_artist_slug", "artist_slug"), # An artist's events (overview cards, artist page)
+    )
+
 class RiskAssessment(Base):
     __tablename__ = "risk_assessments"
 
     id = Column(Integer, primary_key=True, index=True)
-    artist_slug = Column(String, ForeignKey("artists.slug", ondelete="CASCADE"), unique=True, nullable=False, index=True)
+    artist_slug = Column(String, ForeignKey("artists.slug", ondelete="RESTRICT"), unique=True, nullable=False, index=True)
     risk_level = Column(SQLEnum('low', 'medium', 'high', name="risk_level_enum"), nullable=True)
     intensity_level = Column(SQLEnum('low', 'medium', 'high', name="intensity_level_enum"), nullable=True)
     density_level = Column(SQLEnum('low', 'medium', 'high', name="density_level_enum"), nullable=True)
@@ -99,9 +107,115 @@ class Contact(Base):
     role = Column(String, nullable=False, index=True)      # Stage Manager, Security, etc.
     name = Column(String, nullable=False, index=True)      # Person's name
     phone = Column(String, nullable=False, index=True)     # Phone number
+    phone_digits = Column(String, nullable=True, index=True) # Digits only ("23464319"), kept in sync with phone
     channel = Column(String, nullable=True)                # BLÅ KANAL 10, etc.
     notes = Column(Text, nullable=True)                    # Extra information
     sort_order = Column(Integer, default=0, index=True)    # For custom sorting
     is_active = Column(Boolean, default=True)              # To soft-delete contacts
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @validates("phone")
+    def _set_phone_digits(self, key, value):
+        self.phone_digits = phone_digits(value)
+        return value
+
+class ChangeLog(Base):
+    """Append-only log of data changes, read by the change feed (see app/change_log.py)."""
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True) # The version
+    entity = Column(String, nullable=False) # artist, event, assessment, contact
+    key = Column(String, nullable=False)
+    operation = Column(String, nullable=False) # upsert, delete
+    data = Column(JSON, nullable=True) # New values in compact form (None for deletes)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_change_log_entity_key_id", "entity", "key", "id"), # Compaction: newer row for the same key
+        Index("ix_change_log_entity_id", "entity", "id"), # Latest version per entity (crud.get_data_version)
+    )
+
+class ChangeLogCompaction(Base):
+    """One row per change-log compaction; the highest compacted_through is the snapshot boundary."""
+    __tablename__ = "change_log_compactions"
+
+    id = Column(Integer, primary_key=True)
+    compacted_through = Column(Integer, nullable=False, index=True)
+    removed = Column(Integer, nullable=False, default=0)
+    compacted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class SyncRun(Base):
+    """One row per artist/schedule sync (scripts/sync_artists_db.run_sync), read by app/sync_runs.py."""
+    __tablename__ = "sync_runs"
+
+    id = Column(Integer, primary_key=True)
+    trigger = Column(String, nullable=False) # scheduled, manual
+    status = Column(String, nullable=False) # running, success, failed
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    payload_bytes = Column(Integer, nullable=True) # Size of the API response body
+    # Phase durations in milliseconds (None if the run didn't get that far)
+    fetch_ms = Column(Float, nullable=True)
+    parse_ms = Column(Float, nullable=True)
+    artists_ms = Column(Float, nullable=True)
+    stages_ms = Column(Float, nullable=True)
+    events_ms = Column(Float, nullable=True)
+    commit_ms = Column(Float, nullable=True)
+    images_ms = Column(Float, nullable=True)
+    total_ms = Column(Float, nullable=True)
+    # Row counts: what the API returned and what each operation did
+    api_artists = Column(Integer, nullable=True)
+    api_events = Column(Integer, nullable=True)
+    artists_inserted = Column(Integer, nullable=True)
+    artists_updated = Column(Integer, nullable=True)
+    artists_deleted = Column(Integer, nullable=True)
+    stages_inserted = Column(Integer, nullable=True)
+    events_deleted = Column(Integer, nullable=True)
+    events_inserted = Column(Integer, nullable=True)
+    events_skipped = Column(Integer, nullable=True) # No stage or start time, or unparsable times
+    changes_logged = Column(Integer, nullable=True)
+
+# --- Contact full-text search (SQLite FTS5) ---
+# contacts_fts indexes name/role/category/phone plus the digits-only phone, with æ/ø/å folded to
+# ae/oe/aa (the unicode61 tokenizer handles case and other diacritics, but treats æ and ø as
+# separate letters). The triggers keep it in sync with contacts; rowid is the contact id.
+# alembic/versions/5c1e0f9a7b21_add_contact_full_text_search.py creates the same objects on
+# existing databases.
+
+def contact_fold_sql(column: str) -> str:
+    """SQL expression applying utils.fold_danish to a column (SQLite's lower() only folds ASCII)."""
+    expression = f"lower({column})"
+    for letter, replacement in DANISH_FOLDS:
+        expression = f"replace(replace({expression}, '{letter.upper()}', '{replacement}'), '{letter}', '{replacement}')"
+    return expression
+
+CONTACTS_FTS_COLUMNS = ("name", "role", "category", "phone", "phone_digits")
+CONTACTS_FTS_FOLDED_COLUMNS = ("name", "role", "category")
+
+def _contacts_fts_values(row: str) -> str:
+    values = [f"{row}.id"]
+    for column in CONTACTS_FTS_COLUMNS:
+        values.append(contact_fold_sql(f"{row}.{column}") if column in CONTACTS_FTS_FOLDED_COLUMNS else f"{row}.{column}")
+    return ", ".join(values)
+
+CONTACTS_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        {", ".join(CONTACTS_FTS_COLUMNS)}, tokenize = "unicode61 remove_diacritics 2")""",
+    f"""CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts (rowid, {", ".join(CONTACTS_FTS_COLUMNS)}) VALUES ({_contacts_fts_values("new")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+        DELETE FROM contacts_fts WHERE rowid = old.id;
+        INSERT INTO contacts_fts (rowid, {", ".join(CONTACTS_FTS_COLUMNS)}) VALUES ({_contacts_fts_values("new")});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+        DELETE FROM contacts_fts WHERE rowid = old.id;
+    END""",
+]
+
+# Tables created with Base.metadata.create_all (setup, synthetic data) get the index too
+for _statement in CONTACTS_FTS_DDL:
+    event.listen(Contact.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Contact.__table__, "before_drop", DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,109 @@
+"""
+Compact JSON index of the overview (`GET /api/overview-index`) for the client-side artist grid
+and schedule table on `/`.
+
+The page itself is rendered one page at a time on the server (see `read_root`); with JavaScript
+the script on the page loads this index once, filters it in memory and renders only the cards and
+rows in view. To keep the payload small, rows are arrays and repeated values are referenced by
+position:
+
+    {
+      "version": 1234,                            # change_log.head: the ETag of the response
+      "days": [["2025-08-06", "ons 6. aug 2025", "onsdag"], ...],  # Festival day, option label, day name
+      "stages": ["Bøgescenerne", ...],            # Stages with events, by name (no 'TBA')
+      "artists": [[slug, title, image key, nationality, updated, assessment], ...],  # By title
+      "events": [[artist, stage, day, start], ...],  # By start time
+    }
+
+  - `image key` is the image proxy's key (`/img/<slug>/<size>?v=<key>`), "" without an image.
+  - `updated` is the artist's update time, formatted as on the cards.
+  - `assessment` is null or [risk, intensity, density, updated (formatted)].
+  - An event's `artist`, `stage` and `day` are positions in "artists", "stages" and "days"
+    (stage -1 for TBA, day -1 without a start time); `start` is "YYYY-MM-DDTHH:MM". The page
+    shows a set as "<day name> HH:MM"; like the `datetimeformat_festival` filter, the day name is
+    capitalized for sets after midnight (which belong to the previous day's program).
+
+The serialised index is cached per change-log version, which moves with every change to artists,
+events and assessments, so it is built once per change and not per page view.
+"""
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import change_log, read_models
+from .datetime_format import DAY_NAMES, format_datetime
+from .image_proxy import url_key
+from .utils import get_festival_day
+
+ARTIST_UPDATED_FORMAT = "%a, %d %b %H:%M" # As the `datetimeformat` filter on the cards
+DAY_OPTION_FORMAT = "%a %-d. %b %Y" # As the date filter's options (overview_context)
+
+_cached: Optional[Tuple[int, bytes]] = None # (version, JSON)
+_cache_lock = threading.Lock()
+
+def build_index(db: Session, version: int) -> Dict[str, Any]:
+    """The overview index as a JSON-ready dict (two projection queries)."""
+    artist_rows = read_models.get_artists_with_assessments(db)
+    schedule = read_models.get_schedule(db)
+
+    artist_positions = {item.artist.slug: position for position, item in enumerate(artist_rows)}
+    artists: List[List[Any]] = []
+    for item in artist_rows:
+        artist, assessment = item.artist, item.assessment
+        artists.append([
+            artist.slug,
+            artist.title,
+            url_key(artist.image_url) if artist.image_url else "",
+            artist.nationality,
+            format_datetime(artist.updated_at, ARTIST_UPDATED_FORMAT) if artist.updated_at else None,
+            [
+                assessment.risk_level, assessment.intensity_level, assessment.density_level,
+                format_datetime(assessment.updated_at, ARTIST_UPDATED_FORMAT) if assessment.updated_at else None,
+            ] if assessment else None,
+        ])
+
+    festival_days = sorted({get_festival_day(entry.start_time).date() for entry in schedule if entry.start_time})
+    day_positions = {day: position for position, day in enumerate(festival_days)}
+    stage_names = sorted({entry.stage_name for entry in schedule if entry.stage_name and entry.stage_name != 'TBA'})
+    stage_positions = {name: position for position, name in enumerate(stage_names)}
+
+    events: List[List[Any]] = []
+    for entry in schedule:
+        if entry.artist_slug not in artist_positions:
+            continue # Event of an artist that is no longer in the lineup
+        events.append([
+            artist_positions[entry.artist_slug],
+            stage_positions.get(entry.stage_name, -1),
+            day_positions[get_festival_day(entry.start_time).date()] if entry.start_time else -1,
+            entry.start_time.isoformat(timespec="minutes") if entry.start_time else None,
+        ])
+
+    return {
+        "version": version,
+        "days": [
+            [day.isoformat(), format_datetime(day.isoformat(), DAY_OPTION_FORMAT), DAY_NAMES[day.weekday()]]
+            for day in festival_days
+        ],
+        "stages": stage_names,
+        "artists": artists,
+        "events": events,
+    }
+
+def get_index_json(db: Session, version: Optional[int] = None) -> Tuple[int, bytes]:
+    """(version, serialised index) for the current data, rebuilt only when the version moved."""
+    global _cached
+    if version is None:
+        version = change_log.head(db)
+    cached = _cached
+    if cached is not None and cached[0] == version:
+        return cached
+    with _cache_lock:
+        if _cached is None or _cached[0] != version:
+            index = build_index(db, version)
+            _cached = (version, json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        return _cached
+
+def etag(version: int) -> str:
+    return f'"overview-{version}"'
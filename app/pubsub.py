@@ -0,0 +1,144 @@
+"""
+In-process publish/subscribe for live updates, streamed to browsers as Server-Sent Events
+(`GET /api/stream`).
+
+Publishers call `publish(event_type, data)` after their change is committed: the assessment
+routes, the contact routes and `run_sync` (with a diff summary). They may run on any thread (the
+threadpool of the sync routes, the APScheduler thread), so every message is handed to each
+subscriber's event loop with `call_soon_threadsafe` and put on that subscriber's bounded queue.
+
+  - At most MAX_CLIENTS streams are open at once. The route checks `check_capacity()` first and
+    answers 503 with Retry-After when it raises TooManySubscribers. The stream registers itself
+    only once its body starts (`stream()`), in the same generator that unregisters it, so a
+    response that is never sent can't hold a slot.
+  - A subscriber whose queue is full (a stalled tab) gets its backlog replaced by one "resync"
+    message, so a slow client never holds memory or slows down the others.
+  - The last REPLAY_SIZE messages are kept, so a browser reconnecting with Last-Event-ID gets what
+    it missed; if its id is too old or from before a restart it gets "resync" instead.
+  - Streams send a "heartbeat" event every HEARTBEAT_SECONDS; it keeps proxies from closing an idle
+    connection and lets the page notice a dead one.
+
+Messages only reach the browsers connected to this process. With several workers each worker
+broadcasts its own changes, and pages still get the hourly sync from the worker that ran it.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+MAX_CLIENTS = 200
+QUEUE_SIZE = 100 # Messages waiting per subscriber before it is told to resync
+REPLAY_SIZE = 200 # Recent messages kept for reconnecting browsers
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 5000 # Reconnect delay suggested to EventSource
+
+BOOT_ID = format(int(time.time()), "x") # Makes message ids from before a restart recognisable
+
+class TooManySubscribers(Exception):
+    """Raised by check_capacity() and subscribe() when MAX_CLIENTS streams are already open."""
+
+class Subscriber:
+    """One open stream: a queue on the event loop serving it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Tuple[str, str, str]]" = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, message: Tuple[str, str, str]) -> None:
+        """Runs on the subscriber's loop. Replaces the backlog with a resync if the queue is full."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(resync_message())
+
+_subscribers: Set[Subscriber] = set()
+_recent: Deque[Tuple[str, str, str]] = deque(maxlen=REPLAY_SIZE) # (id, event type, JSON data)
+_counter = itertools.count(1)
+_lock = threading.Lock()
+
+def format_sse(message: Tuple[str, str, str]) -> str:
+    """One SSE frame. The id is left out for resync/heartbeat so they don't move Last-Event-ID."""
+    message_id, event_type, data = message
+    id_line = f"id: {message_id}\n" if message_id else ""
+    return f"{id_line}event: {event_type}\ndata: {data}\n\n"
+
+def resync_message() -> Tuple[str, str, str]:
+    return ("", "resync", "{}")
+
+def heartbeat_message() -> Tuple[str, str, str]:
+    return ("", "heartbeat", json.dumps({"t": int(time.time())}))
+
+def publish(event_type: str, data: Dict[str, Any]) -> None:
+    """Sends a message to every open stream. Safe to call from any thread; never blocks."""
+    payload = json.dumps(data, separators=(",", ":"), default=str)
+    with _lock:
+        message = (f"{BOOT_ID}-{next(_counter)}", event_type, payload)
+        _recent.append(message)
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        try:
+            subscriber.loop.call_soon_threadsafe(subscriber.deliver, message)
+        except RuntimeError: # Loop already closed (server shutting down)
+            pass
+
+def subscribe(last_event_id: Optional[str] = None) -> Tuple[Subscriber, List[Tuple[str, str, str]]]:
+    """
+    Registers a stream on the running event loop. Returns the subscriber and the messages to send
+    first: the ones after `last_event_id`, or a resync if those are no longer known.
+    """
+    subscriber = Subscriber(asyncio.get_running_loop())
+    with _lock:
+        if len(_subscribers) >= MAX_CLIENTS:
+            raise TooManySubscribers()
+        _subscribers.add(subscriber)
+        backlog: List[Tuple[str, str, str]] = []
+        if last_event_id:
+            ids = [message[0] for message in _recent]
+            if last_event_id in ids:
+                backlog = list(_recent)[ids.index(last_event_id) + 1:]
+            else:
+                backlog = [resync_message()]
+    return subscriber, backlog
+
+def unsubscribe(subscriber: Subscriber) -> None:
+    with _lock:
+        _subscribers.discard(subscriber)
+
+def subscriber_count() -> int:
+    with _lock:
+        return len(_subscribers)
+
+def check_capacity() -> None:
+    """Raises TooManySubscribers if MAX_CLIENTS streams are already open."""
+    with _lock:
+        if len(_subscribers) >= MAX_CLIENTS:
+            raise TooManySubscribers()
+
+async def stream(last_event_id: Optional[str] = None):
+    """
+    The SSE body of one stream: subscribes, then sends the retry hint, the backlog after
+    `last_event_id`, then messages and heartbeats until cancelled, and unsubscribes.
+    """
+    try:
+        subscriber, backlog = subscribe(last_event_id)
+    except TooManySubscribers:
+        # Filled up since the route's check_capacity(): end the stream, EventSource reconnects later
+        yield f"retry: {RETRY_MILLISECONDS * 6}\n\n"
+        return
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        for message in backlog:
+            yield format_sse(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                message = heartbeat_message()
+            yield format_sse(message)
+    finally:
+        unsubscribe(subscriber)
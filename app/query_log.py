@@ -0,0 +1,183 @@
+"""
+Slow-query log for the SQLAlchemy engine.
+
+Every statement executed through `app.database.engine` is timed. Statements that take
+longer than SLOW_QUERY_THRESHOLD_MS are logged with their parameters, duration, the
+route that triggered them and (on SQLite) the `EXPLAIN QUERY PLAN` output. The most
+recent samples are kept in a bounded ring buffer that the admin API can dump.
+
+Configuration (environment variables):
+    SLOW_QUERY_THRESHOLD_MS  Threshold in milliseconds (default 100). 0 logs every
+                             statement, a negative value disables the log.
+    SLOW_QUERY_LOG_SIZE      Number of samples kept in the ring buffer (default 200).
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+
+# Statements that EXPLAIN QUERY PLAN can describe without executing them
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+MAX_PARAM_LENGTH = 200 # Truncate long string parameters (e.g. descriptions) in samples
+
+# Route ("GET /calendar") of the request currently being handled, set by RouteContextMiddleware
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+# --- Ring Buffer ---
+_samples: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_samples_lock = threading.Lock()
+
+def get_samples() -> List[Dict[str, Any]]:
+    """Returns the recorded slow-query samples, newest first."""
+    with _samples_lock:
+        return list(reversed(_samples))
+
+def clear_samples() -> int:
+    """Empties the ring buffer. Returns the number of samples removed."""
+    with _samples_lock:
+        removed = len(_samples)
+        _samples.clear()
+    return removed
+
+# --- Helpers ---
+def _safe_param(value: Any) -> Any:
+    """Converts a bound parameter to something JSON serialisable and reasonably short."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= MAX_PARAM_LENGTH else value[:MAX_PARAM_LENGTH] + "..."
+    if isinstance(value, (list, tuple)):
+        return [_safe_param(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _safe_param(v) for k, v in value.items()}
+    return _safe_param(str(value))
+
+def _explain_query_plan(cursor, statement: str, parameters) -> Optional[List[str]]:
+    """Runs EXPLAIN QUERY PLAN on the DBAPI connection of `cursor` (SQLite only)."""
+    if not statement.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+        return None
+    try:
+        explain_cursor = cursor.connection.cursor()
+        try:
+            rows = explain_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        finally:
+            explain_cursor.close()
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+
+    # Rows are (id, parent, notused, detail); indent each step below its parent
+    depth = {0: -1}
+    plan = []
+    for row_id, parent, _notused, detail in rows:
+        depth[row_id] = depth.get(parent, -1) + 1
+        plan.append("  " * depth[row_id] + detail)
+    return plan
+
+# --- Engine Event Handlers ---
+# The start time is kept on the statement's execution context, which is discarded with the
+# statement: a statement that raises (after_cursor_execute doesn't fire) leaves nothing behind on the
+# pooled connection. Statements without a context (rare, internal) aren't timed.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    if SLOW_QUERY_THRESHOLD_MS < 0 or duration_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    query_plan = None
+    if conn.dialect.name == "sqlite" and not executemany:
+        query_plan = _explain_query_plan(cursor, statement, parameters)
+
+    sample = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration_ms, 3),
+        "route": current_route.get(),
+        "statement": statement,
+        "parameters": _safe_param(parameters),
+        "executemany": executemany,
+        "query_plan": query_plan,
+    }
+    with _samples_lock:
+        _samples.append(sample)
+
+    logger.warning(
+        "Slow query (%.1f ms) on %s: %s | params=%s | plan=%s",
+        duration_ms, sample["route"] or "<no route>", " ".join(statement.split()),
+        sample["parameters"], " / ".join(query_plan) if query_plan else "n/a",
+    )
+
+def install(engine: Engine):
+    """Attaches the timing hooks to `engine`. Safe to call more than once."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# --- Query Counting ---
+class QueryCounter:
+    """Statements executed inside a `count_queries` block."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryCounter]:
+    """
+    Counts every statement executed on `engine` while the block runs (from any thread,
+    so it also sees queries issued by a TestClient request).
+
+        with count_queries(engine) as counter:
+            client.get("/")
+        assert counter.count <= 4
+    """
+    counter = QueryCounter()
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(" ".join(statement.split()))
+
+    event.listen(engine, "after_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "after_cursor_execute", _count)
+
+# --- ASGI Middleware ---
+class RouteContextMiddleware:
+    """Records "METHOD /path" of the current request so slow queries can be traced back to a route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_route.set(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
@@ -0,0 +1,234 @@
+"""
+Read models for the template routes.
+
+The overview and admin pages only need a handful of columns per artist, but loading ORM entities
+pulls in every column (including the `description` text blob), registers each object in the
+session's identity map and leaves lazy loads one attribute access away from a template.
+The functions here use Core `select()` with explicit column projections and return frozen,
+slotted dataclasses: cheap to build, immutable, and with no relationships to lazy-load.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, FrozenSet, Generic, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .datetime_format import FESTIVAL_DAY_START_HOUR
+
+artists = models.Artist.__table__
+events = models.Event.__table__
+stages = models.Stage.__table__
+assessments = models.RiskAssessment.__table__
+
+# --- Row Objects ---
+
+@dataclass(frozen=True, slots=True)
+class ArtistSummary:
+    slug: str
+    title: str
+    image_url: Optional[str]
+    nationality: Optional[str]
+    updated_at: Optional[datetime]
+
+@dataclass(frozen=True, slots=True)
+class AssessmentSummary:
+    artist_slug: str
+    risk_level: Optional[str]
+    intensity_level: Optional[str]
+    density_level: Optional[str]
+    remarks: Optional[str]
+    crowd_profile: Optional[str]
+    notes: Optional[str]
+    updated_at: Optional[datetime]
+
+@dataclass(frozen=True, slots=True)
+class ArtistWithAssessment:
+    artist: ArtistSummary
+    assessment: Optional[AssessmentSummary] # None if the artist hasn't been assessed yet
+
+@dataclass(frozen=True, slots=True)
+class ScheduleEntry:
+    event_id: int
+    start_time: datetime
+    end_time: Optional[datetime]
+    artist_slug: str
+    artist_title: Optional[str]
+    artist_image_url: Optional[str]
+    stage_name: Optional[str]
+    risk_level: Optional[str] # Risk level of the artist's assessment, None if not assessed
+
+T = TypeVar("T")
+
+@dataclass(frozen=True, slots=True)
+class Page(Generic[T]):
+    items: List[T]
+    total: int # Matching rows on all pages
+    page: int # 1-based
+    page_size: int
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+
+    @property
+    def first(self) -> int:
+        """1-based position of the first item on this page (0 if the page is empty)."""
+        return (self.page - 1) * self.page_size + 1 if self.items else 0
+
+    @property
+    def last(self) -> int:
+        return self.first + len(self.items) - 1 if self.items else 0
+
+@dataclass(frozen=True)
+class OverviewFilters:
+    """The overview's filters; None means "all"."""
+    festival_day: Optional[date] = None # Events from 06:00 that day to 05:59 the next
+    stage: Optional[str] = None # Stage name
+    risk: Optional[str] = None # "low", "medium", "high", or "none" for artists without a risk level
+    artist_slugs: Optional[FrozenSet[str]] = None # Result of the name search
+
+# --- Queries ---
+
+ARTIST_COLUMNS = (artists.c.slug, artists.c.title, artists.c.image_url, artists.c.nationality, artists.c.updated_at)
+ASSESSMENT_COLUMNS = (
+    assessments.c.artist_slug, assessments.c.risk_level, assessments.c.intensity_level, assessments.c.density_level,
+    assessments.c.remarks, assessments.c.crowd_profile, assessments.c.notes, assessments.c.updated_at,
+)
+
+def _artist_with_assessment(row: Any) -> ArtistWithAssessment:
+    num_artist_columns = len(ARTIST_COLUMNS)
+    assessment_values = row[num_artist_columns:num_artist_columns + len(ASSESSMENT_COLUMNS)]
+    return ArtistWithAssessment(
+        artist=ArtistSummary(*row[:num_artist_columns]),
+        # The assessment columns are all NULL when the LEFT JOIN found no assessment
+        assessment=AssessmentSummary(*assessment_values) if assessment_values[0] is not None else None,
+    )
+
+def _artists_select(*extra_columns: Any) -> Select:
+    return (
+        select(*ARTIST_COLUMNS, *ASSESSMENT_COLUMNS, *extra_columns)
+        .select_from(artists.outerjoin(assessments, assessments.c.artist_slug == artists.c.slug))
+        .order_by(artists.c.title, artists.c.id)
+    )
+
+def get_artists_with_assessments(db: Session) -> List[ArtistWithAssessment]:
+    """All artists ordered by title, each with its assessment (if any), in a single LEFT JOIN."""
+    return [_artist_with_assessment(row) for row in db.execute(_artists_select())]
+
+def _schedule_select(*extra_columns: Any) -> Select:
+    return (
+        select(
+            events.c.event_id, events.c.start_time, events.c.end_time, events.c.artist_slug,
+            artists.c.title, artists.c.image_url, stages.c.name, assessments.c.risk_level, *extra_columns,
+        )
+        .select_from(
+            events
+            .outerjoin(artists, artists.c.slug == events.c.artist_slug)
+            .outerjoin(stages, stages.c.id == events.c.stage_id)
+            .outerjoin(assessments, assessments.c.artist_slug == events.c.artist_slug)
+        )
+        .order_by(events.c.start_time, events.c.event_id)
+    )
+
+def get_schedule(db: Session) -> List[ScheduleEntry]:
+    """All events ordered by start time, with the artist's title/image, stage name and risk level."""
+    return [ScheduleEntry(*row) for row in db.execute(_schedule_select())]
+
+def get_schedule_for_artists(db: Session, artist_slugs: List[str]) -> List[ScheduleEntry]:
+    """The events of the given artists, ordered by start time (for the artist cards of one page)."""
+    if not artist_slugs:
+        return []
+    return [ScheduleEntry(*row) for row in db.execute(_schedule_select().where(events.c.artist_slug.in_(artist_slugs)))]
+
+def group_schedule_by_artist(schedule: List[ScheduleEntry]) -> Dict[str, Tuple[ScheduleEntry, ...]]:
+    """Groups schedule entries by artist slug, keeping start-time order."""
+    grouped: Dict[str, List[ScheduleEntry]] = {}
+    for entry in schedule:
+        grouped.setdefault(entry.artist_slug, []).append(entry)
+    return {slug: tuple(entries) for slug, entries in grouped.items()}
+
+def get_artist_image_url(db: Session, slug: str) -> Optional[str]:
+    """The artist's upstream image URL; None if the artist doesn't exist or has no image."""
+    return db.execute(select(artists.c.image_url).where(artists.c.slug == slug)).scalar_one_or_none()
+
+def get_image_urls(db: Session) -> List[str]:
+    """Every distinct upstream image URL in use (for prewarming the image proxy)."""
+    stmt = select(artists.c.image_url).where(artists.c.image_url.is_not(None)).distinct()
+    return [url for url in db.execute(stmt).scalars() if url]
+
+# --- Filtered, paginated overview ---
+
+def festival_day_bounds(festival_day: date) -> Tuple[datetime, datetime]:
+    """[start, end) of a festival day: 06:00 that day to 06:00 the next (crud.get_events_for_festival_day)."""
+    start = datetime.combine(festival_day, time(FESTIVAL_DAY_START_HOUR))
+    return start, start + timedelta(days=1)
+
+def _event_conditions(filters: OverviewFilters) -> List[Any]:
+    """WHERE conditions on `events` for the day and stage filters (served by ix_events_stage_id_start_time)."""
+    conditions = []
+    if filters.festival_day is not None:
+        start, end = festival_day_bounds(filters.festival_day)
+        conditions += [events.c.start_time >= start, events.c.start_time < end]
+    if filters.stage is not None:
+        conditions.append(events.c.stage_id == select(stages.c.id).where(stages.c.name == filters.stage).scalar_subquery())
+    return conditions
+
+def _risk_condition(risk: str) -> Any:
+    # NULL both for artists without an assessment (LEFT JOIN) and for assessments without a risk level
+    return assessments.c.risk_level.is_(None) if risk == "none" else assessments.c.risk_level == risk
+
+def _paginate(db: Session, stmt: Select, page: int, page_size: int, build: Callable[[Any], T]) -> Page[T]:
+    """
+    One page of `stmt`, whose last column must be `count() OVER ()` (the total, in the same query).
+    A page past the end is replaced by the last page.
+    """
+    rows = db.execute(stmt.limit(page_size).offset((page - 1) * page_size)).all()
+    if not rows and page > 1:
+        total = db.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar_one()
+        last_page = max(1, -(-total // page_size))
+        if last_page < page:
+            return _paginate(db, stmt, last_page, page_size, build)
+    total = rows[0][-1] if rows else 0
+    return Page([build(row[:-1]) for row in rows], total, page, page_size)
+
+def get_artists_page(db: Session, filters: OverviewFilters, page: int, page_size: int) -> Page[ArtistWithAssessment]:
+    """
+    Artists matching the filters, by title. The day and stage filters keep artists with at least
+    one event on that day and stage; the risk filter looks at the artist's assessment.
+    """
+    if filters.artist_slugs is not None and not filters.artist_slugs:
+        return Page([], 0, 1, page_size) # The name search found nothing
+    stmt = _artists_select(func.count().over())
+    conditions = _event_conditions(filters)
+    if conditions:
+        stmt = stmt.where(artists.c.slug.in_(select(events.c.artist_slug).where(*conditions)))
+    if filters.risk is not None:
+        stmt = stmt.where(_risk_condition(filters.risk))
+    if filters.artist_slugs is not None:
+        stmt = stmt.where(artists.c.slug.in_(filters.artist_slugs))
+    return _paginate(db, stmt, page, page_size, _artist_with_assessment)
+
+def get_schedule_page(db: Session, filters: OverviewFilters, page: int, page_size: int) -> Page[ScheduleEntry]:
+    """Events matching the filters, by start time."""
+    if filters.artist_slugs is not None and not filters.artist_slugs:
+        return Page([], 0, 1, page_size)
+    stmt = _schedule_select(func.count().over())
+    conditions = _event_conditions(filters)
+    if conditions:
+        stmt = stmt.where(*conditions)
+    if filters.risk is not None:
+        stmt = stmt.where(_risk_condition(filters.risk))
+    if filters.artist_slugs is not None:
+        stmt = stmt.where(events.c.artist_slug.in_(filters.artist_slugs))
+    return _paginate(db, stmt, page, page_size, lambda row: ScheduleEntry(*row))
+
+def get_stage_names_with_events(db: Session) -> List[str]:
+    """Names of the stages that have events, by name, without the 'TBA' placeholder (the stage filter's options)."""
+    stmt = (
+        select(stages.c.name)
+        .where(stages.c.name != 'TBA', select(events.c.event_id).where(events.c.stage_id == stages.c.id).exists())
+        .order_by(stages.c.name)
+    )
+    return list(db.execute(stmt).scalars())
@@ -0,0 +1,174 @@
+"""
+"Now and next" per stage (`GET /api/now-next` and the `/now` page) from an in-memory schedule index.
+
+For every stage the events are kept sorted by start time with their effective end time (the
+scheduled end, or DEFAULT_SET_LENGTH after the start when the API has none, capped at the next
+set on the stage) and a running maximum of those ends. "What is playing at t" is a `bisect` on the
+start times followed by a walk back that stops as soon as the running maximum end is <= t, and
+"the next N sets" is a `bisect` and a slice.
+
+The walk back is not O(log n) in general: it continues while max_ends[i] > t, so one long set
+(say an all-day DJ booth listed from noon to midnight) keeps it going over every later set on the
+stage that started by t, including those already over. A stage schedule is a few dozen sets that
+rarely overlap, so in practice it visits one or two.
+
+The index only holds the schedule; risk, intensity and density change between syncs and are read
+for the handful of returned artists on every request. The index is rebuilt when the schedule
+changes: `invalidate()` is called after `run_sync` commits, and `get_index()` compares
+`crud.get_data_version` with the version it was built from.
+"""
+import bisect
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .versioned_cache import VersionedCache
+
+DEFAULT_SET_LENGTH = timedelta(hours=1) # Same assumption as the calendar views for sets without an end time
+DEFAULT_NEXT = 3
+MAX_NEXT = 10
+FESTIVAL_TIMEZONE = "Europe/Copenhagen" # Event times from the API are naive local festival times
+
+events = models.Event.__table__
+artists = models.Artist.__table__
+stages = models.Stage.__table__
+assessments = models.RiskAssessment.__table__
+
+def festival_now() -> datetime:
+    """The current festival-local time, naive like the event times."""
+    try:
+        return datetime.now(ZoneInfo(FESTIVAL_TIMEZONE)).replace(tzinfo=None)
+    except ZoneInfoNotFoundError: # No tz database in the container; assume the server runs on local time
+        return datetime.now()
+
+@dataclass(frozen=True, slots=True)
+class ScheduledSet:
+    event_id: int
+    artist_slug: str
+    artist_title: Optional[str]
+    start_time: datetime
+    end_time: datetime # Effective end time
+    end_time_estimated: bool # True if the API had no end time
+
+class StageTimeline:
+    """The sets of one stage, sorted by start time."""
+
+    def __init__(self, name: str, sets: List[ScheduledSet]):
+        self.name = name
+        self.sets = sets
+        self.starts = [s.start_time for s in sets]
+        self.max_ends: List[datetime] = []
+        for s in sets:
+            self.max_ends.append(max(s.end_time, self.max_ends[-1]) if self.max_ends else s.end_time)
+
+    def playing(self, at: datetime) -> Optional[ScheduledSet]:
+        """
+        The set playing at `at` (the latest started one if sets overlap), or None. Walks back from
+        the last set started by `at` while max_ends[i] > at, so it visits every set since the
+        earliest one still playing (see the module docstring).
+        """
+        i = bisect.bisect_right(self.starts, at) - 1
+        while i >= 0 and self.max_ends[i] > at:
+            if self.sets[i].end_time > at:
+                return self.sets[i]
+            i -= 1
+        return None
+
+    def upcoming(self, at: datetime, count: int) -> List[ScheduledSet]:
+        """The next `count` sets starting after `at`."""
+        i = bisect.bisect_right(self.starts, at)
+        return self.sets[i:i + count]
+
+class ScheduleIndex:
+    """One StageTimeline per stage (the 'TBA' placeholder stage is left out, as in the calendar)."""
+
+    def __init__(self, rows: List[Any], version: Tuple[Any, ...]):
+        self.version = version
+        by_stage: Dict[str, List[Any]] = {}
+        for row in rows:
+            if row.stage_name and row.stage_name != 'TBA':
+                by_stage.setdefault(row.stage_name, []).append(row)
+        self.timelines: List[StageTimeline] = []
+        for name in sorted(by_stage):
+            stage_rows = by_stage[name] # Already ordered by start time
+            sets = []
+            for i, row in enumerate(stage_rows):
+                end_time = row.end_time
+                if end_time is None:
+                    end_time = row.start_time + DEFAULT_SET_LENGTH
+                    if i + 1 < len(stage_rows):
+                        end_time = min(end_time, max(stage_rows[i + 1].start_time, row.start_time))
+                sets.append(ScheduledSet(row.event_id, row.artist_slug, row.title, row.start_time, end_time,
+                                         row.end_time is None))
+            self.timelines.append(StageTimeline(name, sets))
+
+def build_index(db: Session, version: Optional[Tuple[Any, ...]] = None) -> ScheduleIndex:
+    """Loads the whole schedule (one projection query) and builds a fresh index."""
+    if version is None:
+        version = crud.get_data_version(db)
+    rows = db.execute(
+        select(events.c.event_id, events.c.start_time, events.c.end_time, events.c.artist_slug,
+               artists.c.title, stages.c.name.label("stage_name"))
+        .select_from(
+            events
+            .outerjoin(artists, artists.c.slug == events.c.artist_slug)
+            .outerjoin(stages, stages.c.id == events.c.stage_id)
+        )
+        .order_by(events.c.start_time, events.c.event_id)
+    ).all()
+    return ScheduleIndex(rows, version)
+
+_cache: VersionedCache[ScheduleIndex] = VersionedCache(build_index, crud.get_data_version)
+
+def get_index(db: Session) -> ScheduleIndex:
+    """Returns the current index, rebuilding it if the schedule changed since it was built."""
+    return _cache.get(db)
+
+def invalidate() -> None:
+    """Drops the index; the next request rebuilds it."""
+    _cache.invalidate()
+
+def get_now_next(db: Session, at: datetime, count: int = DEFAULT_NEXT) -> List[Dict[str, Any]]:
+    """
+    For every stage with something playing at `at` or still to come: the current set and the
+    next `count` sets, each with the artist's risk, intensity and density levels.
+    """
+    stage_sets = []
+    for timeline in get_index(db).timelines:
+        now = timeline.playing(at)
+        upcoming = timeline.upcoming(at, count)
+        if now or upcoming:
+            stage_sets.append((timeline.name, now, upcoming))
+
+    # Assessment levels for just the artists shown (one query)
+    slugs = {s.artist_slug for _, now, upcoming in stage_sets for s in ([now] if now else []) + upcoming}
+    levels: Dict[str, Dict[str, Optional[str]]] = {}
+    if slugs:
+        for row in db.execute(
+            select(assessments.c.artist_slug, assessments.c.risk_level, assessments.c.intensity_level,
+                   assessments.c.density_level)
+            .where(assessments.c.artist_slug.in_(slugs))
+        ):
+            levels[row.artist_slug] = {"risk_level": row.risk_level, "intensity_level": row.intensity_level,
+                                       "density_level": row.density_level}
+
+    def as_dict(s: ScheduledSet) -> Dict[str, Any]:
+        return {
+            "event_id": s.event_id,
+            "artist_slug": s.artist_slug,
+            "artist_title": s.artist_title or s.artist_slug,
+            "start_time": s.start_time,
+            "end_time": s.end_time,
+            "end_time_estimated": s.end_time_estimated,
+            **levels.get(s.artist_slug, {"risk_level": None, "intensity_level": None, "density_level": None}),
+        }
+
+    return [
+        {"stage": name, "now": as_dict(now) if now else None, "next": [as_dict(s) for s in upcoming]}
+        for name, now, upcoming in stage_sets
+    ]
@@ -1,6 +1,6 @@
-from datetime import datetime
-from typing import List, Optional, Literal
-from pydantic import BaseModel
+from datetime import datetime, date as Date
+from typing import Any, Dict, List, Optional, Literal
+from pydantic import BaseModel, Field
 from .models import UserRoleEnum # Import UserRoleEnum
 
 # --- Enums and Literals --- 
@@ -26,6 +26,7 @@ class ArtistBase(BaseModel):
 
 class StageBase(BaseModel):
     name: str
+    capacity: Optional[int] = None # Audience capacity, weights the crowd-load scores
 
 class EventBase(BaseModel):
     start_time: datetime
@@ -132,6 +133,157 @@ class ArtistAssessmentAdminItem(BaseModel):
     assessment: RiskAssessment | None # Nested assessment info
     model_config = {"from_attributes": True} # Needed if created from ORM objects
 
+# --- Keyset-Paginated List Responses ---
+# next_cursor is None on the last page; pass it back as ?cursor= to get the next one.
+class ArtistPage(BaseModel):
+    items: List[Artist]
+    next_cursor: Optional[str] = None
+
+class EventPage(BaseModel):
+    items: List[Event]
+    next_cursor: Optional[str] = None
+
+class RiskAssessmentPage(BaseModel):
+    items: List[RiskAssessment]
+    next_cursor: Optional[str] = None
+
+# --- Batch Assessment Save ---
+MAX_ASSESSMENT_BATCH_SIZE = 1000
+
+class RiskAssessmentBatchItem(RiskAssessmentBase):
+    artist_slug: str
+
+class RiskAssessmentBatch(BaseModel):
+    items: List[RiskAssessmentBatchItem] = Field(..., min_length=1, max_length=MAX_ASSESSMENT_BATCH_SIZE)
+
+class RiskAssessmentBatchResult(BaseModel):
+    artist_slug: str
+    status: Literal['saved', 'not_found', 'duplicate'] # 'duplicate': a later item for the same artist won
+    assessment: Optional[RiskAssessment] = None
+
+class RiskAssessmentBatchResponse(BaseModel):
+    saved: int
+    failed: int
+    results: List[RiskAssessmentBatchResult] # Same order as the request items
+
+# --- Fuzzy Artist Search ---
+class ArtistSearchResult(BaseModel):
+    slug: str
+    title: str
+    image_url: Optional[str] = None
+    score: float # Share of the query's trigrams found in the artist's title/slug (0-1)
+
+class ArtistSearchResults(BaseModel):
+    q: str
+    items: List[ArtistSearchResult]
+
+# --- Analytics ---
+class StageCapacityUpdate(BaseModel):
+    capacity: Optional[int] = Field(None, ge=0) # None clears the capacity
+
+class AnalyticsStage(BaseModel):
+    name: str
+    capacity: Optional[int] = None
+    weight: float # capacity / median capacity (1.0 without a capacity)
+
+class AnalyticsPeak(BaseModel):
+    start: datetime
+    end: datetime
+    load: float
+    max_high_acts: int # Most simultaneous sets with a 'high' level in the window
+    stages: List[str] # Stages contributing most to the load
+
+class AnalyticsDay(BaseModel):
+    date: Date
+    stages: List[AnalyticsStage]
+    slots: List[datetime] # Start of each 15-minute slot
+    load: List[List[float]] # [slot][stage]
+    total: List[float] # Per slot
+    high_acts: List[int] # Per slot
+    max_load: float
+    peaks: List[AnalyticsPeak]
+    unassessed_sets: int
+
+# --- Now & Next ---
+class NowNextSet(BaseModel):
+    event_id: int
+    artist_slug: str
+    artist_title: str
+    start_time: datetime
+    end_time: datetime
+    end_time_estimated: bool # The API had no end time; end_time is the default set length (or the next set's start)
+    risk_level: Optional[RiskAssessmentLevelEnum] = None
+    intensity_level: Optional[RiskAssessmentLevelEnum] = None
+    density_level: Optional[RiskAssessmentLevelEnum] = None
+
+class StageNowNext(BaseModel):
+    stage: str
+    now: Optional[NowNextSet] = None
+    next: List[NowNextSet]
+
+class NowNext(BaseModel):
+    at: datetime
+    stages: List[StageNowNext]
+
+# --- Contact Type-Ahead ---
+class ContactSuggestion(BaseModel):
+    id: int
+    name: str
+    role: str
+    category: str
+    phone: str
+    channel: Optional[str] = None
+
+class ContactSuggestions(BaseModel):
+    q: str
+    items: List[ContactSuggestion]
+
+# --- Change Feed ---
+class ChangeEntry(BaseModel):
+    version: int
+    entity: Literal['artist', 'event', 'assessment', 'contact']
+    key: str
+    operation: Literal['upsert', 'delete']
+    changed_at: datetime
+    data: Optional[Dict[str, Any]] = None
+
+class ChangeFeed(BaseModel):
+    since: int
+    next_since: int # Pass back as ?since= for the next batch
+    has_more: bool
+    reset: bool # since was before the compacted part: drop the local copy and apply from the start
+    compacted_through: int
+    reset_through: Optional[int] = None # Set while a reset read continues: pass back as ?reset_through=
+    changes: List[ChangeEntry]
+
+
+# --- Sync Run History ---
+class SyncRunAnomaly(BaseModel):
+    code: Literal['failed', 'unfinished', 'no_events', 'artist_drop', 'event_drop']
+    error: Optional[str] = None # failed
+    value: Optional[int] = None # artist_drop, event_drop: this run's count ...
+    baseline: Optional[float] = None # ... the median of the runs before it ...
+    change: Optional[float] = None # ... and the relative change (-0.25 = 25% fewer)
+
+class SyncRun(BaseModel):
+    id: int
+    trigger: str
+    status: Literal['running', 'success', 'failed']
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    payload_bytes: Optional[int] = None
+    phases_ms: Dict[str, Optional[float]] # fetch, parse, artists, stages, events, commit, images
+    total_ms: Optional[float] = None
+    counts: Dict[str, Optional[int]] # api_artists, api_events and the rows of every operation
+    anomalies: List[SyncRunAnomaly]
+
+class SyncRunHistory(BaseModel):
+    baseline_runs: int
+    drop_threshold: float
+    count: int
+    runs: List[SyncRun] # Newest first
+
 
 # --- Update Schemas (Optional - Define if needed) ---
 # Example:
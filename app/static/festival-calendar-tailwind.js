@@ -177,6 +177,14 @@ class FestivalCalendar {
         this.options.events.forEach(event => { this.renderEvent(event); });
     }
 
+    // Re-renders with new data (live updates) without creating a new calendar; `options` may
+    // carry scenes, events, dayStartTime and dayEndTime
+    update(options) {
+        Object.assign(this.options, options);
+        this.resolveDayBoundaries();
+        this.render();
+    }
+
     renderTimeAxis() {
         // ... (samme som før)
         const timeAxisEl = document.createElement('div');
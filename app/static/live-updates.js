@@ -0,0 +1,99 @@
+// Live updates from /api/stream (Server-Sent Events).
+//
+// LiveUpdates.connect({ assessment(data), sync(data), contact(data), resync() }) opens the stream and
+// calls the handler for each message type. EventSource reconnects by itself after a dropped
+// connection (sending Last-Event-ID, so missed messages are replayed); on top of that:
+//   - no message (not even the server's heartbeat) for STALE_MS: the connection is assumed dead and reopened,
+//   - the server refused the stream (e.g. 503 when too many tabs are connected): retried after REFUSED_RETRY_MS,
+//   - the tab has been hidden for HIDDEN_CLOSE_MS: the stream is closed to free the connection and reopened,
+//     with the last seen id, when the tab becomes visible again.
+// An element with id "live-status" (optional) shows the connection state.
+const LiveUpdates = (() => {
+    const STALE_MS = 45000; // Three missed heartbeats
+    const REFUSED_RETRY_MS = 30000;
+    const HIDDEN_CLOSE_MS = 60000;
+
+    let source = null;
+    let handlers = {};
+    let lastEventId = '';
+    let staleTimer = null;
+    let retryTimer = null;
+    let hiddenTimer = null;
+
+    function setStatus(state) {
+        const el = document.getElementById('live-status');
+        if (!el) return;
+        const states = {
+            live: ['Live', 'bg-green-100 text-green-800'],
+            connecting: ['Forbinder…', 'bg-yellow-100 text-yellow-800'],
+            offline: ['Ikke live', 'bg-gray-200 text-gray-700'],
+        };
+        const [text, classes] = states[state];
+        el.textContent = text;
+        el.className = 'inline-block px-2 py-0.5 rounded text-xs font-medium ' + classes;
+    }
+
+    function resetStaleTimer() {
+        clearTimeout(staleTimer);
+        staleTimer = setTimeout(() => { close(); open(); }, STALE_MS);
+    }
+
+    function dispatch(type, event) {
+        resetStaleTimer();
+        setStatus('live');
+        if (event.lastEventId) lastEventId = event.lastEventId;
+        if (type !== 'heartbeat' && typeof OfflineStatus !== 'undefined') OfflineStatus.dataChanged(); // Cached pages are out of date
+        const handler = handlers[type];
+        if (!handler) return;
+        try {
+            handler(JSON.parse(event.data));
+        } catch (error) {
+            console.error(`[LiveUpdates] Fejl i håndtering af "${type}":`, error);
+        }
+    }
+
+    function open() {
+        clearTimeout(retryTimer);
+        setStatus('connecting');
+        const url = '/api/stream' + (lastEventId ? '?last_event_id=' + encodeURIComponent(lastEventId) : '');
+        source = new EventSource(url);
+        ['assessment', 'sync', 'contact', 'resync', 'heartbeat'].forEach(type => {
+            source.addEventListener(type, event => dispatch(type, event));
+        });
+        source.onopen = resetStaleTimer;
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) { // Refused (e.g. 503); EventSource won't retry
+                close();
+                setStatus('offline');
+                retryTimer = setTimeout(open, REFUSED_RETRY_MS + Math.random() * 5000);
+            } else {
+                setStatus('connecting'); // EventSource is reconnecting by itself
+            }
+        };
+    }
+
+    function close() {
+        clearTimeout(staleTimer);
+        if (source) {
+            source.close();
+            source = null;
+        }
+    }
+
+    document.addEventListener('visibilitychange', () => {
+        clearTimeout(hiddenTimer);
+        if (document.hidden) {
+            hiddenTimer = setTimeout(() => { close(); clearTimeout(retryTimer); setStatus('offline'); }, HIDDEN_CLOSE_MS);
+        } else if (!source) {
+            open();
+        }
+    });
+
+    return {
+        connect(newHandlers) {
+            if (typeof EventSource === 'undefined') return; // Very old browser: the page just doesn't update
+            handlers = newHandlers;
+            open();
+        },
+    };
+})();
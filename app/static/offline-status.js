@@ -0,0 +1,74 @@
+// Registers the service worker (/sw.js) and shows the "offline, last synced at" indicator.
+//
+// The indicator (#offline-indicator in base.html) appears when the page was served from the
+// device's cache because the network failed, or when the browser goes offline. It shows when the
+// page's data was last fetched from the server. When a newer version of the page arrives in the
+// background, or the connection comes back, it offers a reload.
+const OfflineStatus = (() => {
+    let fetchedAt = new Date().toISOString(); // When this page's content came from the server
+    let servedOffline = false;
+
+    function formatTime(iso) {
+        return new Date(iso).toLocaleString('da-DK', { weekday: 'short', hour: '2-digit', minute: '2-digit' });
+    }
+
+    function render(reloadText) {
+        const el = document.getElementById('offline-indicator');
+        if (!el) return;
+        const offline = servedOffline || !navigator.onLine;
+        if (!offline && !reloadText) {
+            el.classList.add('hidden');
+            return;
+        }
+        document.getElementById('offline-indicator-text').textContent = offline
+            ? `Offline – viser data hentet ${fetchedAt ? formatTime(fetchedAt) : 'tidligere'}`
+            : reloadText;
+        document.getElementById('offline-indicator-reload').classList.toggle('hidden', !reloadText);
+        el.classList.remove('hidden');
+    }
+
+    function onMessage(event) {
+        const message = event.data || {};
+        if (message.url !== location.href) return;
+        if (message.type === 'page-status') {
+            if (message.fromCache && message.fetchedAt) fetchedAt = message.fetchedAt;
+            servedOffline = message.offline;
+            render(message.updated ? 'Der er nyere data' : '');
+        } else if (message.type === 'page-updated') {
+            servedOffline = false;
+            render('Der er nyere data');
+        }
+    }
+
+    function register() {
+        if (!('serviceWorker' in navigator)) return;
+        navigator.serviceWorker.addEventListener('message', onMessage);
+        navigator.serviceWorker.register('/sw.js').catch(error => console.warn('[OfflineStatus] Service worker kunne ikke registreres:', error));
+        if (navigator.serviceWorker.controller) {
+            navigator.serviceWorker.controller.postMessage({ type: 'page-status', url: location.href });
+        }
+        window.addEventListener('online', () => {
+            const wasOffline = servedOffline;
+            servedOffline = false;
+            render(wasOffline ? 'Forbindelsen er tilbage' : '');
+        });
+        window.addEventListener('offline', () => render(''));
+    }
+
+    return {
+        register,
+        // Tells the service worker the data has changed (e.g. from a live update), so the next page
+        // it serves is checked against the server's data version instead of the cached one.
+        dataChanged() {
+            if (navigator.serviceWorker && navigator.serviceWorker.controller) {
+                navigator.serviceWorker.controller.postMessage({ type: 'data-changed' });
+            }
+        },
+        // Drops the cached pages (logged out: they belong to the previous user).
+        clear() {
+            if (navigator.serviceWorker && navigator.serviceWorker.controller) {
+                navigator.serviceWorker.controller.postMessage({ type: 'clear' });
+            }
+        },
+    };
+})();
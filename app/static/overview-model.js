@@ -0,0 +1,80 @@
+// The overview index (GET /api/overview-index, format in app/overview_index.py) in memory, with
+// the lookup maps the overview's filters run against.
+//
+// OverviewModel.build(index) adds to the index: events per festival day, per stage and per artist
+// (positions in index.events, in start-time order), positions by day/stage/slug, and every
+// artist's normalised title. OverviewModel.filter(model, filters) returns the positions of the
+// matching artists (by title) and events (by start time), with the same rules as the server's
+// read_models.get_artists_page / get_schedule_page:
+//   - day and stage: events on that festival day and stage; artists with at least one of them,
+//   - risk: the artist's risk level ("none" = no assessment or no risk level),
+//   - query: normalised substring of the title, or one of `extraSlugs` (the fuzzy search's hits).
+const OverviewModel = (() => {
+    function normalize(text) {
+        // As the server's artist_search.normalize: lowercase, æ/ø/å -> ae/oe/aa, no accents, single spaces
+        return (text || '').toLowerCase().replace(/æ/g, 'ae').replace(/ø/g, 'oe').replace(/å/g, 'aa')
+            .normalize('NFKD').replace(/[\u0300-\u036f]/g, '')
+            .split(/[^\p{L}\p{N}]+/u).filter(Boolean).join(' ');
+    }
+
+    function build(index) {
+        const eventsByDay = index.days.map(() => []);
+        const eventsByStage = index.stages.map(() => []);
+        const eventsByArtist = index.artists.map(() => []);
+        index.events.forEach(([artist, stage, day], position) => {
+            eventsByArtist[artist].push(position);
+            if (stage >= 0) eventsByStage[stage].push(position);
+            if (day >= 0) eventsByDay[day].push(position);
+        });
+        return {
+            ...index,
+            dayPositions: new Map(index.days.map(([iso], position) => [iso, position])),
+            stagePositions: new Map(index.stages.map((name, position) => [name, position])),
+            artistPositions: new Map(index.artists.map(([slug], position) => [slug, position])),
+            titles: index.artists.map(([, title]) => normalize(title)),
+            eventsByDay,
+            eventsByStage,
+            eventsByArtist,
+        };
+    }
+
+    const artistRisk = (model, position) => (model.artists[position][5] && model.artists[position][5][0]) || 'none';
+
+    function filter(model, { day = null, stage = null, risk = null, query = '', extraSlugs = new Set() } = {}) {
+        // An unknown day or stage (e.g. gone after a sync) matches nothing, as on the server
+        const dayPosition = day === null ? null : (model.dayPositions.get(day) ?? -2);
+        const stagePosition = stage === null ? null : (model.stagePositions.get(stage) ?? -2);
+        const normalizedQuery = normalize(query);
+
+        // Risk and name, once per artist
+        const artistMatches = model.artists.map((artist, position) =>
+            (risk === null || artistRisk(model, position) === risk)
+            && (!normalizedQuery || model.titles[position].includes(normalizedQuery) || extraSlugs.has(artist[0])));
+
+        const artists = [];
+        const events = [];
+        if (dayPosition === null && stagePosition === null) {
+            artistMatches.forEach((matches, position) => { if (matches) artists.push(position); });
+            model.events.forEach((event, position) => { if (artistMatches[event[0]]) events.push(position); });
+            return { artists, events };
+        }
+
+        // Day and stage: walk the shorter of the two prebuilt lists
+        const byDay = dayPosition === null ? null : (model.eventsByDay[dayPosition] || []);
+        const byStage = stagePosition === null ? null : (model.eventsByStage[stagePosition] || []);
+        const candidates = byDay && byStage ? (byDay.length <= byStage.length ? byDay : byStage) : (byDay || byStage);
+        const withEvents = new Uint8Array(model.artists.length);
+        candidates.forEach(position => {
+            const [artist, eventStage, eventDay] = model.events[position];
+            if ((dayPosition === null || eventDay === dayPosition) && (stagePosition === null || eventStage === stagePosition)
+                && artistMatches[artist]) {
+                events.push(position);
+                withEvents[artist] = 1;
+            }
+        });
+        withEvents.forEach((has, position) => { if (has) artists.push(position); });
+        return { artists, events };
+    }
+
+    return { normalize, build, artistRisk, filter };
+})();
@@ -0,0 +1,269 @@
+// Service worker (served as /sw.js so it controls the whole site): keeps the app usable with the
+// poor mobile coverage on the festival site.
+//
+//   - Install: precaches the static shell (scripts, logo, favicons, Tailwind from the CDN) and, best
+//     effort, the main pages, so they open offline after the first visit. Static files are cached
+//     under the fingerprinted URLs from the build manifest (scripts/build_static.py) when there is one.
+//   - /calendar, /contacts and artist pages: stale-while-revalidate. The cached copy is shown at once
+//     and refreshed in the background, unless the app's data version (GET /api/data-version) has
+//     moved on since the copy was cached; then the network is tried first, the copy is the fallback.
+//   - Other pages (/, /now, /analytics): network first, the cached copy if the network fails or is slow.
+//   - Fingerprinted static files (/static/dist/): cache first, their content never changes.
+//     Other static files and CDN assets: stale-while-revalidate.
+//   - The API, the admin pages, login/logout and non-GET requests are never touched.
+//
+// Each cached page carries the data version it was fetched under and the time it was fetched
+// (sw-data-version, sw-fetched-at headers). Pages ask for their status with
+// postMessage({type: 'page-status', url}) to show the "offline, last synced at" indicator
+// (static/offline-status.js); {type: 'data-changed'} makes the next navigation re-check the data
+// version, {type: 'clear'} drops the cached pages (sent after logout).
+const CACHE_VERSION = 'v2';
+const STATIC_CACHE = `smuk-static-${CACHE_VERSION}`;
+const PAGE_CACHE = `smuk-pages-${CACHE_VERSION}`;
+
+const SHELL = [ // Paths in app/static
+    'live-updates.js',
+    'virtual-list.js',
+    'overview-model.js',
+    'festival-calendar-tailwind.js',
+    'offline-status.js',
+    'vendor/line-clamp.css',
+    'smuk_logo.png',
+    'favicons/favicon-32x32.png',
+    'favicons/favicon-16x16.png',
+    'favicons/apple-touch-icon.png',
+    'favicons/favicon.ico',
+];
+const CDN_SHELL = ['https://cdn.tailwindcss.com'];
+const CDN_HOSTS = ['cdn.tailwindcss.com'];
+const MANIFEST_URL = '/static/dist/manifest.json';
+const WARM_PAGES = ['/', '/calendar', '/contacts', '/now'];
+const STALE_WHILE_REVALIDATE = [/^\/calendar(\/|$)/, /^\/contacts$/, /^\/artists\//];
+const NEVER_CACHE = [/^\/api\//, /^\/admin/, /^\/login/, /^\/logout/, /^\/sw\.js$/, /^\/docs/, /^\/redoc/, /^\/openapi/];
+
+const NETWORK_TIMEOUT_MS = 4000; // Network-first pages fall back to the cached copy after this
+const VERSION_MAX_AGE_MS = 15000; // How long a fetched data version is trusted
+const VERSION_TIMEOUT_MS = 1500; // How long a navigation waits for the data version
+
+let dataVersion = null; // Latest known data version (string), null until fetched
+let versionCheckedAt = 0;
+let versionRequest = null;
+const served = new Map(); // Page URL -> how it was last served: {fromCache, fetchedAt, offline, updated}
+
+function withTimeout(promise, ms, fallback) {
+    return Promise.race([promise, new Promise(resolve => setTimeout(() => resolve(fallback), ms))]);
+}
+
+function currentDataVersion() {
+    if (Date.now() - versionCheckedAt < VERSION_MAX_AGE_MS) return Promise.resolve(dataVersion);
+    if (!versionRequest) {
+        versionRequest = fetch('/api/data-version', { cache: 'no-store', credentials: 'same-origin', redirect: 'manual' })
+            .then(response => (response.ok ? response.json() : null))
+            .then(body => {
+                if (body) {
+                    dataVersion = String(body.version);
+                    versionCheckedAt = Date.now();
+                }
+                return dataVersion;
+            })
+            .catch(() => dataVersion)
+            .finally(() => { versionRequest = null; });
+    }
+    return withTimeout(versionRequest, VERSION_TIMEOUT_MS, dataVersion);
+}
+
+// --- Caching ---
+
+async function fetchPage(request, version) {
+    // Fetches a page and caches it with its data version and fetch time. Redirects (e.g. to /login
+    // when the session has expired) and errors are passed through uncached.
+    const url = typeof request === 'string' ? request : request.url;
+    const response = await fetch(request);
+    if (!response.ok || response.type !== 'basic' || response.redirected) {
+        if (response.type === 'opaqueredirect') await (await caches.open(PAGE_CACHE)).delete(url);
+        return response;
+    }
+    const headers = new Headers(response.headers);
+    headers.set('sw-fetched-at', new Date().toISOString());
+    if (version !== null) headers.set('sw-data-version', version);
+    const body = await response.clone().blob();
+    const cache = await caches.open(PAGE_CACHE);
+    await cache.put(url, new Response(body, { status: response.status, statusText: response.statusText, headers }));
+    return response;
+}
+
+async function precache(cache, url) {
+    try {
+        const crossOrigin = new URL(url, self.location.origin).origin !== self.location.origin;
+        const response = await fetch(new Request(url, { mode: crossOrigin ? 'no-cors' : 'same-origin' }));
+        if (response.ok || response.type === 'opaque') await cache.put(url, response);
+    } catch (error) {
+        console.warn('[sw] Kunne ikke forhåndsgemme', url, error);
+    }
+}
+
+async function shellUrls() {
+    // The shell's fingerprinted URLs from the build manifest, or the plain ones without a build
+    let manifest = {};
+    try {
+        const response = await fetch(MANIFEST_URL, { cache: 'no-cache' });
+        if (response.ok) manifest = await response.json();
+    } catch (error) {
+        console.warn('[sw] Kunne ikke hente manifestet for statiske filer', error);
+    }
+    return SHELL.map(path => '/static/' + (manifest[path] || path)).concat(CDN_SHELL);
+}
+
+function unfingerprinted(pathname) {
+    return pathname.replace(/\.[0-9a-f]{12}(\.[^./]+)$/, '$1');
+}
+
+async function staticCacheFirst(event) {
+    const cache = await caches.open(STATIC_CACHE);
+    const cached = await cache.match(event.request);
+    if (cached) return cached;
+    const response = await fetch(event.request);
+    if (response.ok) {
+        const copy = response.clone(); // Before the page starts reading the body
+        event.waitUntil((async () => {
+            // A new build of the file replaces the old one, so the cache doesn't grow with every deploy
+            const name = unfingerprinted(new URL(event.request.url).pathname);
+            for (const key of await cache.keys()) {
+                const pathname = new URL(key.url).pathname;
+                if (pathname !== new URL(event.request.url).pathname && unfingerprinted(pathname) === name) await cache.delete(key);
+            }
+            await cache.put(event.request, copy);
+        })());
+    }
+    return response;
+}
+
+async function staticStaleWhileRevalidate(event) {
+    const cache = await caches.open(STATIC_CACHE);
+    const cached = await cache.match(event.request);
+    const update = fetch(event.request).then(response => {
+        if (response.ok || response.type === 'opaque') cache.put(event.request, response.clone());
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(update.catch(() => {}));
+        return cached;
+    }
+    return update;
+}
+
+// --- Pages ---
+
+function offlineResponse() {
+    const html = `<!doctype html><html lang="da"><head><meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0"><title>Offline - Smukfest Risikoværktøj</title></head>
+<body style="font-family: system-ui, sans-serif; padding: 2rem; color: #374151">
+<h1 style="font-size: 1.25rem">Du er offline</h1>
+<p>Siden er ikke gemt på enheden endnu. Den bliver gemt, første gang du åbner den med forbindelse.</p>
+<p><a href="/calendar">Kalender</a> · <a href="/contacts">Kontakter</a> · <a href="javascript:location.reload()">Prøv igen</a></p>
+</body></html>`;
+    return new Response(html, { status: 503, headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+}
+
+async function notifyUpdated(url) {
+    const status = served.get(url);
+    if (status) status.updated = true;
+    for (const client of await self.clients.matchAll({ type: 'window' })) {
+        client.postMessage({ type: 'page-updated', url });
+    }
+}
+
+async function pageNetworkFirst(event, cached) {
+    const url = event.request.url;
+    if (cached === undefined) cached = await (await caches.open(PAGE_CACHE)).match(url);
+    const network = fetchPage(event.request, dataVersion);
+    event.waitUntil(network.catch(() => {})); // Let the cache update even after the timeout
+    if (!cached) {
+        try {
+            const response = await network;
+            served.set(url, { fromCache: false, fetchedAt: new Date().toISOString(), offline: false });
+            return response;
+        } catch (error) {
+            served.set(url, { fromCache: false, fetchedAt: null, offline: true });
+            return offlineResponse();
+        }
+    }
+    const response = await withTimeout(network.catch(() => null), NETWORK_TIMEOUT_MS, null);
+    if (response) {
+        served.set(url, { fromCache: false, fetchedAt: new Date().toISOString(), offline: false });
+        return response;
+    }
+    served.set(url, { fromCache: true, fetchedAt: cached.headers.get('sw-fetched-at'), offline: true });
+    network.then(() => notifyUpdated(url)).catch(() => {}); // Arrived after all: offer a reload
+    return cached;
+}
+
+async function pageStaleWhileRevalidate(event) {
+    const url = event.request.url;
+    const cached = await (await caches.open(PAGE_CACHE)).match(url);
+    if (!cached) return pageNetworkFirst(event, null);
+    const latest = await currentDataVersion();
+    const cachedVersion = cached.headers.get('sw-data-version');
+    if (latest !== null && cachedVersion !== latest) return pageNetworkFirst(event, cached); // Data has changed
+    served.set(url, { fromCache: true, fetchedAt: cached.headers.get('sw-fetched-at'), offline: false });
+    event.waitUntil(
+        fetchPage(event.request, latest)
+            .then(response => { if (response.type === 'opaqueredirect') return notifyUpdated(url); })
+            .catch(() => { served.get(url).offline = true; })
+    );
+    return cached;
+}
+
+// --- Lifecycle ---
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(STATIC_CACHE);
+        await Promise.all((await shellUrls()).map(url => precache(cache, url)));
+        const version = await currentDataVersion();
+        await Promise.all(WARM_PAGES.map(url => fetchPage(url, version).catch(() => {})));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const keep = [STATIC_CACHE, PAGE_CACHE];
+        for (const name of await caches.keys()) {
+            if (name.startsWith('smuk-') && !keep.includes(name)) await caches.delete(name);
+        }
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        if (CDN_HOSTS.includes(url.hostname)) event.respondWith(staticStaleWhileRevalidate(event));
+        return;
+    }
+    if (NEVER_CACHE.some(pattern => pattern.test(url.pathname))) return;
+    if (url.pathname.startsWith('/static/dist/') && url.pathname !== MANIFEST_URL) {
+        event.respondWith(staticCacheFirst(event));
+    } else if (url.pathname.startsWith('/static/')) {
+        event.respondWith(staticStaleWhileRevalidate(event));
+    } else if (request.mode === 'navigate') {
+        const staleWhileRevalidate = STALE_WHILE_REVALIDATE.some(pattern => pattern.test(url.pathname));
+        event.respondWith(staleWhileRevalidate ? pageStaleWhileRevalidate(event) : pageNetworkFirst(event));
+    }
+});
+
+self.addEventListener('message', event => {
+    const message = event.data || {};
+    if (message.type === 'page-status') {
+        const status = served.get(message.url) || { fromCache: false, fetchedAt: null, offline: false };
+        event.source.postMessage({ type: 'page-status', url: message.url, ...status });
+    } else if (message.type === 'data-changed') {
+        versionCheckedAt = 0;
+    } else if (message.type === 'clear') {
+        served.clear();
+        event.waitUntil(caches.delete(PAGE_CACHE));
+    }
+});
@@ -0,0 +1,131 @@
+// Windowed rendering of long lists: only the items near the viewport are in the DOM.
+//
+// VirtualList.create({ container, count, renderItem(index), makeSpacer(), columns() }) renders
+// items [0, count) into `container` (a CSS grid, a <tbody>, ...), in rows of `columns()` items.
+// The rows above and below the rendered window are replaced by two spacer elements of the same
+// height, so the page keeps its full scroll height and the layout (grid columns, table cells) is
+// untouched. The list scrolls with the page; no inner scroll container is needed.
+//   - Row heights are estimated from the rows rendered so far (their average, gaps included).
+//   - The window is moved in whole blocks of BLOCK_ROWS rows, so scrolling re-renders only when a
+//     block boundary is crossed, and elements still in the window are reused, not rebuilt.
+//   - list.setCount(n) shows a new result (e.g. after filtering); list.refresh() rebuilds the
+//     visible items from the data (e.g. after a live update); list.destroy() removes the listeners.
+const VirtualList = (() => {
+    const OVERSCAN_PX = 600; // Rendered beyond the viewport on both sides
+    const BLOCK_ROWS = 4;
+
+    function create({ container, count = 0, renderItem, makeSpacer, columns = () => 1, estimatedRowHeight = 100 }) {
+        const top = makeSpacer();
+        const bottom = makeSpacer();
+        let itemCount = count;
+        let columnCount = Math.max(1, columns());
+        let rowHeight = estimatedRowHeight;
+        let measured = false;
+        let renderedRows = null; // [first row, last row] currently rendered
+        let elements = new Map(); // Item index -> element, for the rendered window
+        let frame = null;
+
+        const rowCount = () => Math.ceil(itemCount / columnCount);
+        const rowGap = () => parseFloat(getComputedStyle(container).rowGap) || 0;
+
+        function setSpacer(spacer, rows) {
+            // The gap between the spacer and the first item counts towards the spacer's rows
+            const height = rows > 0 ? rows * rowHeight - rowGap() : 0;
+            spacer.style.display = height > 0 ? '' : 'none';
+            spacer.style.height = `${Math.max(0, height)}px`;
+            spacer.firstElementChild?.style.setProperty('height', `${Math.max(0, height)}px`); // <tr><td>
+        }
+
+        function visibleRows() {
+            const rect = container.getBoundingClientRect();
+            const from = Math.max(0, -rect.top - OVERSCAN_PX);
+            const to = Math.max(0, -rect.top + window.innerHeight + OVERSCAN_PX);
+            const rows = rowCount();
+            if (!rows) return [0, -1];
+            const first = Math.floor(Math.min(from / rowHeight, rows - 1) / BLOCK_ROWS) * BLOCK_ROWS;
+            const last = Math.min(rows - 1, (Math.floor(to / rowHeight / BLOCK_ROWS) + 1) * BLOCK_ROWS - 1);
+            return [first, Math.max(first, last)];
+        }
+
+        function measure(firstRow, lastRow) {
+            const items = [...elements.values()];
+            if (!items.length) return;
+            const firstTop = items[0].getBoundingClientRect().top;
+            const lastBottom = Math.max(...items.slice(-columnCount).map(el => el.getBoundingClientRect().bottom));
+            const height = (lastBottom - firstTop + rowGap()) / (lastRow - firstRow + 1);
+            if (height > 0 && Math.abs(height - rowHeight) > 0.5) {
+                rowHeight = height;
+                return true;
+            }
+            return false;
+        }
+
+        function render(force = false) {
+            const [firstRow, lastRow] = visibleRows();
+            if (!force && renderedRows && renderedRows[0] === firstRow && renderedRows[1] === lastRow) return;
+            const firstItem = firstRow * columnCount;
+            const lastItem = Math.min(itemCount - 1, (lastRow + 1) * columnCount - 1);
+            const next = new Map();
+            for (let index = firstItem; index <= lastItem; index++) {
+                next.set(index, (!force && elements.get(index)) || renderItem(index));
+            }
+            elements = next;
+            container.replaceChildren(top, ...next.values(), bottom);
+            setSpacer(top, firstRow);
+            setSpacer(bottom, rowCount() - lastRow - 1);
+            renderedRows = [firstRow, lastRow];
+            if (!measured && lastItem >= firstItem) {
+                // The estimate was only a guess: measure once and lay out again with the real height
+                measured = true;
+                if (measure(firstRow, lastRow)) {
+                    renderedRows = null;
+                    render(); // Same items, new spacers and window
+                }
+            }
+        }
+
+        function schedule() {
+            if (frame === null) {
+                frame = requestAnimationFrame(() => { frame = null; render(); });
+            }
+        }
+
+        function onResize() {
+            const newColumns = Math.max(1, columns());
+            if (newColumns !== columnCount) {
+                columnCount = newColumns;
+                measured = false;
+                renderedRows = null;
+                render();
+            } else {
+                schedule();
+            }
+        }
+
+        window.addEventListener('scroll', schedule, { passive: true });
+        window.addEventListener('resize', onResize);
+        render(true);
+
+        return {
+            setCount(newCount) {
+                itemCount = newCount;
+                renderedRows = null;
+                render(true);
+            },
+            refresh() { render(true); },
+            destroy() {
+                window.removeEventListener('scroll', schedule);
+                window.removeEventListener('resize', onResize);
+                if (frame !== null) cancelAnimationFrame(frame);
+            },
+        };
+    }
+
+    function gridColumns(grid) {
+        // Number of tracks in a CSS grid's computed grid-template-columns ("288px 288px 288px")
+        const tracks = getComputedStyle(grid).gridTemplateColumns;
+        return tracks && tracks !== 'none' ? tracks.split(' ').length : 1;
+    }
+
+    return { create, gridColumns };
+})();
@@ -0,0 +1,91 @@
+"""
+Fingerprinted, precompressed static files.
+
+`scripts/build_static.py` copies every file in app/static to app/static/dist under a content-hashed
+name (`live-updates.js` -> `dist/live-updates.3f2a9c1b0d4e.js`), writes a gzip variant next to the
+compressible ones and records the mapping in app/static/dist/manifest.json.
+
+  - `static_url(path)` (a Jinja global) returns the hashed URL from the manifest, or the plain
+    /static/ URL when the file isn't in it (no build yet, e.g. in development).
+  - `PrecompressedStaticFiles` serves /static: hashed files with `Cache-Control: immutable` (their
+    URL changes whenever their content does) and their .gz variant when the browser accepts gzip;
+    everything else with `no-cache`, so the browser revalidates it with its ETag.
+"""
+import json
+import os
+import stat
+from mimetypes import guess_type
+from typing import Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = "dist" # Build output, relative to STATIC_DIR
+MANIFEST_NAME = "manifest.json"
+STATIC_PREFIX = "/static/"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_manifest: Optional[Dict[str, str]] = None
+
+def load_manifest() -> Dict[str, str]:
+    """The build manifest ({source path: hashed path}, both relative to app/static); {} without a build."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(os.path.join(STATIC_DIR, DIST_DIR, MANIFEST_NAME), encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+def static_url(path: str) -> str:
+    """URL of a file in app/static: the fingerprinted copy if it has been built, else the file itself."""
+    return STATIC_PREFIX + load_manifest().get(path, path)
+
+def is_fingerprinted(path: str) -> bool:
+    return path.startswith(DIST_DIR + "/") and path != f"{DIST_DIR}/{MANIFEST_NAME}"
+
+def accepts_gzip(scope: Scope) -> bool:
+    for coding in Headers(scope=scope).get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles with cache headers, serving the build's .gz variants to browsers that accept gzip."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not is_fingerprinted(path):
+            response = await super().get_response(path, scope)
+            response.headers["Cache-Control"] = REVALIDATE
+            return response
+        response = await self.gzip_response(path, scope) if accepts_gzip(scope) else None
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = IMMUTABLE
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    async def gzip_response(self, path: str, scope: Scope) -> Optional[Response]:
+        """The .gz variant of `path` with the original file's content type, or None if there is none."""
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + ".gz")
+        if not (stat_result and stat.S_ISREG(stat_result.st_mode)):
+            return None
+        response = FileResponse(
+            full_path,
+            stat_result=stat_result,
+            media_type=guess_type(path)[0] or "application/octet-stream",
+            headers={"Content-Encoding": "gzip"},
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
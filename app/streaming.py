@@ -0,0 +1,66 @@
+"""
+Streamed template rendering for the large pages (`/` and `/admin/assessments`).
+
+`TemplateResponse` renders the whole page into memory before the first byte goes out, so
+time-to-first-byte and memory both grow with the lineup. `StreamingTemplateResponse` renders with
+Jinja's `Template.generate()` instead:
+
+  - The page chrome (head, nav) is sent as soon as it has rendered. base.html marks that point
+    with `{{ stream_flush }}`, which only a streaming response defines (elsewhere it renders as
+    nothing).
+  - After that, the page goes out in CHUNK_SIZE pieces while the artist grid and schedule table
+    render.
+  - The route loads everything from the database (as plain rows) and closes its session before
+    it returns the response, so no connection is held while a slow phone downloads the page.
+"""
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from jinja2 import Template
+from markupsafe import Markup
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+from starlette.templating import Jinja2Templates
+
+FLUSH_MARKER = "<!-- stream-flush -->"
+CHUNK_SIZE = 64 * 1024 # Characters buffered before a chunk is sent (after the first flush)
+
+def render_chunks(template: Template, context: Dict[str, Any], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """The rendered template as UTF-8 chunks: one at each flush marker, then every `chunk_size` characters."""
+    buffer = []
+    size = 0
+    for piece in template.generate(context):
+        if FLUSH_MARKER in piece:
+            buffer.append(piece.replace(FLUSH_MARKER, ""))
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+            continue
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+class StreamingTemplateResponse(StreamingResponse):
+    """A TemplateResponse that streams. `context` must already hold all data (no open DB session)."""
+
+    def __init__(
+        self,
+        templates: Jinja2Templates,
+        name: str,
+        context: Dict[str, Any],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        self.template = templates.get_template(name)
+        self.context = context
+        render_context = {**context, "stream_flush": Markup(FLUSH_MARKER)}
+        super().__init__(
+            render_chunks(self.template, render_context),
+            status_code=status_code,
+            headers=headers,
+            media_type="text/html",
+            background=background,
+        )
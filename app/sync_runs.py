@@ -0,0 +1,155 @@
+"""
+History of the artist and schedule syncs (`scripts/sync_artists_db.run_sync`), one `sync_runs`
+row per run, shown on `/admin/sync-runs` and by `GET /api/sync-runs`.
+
+A run is recorded as "running" when it starts and updated when it ends ("success" or "failed",
+with the error text), so a run that never finished (the process died) stays visible. Per run:
+
+  - phase durations in ms: fetch (download of the API response), parse (JSON and extraction),
+    artists (upserts and stale deletes), stages, events, commit (change log, commit, compaction)
+    and images (prewarming the image proxy), plus the total,
+  - the size of the API response and the row counts of every operation (see models.SyncRun).
+
+Each run is compared with the BASELINE_RUNS successful runs before it. Anomalies:
+
+  - failed: the run failed (fetch, parse or database error),
+  - unfinished: still "running" after STALE_RUN_MINUTES,
+  - no_events: the API returned no events,
+  - artist_drop / event_drop: the API returned more than DROP_THRESHOLD fewer artists or events
+    than the median of the baseline runs.
+
+Recording never fails a sync: `scripts/sync_artists_db.save_run` logs errors and moves on.
+"""
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+
+from .models import SyncRun
+
+PHASES = ("fetch", "parse", "artists", "stages", "events", "commit", "images")
+COUNTS = (
+    "api_artists", "api_events", "artists_inserted", "artists_updated", "artists_deleted",
+    "stages_inserted", "events_deleted", "events_inserted", "events_skipped", "changes_logged",
+)
+
+BASELINE_RUNS = 5 # Successful runs before a run that its counts are compared with
+DROP_THRESHOLD = 0.2 # A drop of more than 20% below the baseline median is an anomaly
+STALE_RUN_MINUTES = 30 # A run still "running" after this long has died
+SYNC_RUNS_RETAIN = 5000 # Newest runs kept (about seven months of hourly syncs)
+DEFAULT_RUNS = 50
+MAX_RUNS = 500
+
+class SyncRunRecorder:
+    """Timings and counts of one sync while it runs; `save` writes them to its sync_runs row."""
+
+    def __init__(self, trigger: str = "manual"):
+        self.id: Optional[int] = None # sync_runs.id once saved
+        self.trigger = trigger
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.payload_bytes: Optional[int] = None
+        self.timings: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.total_ms: Optional[float] = None
+        self._start = time.perf_counter()
+        self._phase: Optional[str] = None
+        self._phase_start = 0.0
+
+    def begin(self, phase: str) -> None:
+        """Ends the current phase (if any) and starts `phase`; time in a phase entered again adds up."""
+        self.end()
+        self._phase = phase
+        self._phase_start = time.perf_counter()
+
+    def end(self) -> None:
+        if self._phase is not None:
+            elapsed = (time.perf_counter() - self._phase_start) * 1000
+            self.timings[self._phase] = self.timings.get(self._phase, 0.0) + elapsed
+            self._phase = None
+
+    def count(self, **counts: int) -> None:
+        self.counts.update(counts)
+
+    def fail(self, error: str) -> None:
+        """Marks the run as failed; the first error is kept (later ones are usually its consequences)."""
+        self.status = "failed"
+        if self.error is None:
+            self.error = error
+
+    def finish(self) -> None:
+        self.end()
+        if self.status == "running":
+            self.status = "success"
+        self.finished_at = datetime.utcnow()
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+def save(db: Session, run: SyncRunRecorder) -> None:
+    """Inserts or updates the run's row and commits; the first save also prunes old runs."""
+    values: Dict[str, Any] = {
+        "trigger": run.trigger,
+        "status": run.status,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "error": run.error,
+        "payload_bytes": run.payload_bytes,
+        "total_ms": run.total_ms,
+    }
+    values.update({f"{name}_ms": run.timings.get(name) for name in PHASES})
+    values.update({name: run.counts.get(name) for name in COUNTS})
+    row = db.get(SyncRun, run.id) if run.id is not None else None
+    if row is None:
+        row = SyncRun(**values)
+        db.add(row)
+        db.flush()
+        run.id = row.id
+        db.execute(delete(SyncRun).where(SyncRun.id <= run.id - SYNC_RUNS_RETAIN))
+    else:
+        for name, value in values.items():
+            setattr(row, name, value)
+    db.commit()
+
+def find_anomalies(run: SyncRun, baseline: List[SyncRun], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    The anomalies of `run` (see the module docstring), as {"code", ...details}. `baseline` are the
+    successful runs before it, newest first (at most BASELINE_RUNS are used).
+    """
+    anomalies: List[Dict[str, Any]] = []
+    if run.status == "failed":
+        anomalies.append({"code": "failed", "error": run.error})
+        return anomalies
+    if run.status == "running":
+        if (now or datetime.utcnow()) - run.started_at > timedelta(minutes=STALE_RUN_MINUTES):
+            anomalies.append({"code": "unfinished"})
+        return anomalies
+
+    if run.api_events == 0:
+        anomalies.append({"code": "no_events"})
+    for field, code in (("api_artists", "artist_drop"), ("api_events", "event_drop")):
+        value = getattr(run, field)
+        previous = [getattr(r, field) for r in baseline[:BASELINE_RUNS] if getattr(r, field) is not None]
+        if value is None or not previous or (code == "event_drop" and value == 0):
+            continue # No baseline yet; zero events is already no_events
+        expected = median(previous)
+        if expected > 0 and value < expected * (1 - DROP_THRESHOLD):
+            anomalies.append({"code": code, "value": value, "baseline": expected, "change": value / expected - 1})
+    return anomalies
+
+def get_history(db: Session, limit: int = DEFAULT_RUNS) -> List[Dict[str, Any]]:
+    """The newest `limit` runs, newest first, as {"run": SyncRun, "anomalies": [...]}."""
+    # BASELINE_RUNS successful runs before the oldest listed one lie at most this far back, unless
+    # failures are among them: then its baseline is shorter (a median of fewer runs)
+    rows = db.execute(
+        select(SyncRun).order_by(SyncRun.id.desc()).limit(limit + BASELINE_RUNS)
+    ).scalars().all()
+    now = datetime.utcnow()
+    history = []
+    for position, run in enumerate(rows[:limit]):
+        baseline = [r for r in rows[position + 1:] if r.status == "success"]
+        history.append({"run": run, "anomalies": find_anomalies(run, baseline, now)})
+    return history
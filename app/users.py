@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from typing import Optional, Literal
@@ -35,8 +36,12 @@ if not ADMIN_USERNAME:
     ADMIN_USERNAME = "admin"
 if not ADMIN_PASSWORD_HASH:
     print("Warning: ADMIN_PASSWORD_HASH not set in .env. Using default hash for 'adminpass'.")
-    # Provide a default hash for the admin if not set
-    ADMIN_PASSWORD_HASH = auth.get_password_hash("adminpass") 
+    # The default hash is computed on first use (see _default_admin_password_hash), not at import:
+    # bcrypt is deliberately slow and would add ~0.3s to every worker start
+
+@lru_cache(maxsize=1)
+def _default_admin_password_hash() -> str:
+    return auth.get_password_hash("adminpass")
 
 # Store user info including roles
 fake_users_db = {
@@ -57,6 +62,8 @@ def get_user(username: str) -> Optional[User]:
     """Retrieves user details (including role) from our fake DB."""
     if username in fake_users_db:
         user_dict = fake_users_db[username]
+        if user_dict["hashed_password"] is None:
+            user_dict = {**user_dict, "hashed_password": _default_admin_password_hash()}
         return User(**user_dict)
     return None
 
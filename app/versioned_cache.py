@@ -0,0 +1,40 @@
+"""
+A process-wide value (an in-memory index) built from the database and kept until the data it was
+built from changes. Used by the contact suggestion, artist search and schedule indexes.
+
+Every `get()` runs the cheap `version(db)` query and compares it with the version the value was
+built from, so other workers pick up a write on their next request; only a changed version takes
+the lock, and concurrent requests then build the value once. `invalidate()` drops the value right
+after a write in this process.
+"""
+import threading
+from typing import Any, Callable, Generic, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+class VersionedCache(Generic[T]):
+    """Caches `builder(db, version)` until `version(db)` returns something else."""
+
+    def __init__(self, builder: Callable[[Session, Any], T], version: Callable[[Session], Any]):
+        self._builder = builder
+        self._version = version
+        self._entry: Optional[Tuple[Any, T]] = None # (version, value), replaced as a whole
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> T:
+        """Returns the cached value, rebuilding it if the version changed since it was built."""
+        version = self._version(db)
+        entry = self._entry
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        with self._lock:
+            if self._entry is None or self._entry[0] != version:
+                self._entry = (version, self._builder(db, version))
+            return self._entry[1]
+
+    def invalidate(self) -> None:
+        """Drops the value; the next `get()` rebuilds it."""
+        with self._lock:
+            self._entry = None
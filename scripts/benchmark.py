@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark suite for the read path of the application.
+
+Covers every read function in `app/crud.py`, `format_datetime`, the calendar grid construction
+and full TemplateResponse rendering of `/`, `/calendar`, `/calendar/print` and `/contacts`.
+For each requested scale a synthetic database is generated (see generate_synthetic_data.py)
+and the benchmarks run in a fresh subprocess with DATABASE_URL pointing at it, so module-level
+state in the app never leaks between scales.
+
+Usage:
+    python scripts/benchmark.py                        # 1x, 10x and 100x festival size
+    python scripts/benchmark.py --scales 1 10 --filter crud --json bench.json
+"""
+
+import asyncio
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import quote
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+DEFAULT_SCALES = [1, 10, 100]
+MIN_TIME_S = 0.3   # Minimum measured time per benchmark
+MIN_ROUNDS = 5
+MAX_ROUNDS = 2000
+
+# --- Timing ---
+
+def bench(name: str, fn: Callable[[], Any], min_time: float = MIN_TIME_S) -> Dict[str, Any]:
+    """Calls `fn` repeatedly (after one warm-up call) and returns timing statistics in milliseconds."""
+    with contextlib.redirect_stdout(io.StringIO()): # The routes print on every request
+        fn()
+        timings: List[float] = []
+        started = time.perf_counter()
+        while len(timings) < MAX_ROUNDS and (len(timings) < MIN_ROUNDS or time.perf_counter() - started < min_time):
+            t0 = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return {
+        "name": name,
+        "rounds": len(timings),
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+    }
+
+# --- Benchmark definitions (run inside the per-scale subprocess) ---
+
+def collect_benchmarks() -> Dict[str, Callable[[], Any]]:
+    """Builds the benchmark callables. Imports the app, so DATABASE_URL must already be set."""
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+    from sqlalchemy import select, func
+    from fastapi.testclient import TestClient
+    from app import crud, models, read_models, contact_index, artist_search, schedule_index, analytics, change_log, static_assets, compression, overview_index
+    from app.database import SessionLocal
+    from app.utils import format_datetime
+    from app import datetime_format
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.main import app, build_calendar_grid
+
+    db = SessionLocal()
+
+    # Pick representative keys from the dataset
+    artist = db.execute(
+        select(models.Artist).join(models.Event).order_by(models.Artist.id).limit(1)
+    ).scalars().first()
+    event = db.execute(select(models.Event).order_by(models.Event.start_time).limit(1)).scalars().first()
+    stage = db.execute(select(models.Stage).order_by(models.Stage.id).limit(1)).scalars().first()
+    contact = db.execute(select(models.Contact).order_by(models.Contact.id).limit(1)).scalars().first()
+    admin = crud.get_user_by_username(db, "admin")
+    festival_day = datetime.combine(crud.get_festival_dates(db)[0], datetime.min.time())
+    festival_day_str = festival_day.strftime("%Y-%m-%d")
+
+    # Calendar grid input: the same data calendar_view works with
+    day_events = crud.get_events_for_festival_day(db, festival_day)
+    stage_names = [s.name for s in crud.get_all_stages(db) if s.name != 'TBA']
+
+    # Cursors into the middle of each listing, so the keyset predicate is part of the measurement
+    artists_cursor = crud.get_artists_page(db, limit=db.execute(select(func.count()).select_from(models.Artist)).scalar_one() // 2)[1]
+    events_cursor = crud.get_events_page(db, limit=len(day_events))[1]
+    assessments_cursor = crud.get_assessments_page(db, limit=10)[1]
+    static_paths = ["live-updates.js", "festival-calendar-tailwind.js", "offline-status.js", "vendor/line-clamp.css",
+                    "smuk_logo.png", "favicons/favicon-32x32.png", "favicons/favicon-16x16.png",
+                    "favicons/apple-touch-icon.png", "favicons/favicon.ico", "missing.js"]
+    change_head = db.execute(select(func.max(models.ChangeLog.id))).scalar() or 0
+
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, create_access_token({"sub": admin.username, "role": admin.role.value}))
+
+    def render(path: str) -> Callable[[], Any]:
+        def _render():
+            response = client.get(path)
+            assert response.status_code == 200, f"{path} returned {response.status_code}"
+            return response
+        return _render
+
+    overview_html = client.get("/", headers={"Accept-Encoding": "identity"}).content
+
+    suggest_index = contact_index.build_index(db)
+    search_index = artist_search.build_index(db)
+    now_next_index = schedule_index.build_index(db)
+    evening = festival_day.replace(hour=21) # Busy time: most stages are playing
+    artist_typo = artist.title[:-2] + artist.title[-1] + artist.title[-2] # Last two letters swapped
+
+    sample_times = [event.start_time + timedelta(minutes=17 * i) for i in range(50)]
+    sample_strings = [t.date().isoformat() for t in sample_times] # As analytics.html passes them
+
+    return {
+        # --- CRUD reads ---
+        "crud.get_artist": lambda: crud.get_artist(db, artist.id),
+        "crud.get_artist_by_slug": lambda: crud.get_artist_by_slug(db, artist.slug),
+        "crud.get_all_artists": lambda: crud.get_all_artists(db, limit=500),
+        "crud.get_all_artists[all]": lambda: list(crud.get_all_artists(db, limit=None)),
+        "crud.get_artists_page[100]": lambda: crud.get_artists_page(db, limit=100, cursor=artists_cursor),
+        "crud.get_artist_detail_by_slug": lambda: crud.get_artist_detail_by_slug(db, artist.slug),
+        "crud.get_event": lambda: crud.get_event(db, event.event_id),
+        "crud.get_all_events": lambda: crud.get_all_events(db),
+        "crud.get_all_events_with_artists_stages": lambda: crud.get_all_events_with_artists_stages(db, limit=500),
+        "crud.get_all_events_with_artists_stages[all]": lambda: list(crud.get_all_events_with_artists_stages(db, limit=None)),
+        "crud.get_events_page[100]": lambda: crud.get_events_page(db, limit=100, cursor=events_cursor),
+        "crud.get_events_for_festival_day": lambda: crud.get_events_for_festival_day(db, festival_day),
+        "crud.get_festival_dates": lambda: crud.get_festival_dates(db),
+        "crud.get_stage": lambda: crud.get_stage(db, stage.id),
+        "crud.get_stage_by_name": lambda: crud.get_stage_by_name(db, stage.name),
+        "crud.get_all_stages": lambda: crud.get_all_stages(db),
+        "crud.get_assessment": lambda: crud.get_assessment(db, artist.slug),
+        "crud.get_all_assessments": lambda: crud.get_all_assessments(db),
+        "crud.get_all_assessments_with_artists": lambda: crud.get_all_assessments_with_artists(db, limit=500),
+        "crud.get_assessments_page[100]": lambda: crud.get_assessments_page(db, limit=100, cursor=assessments_cursor),
+        "crud.get_all_risk_assessments_dict": lambda: crud.get_all_risk_assessments_dict(db),
+        "crud.get_user": lambda: crud.get_user(db, admin.id),
+        "crud.get_user_by_username": lambda: crud.get_user_by_username(db, admin.username),
+        "crud.get_user_by_email": lambda: crud.get_user_by_email(db, "nobody@example.invalid"),
+        "crud.get_users": lambda: crud.get_users(db),
+        "crud.get_contact": lambda: crud.get_contact(db, contact.id),
+        "crud.get_all_contacts": lambda: crud.get_all_contacts(db),
+        "crud.get_all_contacts[search]": lambda: crud.get_all_contacts(db, search="sør"),
+        "crud.get_all_contacts[phone]": lambda: crud.get_all_contacts(db, search=contact.phone.replace(" ", "")),
+        "crud.get_contact_categories": lambda: crud.get_contact_categories(db),
+        # --- Read models (column projections) ---
+        "read_models.get_artists_with_assessments": lambda: read_models.get_artists_with_assessments(db),
+        "read_models.get_schedule": lambda: read_models.get_schedule(db),
+        # --- Contact type-ahead ---
+        "contact_index.build_index": lambda: contact_index.build_index(db),
+        "contact_index.search[name prefix]": lambda: suggest_index.search("sø"),
+        "contact_index.search[two words]": lambda: suggest_index.search("stage man"),
+        "contact_index.search[phone]": lambda: suggest_index.search(contact.phone[:5]),
+        "GET /api/contacts/suggest": render("/api/contacts/suggest?q=s%C3%B8"),
+        # --- Fuzzy artist search ---
+        "artist_search.build_index": lambda: artist_search.build_index(db),
+        "artist_search.search[exact]": lambda: search_index.search(artist.title),
+        "artist_search.search[typo]": lambda: search_index.search(artist_typo),
+        "artist_search.search[short]": lambda: search_index.search(artist.title[:3]),
+        "GET /api/artists/search": render(f"/api/artists/search?q={quote(artist_typo)}"),
+        # --- Overview index (client-side grid and table) ---
+        "overview_index.build_index": lambda: overview_index.build_index(db, change_head),
+        "GET /api/overview-index[cached]": render("/api/overview-index"),
+        "GET /api/overview-index[304]": lambda: client.get(
+            "/api/overview-index", headers={"If-None-Match": overview_index.etag(change_log.head(db))}
+        ),
+        # --- Now & next ---
+        "schedule_index.build_index": lambda: schedule_index.build_index(db),
+        "schedule_index lookup[all stages]": lambda: [
+            (timeline.playing(evening), timeline.upcoming(evening, 3)) for timeline in now_next_index.timelines
+        ],
+        "schedule_index.get_now_next": lambda: schedule_index.get_now_next(db, evening),
+        "GET /api/now-next": render(f"/api/now-next?at={evening.isoformat()}"),
+        "render GET /now": render(f"/now?at={evening.isoformat()}"),
+        # --- Crowd-load analytics ---
+        "analytics.compute_day": lambda: analytics.compute_day(db, festival_day.date()),
+        "analytics.get_day[cached]": lambda: analytics.get_day(db, festival_day.date()),
+        "render GET /analytics": render(f"/analytics?date={festival_day_str}"),
+        # --- Change feed ---
+        "change_log.get_changes[since=0, 500]": lambda: change_log.get_changes(db, 0),
+        "change_log.get_changes[latest 50]": lambda: change_log.get_changes(db, max(change_head - 50, 0)),
+        "GET /api/changes[since=0, 500]": render("/api/changes?since=0"),
+        # --- Static files ---
+        "static_assets.static_url[10 files]": lambda: [static_assets.static_url(path) for path in static_paths],
+        "GET static festival-calendar-tailwind.js[gzip]": lambda: client.get(
+            static_assets.static_url("festival-calendar-tailwind.js"), headers={"Accept-Encoding": "gzip"}
+        ),
+        # --- Response compression ---
+        "compression._compress[GET / html]": lambda: compression._compress(overview_html),
+        "compression.compress_body[GET / html, cached]": lambda: asyncio.run(compression.compress_body(overview_html)),
+        "render GET /[gzip]": lambda: client.get("/", headers={"Accept-Encoding": "gzip"}),
+        # --- Formatting & grid ---
+        "utils.format_datetime[50 values]": lambda: [format_datetime(t) for t in sample_times],
+        "utils.format_datetime[festival, 50 values]": lambda: [
+            format_datetime(t, "%A %H:%M, %d/%m-%Y", use_festival_day=True) for t in sample_times
+        ],
+        "utils.format_datetime[50 ISO strings]": lambda: [format_datetime(t, "%A %-d/%-m") for t in sample_strings],
+        "datetime_format.render[festival, 50 values, uncached]": lambda: [
+            datetime_format.render(t, "%A %H:%M, %d/%m-%Y", use_festival_day=True) for t in sample_times
+        ],
+        "datetime_format.format_datetime[festival, 50 values, cold cache]": lambda: (
+            datetime_format.clear_cache(),
+            [format_datetime(t, "%A %H:%M, %d/%m-%Y", use_festival_day=True) for t in sample_times],
+        ),
+        "main.build_calendar_grid": lambda: build_calendar_grid(day_events, stage_names, festival_day),
+        # --- Full page rendering ---
+        "render GET /": render("/"),
+        "render GET /[page 2]": render("/?page=2&schedule_page=2"),
+        "render GET /[day + stage filter]": render(f"/?filter_date={festival_day_str}&filter_stage={quote(stage_names[0])}"),
+        "render GET /[name filter]": render(f"/?q={quote(artist_typo)}"),
+        "render GET /calendar": render(f"/calendar?date={festival_day_str}"),
+        "render GET /calendar/print": render(f"/calendar/print?date={festival_day_str}"),
+        "render GET /contacts": render("/contacts"),
+    }
+
+def run_scale(name_filter: Optional[str]) -> List[Dict[str, Any]]:
+    """Runs all (matching) benchmarks against the database in DATABASE_URL."""
+    benchmarks = collect_benchmarks()
+    results = []
+    for name, fn in benchmarks.items():
+        if name_filter and name_filter not in name:
+            continue
+        results.append(bench(name, fn))
+    return results
+
+# --- Driver ---
+
+def print_table(scale: float, results: List[Dict[str, Any]]):
+    print(f"\n=== Scale {scale:g}x ===")
+    print(f"{'benchmark':<48} {'rounds':>7} {'min ms':>10} {'median ms':>10} {'p95 ms':>10}")
+    for r in results:
+        print(f"{r['name']:<48} {r['rounds']:>7} {r['min_ms']:>10.3f} {r['median_ms']:>10.3f} {r['p95_ms']:>10.3f}")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run the CRUD/route micro-benchmarks at several festival sizes.")
+    arg_parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES, help="Festival size multipliers")
+    arg_parser.add_argument("--filter", help="Only run benchmarks whose name contains this string")
+    arg_parser.add_argument("--json", help="Write all results to this JSON file")
+    arg_parser.add_argument("--keep-db", action="store_true", help="Keep the generated databases")
+    arg_parser.add_argument("--run-scale", action="store_true", help=argparse.SUPPRESS) # Internal: child process mode
+    args = arg_parser.parse_args()
+
+    if args.run_scale:
+        json.dump(run_scale(args.filter), sys.stdout)
+        return
+
+    from scripts.generate_synthetic_data import generate
+
+    all_results: Dict[str, Any] = {"created_at": datetime.now().isoformat(), "scales": {}}
+    workdir = tempfile.mkdtemp(prefix="smukfest-bench-")
+    for scale in args.scales:
+        db_path = os.path.join(workdir, f"bench-{scale:g}x.db")
+        database_url = f"sqlite:///{db_path}"
+        print(f"Generating {scale:g}x dataset at {db_path}...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = generate(database_url, scale=scale, reset=True)
+
+        child_args = [sys.executable, os.path.abspath(__file__), "--run-scale"]
+        if args.filter:
+            child_args += ["--filter", args.filter]
+        env = dict(os.environ, DATABASE_URL=database_url, SLOW_QUERY_THRESHOLD_MS="-1")
+        completed = subprocess.run(child_args, env=env, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr)
+            sys.exit(f"Benchmark run for scale {scale:g}x failed.")
+        # The app prints during import; the JSON result is the last line of stdout
+        results = json.loads(completed.stdout.strip().splitlines()[-1])
+        print_table(scale, results)
+        all_results["scales"][f"{scale:g}x"] = {"dataset": counts, "results": results}
+
+        if not args.keep_db:
+            os.remove(db_path)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(all_results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Builds the fingerprinted, precompressed copies of the static files.
+
+Copies every file in app/static to app/static/dist under a content-hashed name
+(`festival-calendar-tailwind.js` -> `festival-calendar-tailwind.1a2b3c4d5e6f.js`), writes a
+gzip variant next to each compressible file that gets noticeably smaller, and records the mapping
+in app/static/dist/manifest.json. The app's `static_url()` reads the manifest, and the /static
+handler serves the hashed files with `Cache-Control: immutable` (see app/static_assets.py).
+
+Files from the previous build are kept for one more build, so pages that are already open (or
+cached by the service worker) can still load the assets they reference. Older files are removed.
+
+Run it after changing anything in app/static (setup.sh and the container start run it):
+    python scripts/build_static.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, Set
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.static_assets import STATIC_DIR, DIST_DIR, MANIFEST_NAME
+
+HASH_LENGTH = 12
+COMPRESSIBLE = {".js", ".css", ".svg", ".json", ".txt", ".html", ".ico", ".webmanifest", ".xml"}
+MIN_GZIP_SIZE = 256 # Bytes; smaller files aren't worth a second request variant
+MAX_GZIP_RATIO = 0.9 # Keep the .gz only if it is at least 10% smaller
+SKIP = {"sw.js"} # Served from /sw.js under a fixed URL
+
+def hashed_name(rel_path: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    root, ext = os.path.splitext(rel_path)
+    return f"{DIST_DIR}/{root}.{digest}{ext}"
+
+def source_files() -> Dict[str, str]:
+    """{path relative to app/static: absolute path} for everything outside dist/, in a stable order."""
+    files = {}
+    for directory, subdirs, names in os.walk(STATIC_DIR):
+        rel_dir = os.path.relpath(directory, STATIC_DIR)
+        if rel_dir == DIST_DIR or rel_dir.startswith(DIST_DIR + os.sep):
+            subdirs[:] = []
+            continue
+        subdirs.sort()
+        for name in sorted(names):
+            rel_path = os.path.normpath(os.path.join(rel_dir, name)).replace(os.sep, "/")
+            if name.startswith(".") or rel_path in SKIP:
+                continue
+            files[rel_path] = os.path.join(directory, name)
+    return files
+
+def write_if_missing(path: str, content: bytes) -> bool:
+    """Writes a build file unless it exists (its name is its content hash, so it can only be identical)."""
+    if os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+def read_manifest(path: str) -> Dict[str, str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def build(verbose: bool = True) -> Dict[str, str]:
+    dist_root = os.path.join(STATIC_DIR, DIST_DIR)
+    manifest_path = os.path.join(dist_root, MANIFEST_NAME)
+    previous = read_manifest(manifest_path)
+
+    manifest: Dict[str, str] = {}
+    written = 0
+    total_size = total_transfer = 0
+    for rel_path, source in source_files().items():
+        with open(source, "rb") as f:
+            content = f.read()
+        target = hashed_name(rel_path, content)
+        manifest[rel_path] = target
+        target_path = os.path.join(STATIC_DIR, target)
+        written += write_if_missing(target_path, content)
+
+        transfer = len(content)
+        if os.path.splitext(rel_path)[1].lower() in COMPRESSIBLE and len(content) >= MIN_GZIP_SIZE:
+            compressed = gzip.compress(content, compresslevel=9, mtime=0) # mtime=0: same input, same bytes
+            if len(compressed) <= len(content) * MAX_GZIP_RATIO:
+                written += write_if_missing(target_path + ".gz", compressed)
+                transfer = len(compressed)
+        total_size += len(content)
+        total_transfer += transfer
+        if verbose:
+            gz_note = f" -> {transfer:,} B gzip" if transfer != len(content) else ""
+            print(f"  {rel_path:<45} {len(content):>9,} B{gz_note}  {target}")
+
+    # Keep this build and the previous one; drop everything older
+    keep: Set[str] = {MANIFEST_NAME}
+    for target in list(manifest.values()) + list(previous.values()):
+        rel = os.path.relpath(os.path.join(STATIC_DIR, target), dist_root).replace(os.sep, "/")
+        keep.update({rel, rel + ".gz"})
+    removed = 0
+    for directory, _, names in os.walk(dist_root, topdown=False):
+        for name in names:
+            rel = os.path.relpath(os.path.join(directory, name), dist_root).replace(os.sep, "/")
+            if rel not in keep:
+                os.remove(os.path.join(directory, name))
+                removed += 1
+        if directory != dist_root and not os.listdir(directory):
+            os.rmdir(directory)
+
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+    print(f"Built {len(manifest)} static files ({written} new, {removed} old removed): "
+          f"{total_size:,} B, {total_transfer:,} B with gzip. Manifest: {os.path.relpath(manifest_path, PROJECT_ROOT)}")
+    return manifest
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Fingerprint and precompress the files in app/static.")
+    arg_parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = arg_parser.parse_args()
+    build(verbose=not args.quiet)
+
+if __name__ == "__main__":
+    main()
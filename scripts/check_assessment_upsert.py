@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Correctness and concurrency checks for `crud.upsert_assessment`.
+
+Runs against a small synthetic database:
+  - a partial update only overwrites the fields that were sent,
+  - an unknown artist slug is rejected by the foreign key (returns None, no row written), while
+    any other integrity error is raised,
+  - many threads saving assessments for the same new artists at once never hit a
+    unique-constraint error and leave exactly one row per artist,
+  - a sync that drops an artist removes its events, deletes it if it has no assessment and keeps
+    it (and its assessment) if it has one; the foreign key refuses deleting an assessed artist,
+  - an artist missing from one sync and back in the next still has its assessment.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_assessment_upsert.py --threads 16 --artists 20
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+from typing import List
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.checks import check, finish
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check the single-statement assessment upsert.")
+    arg_parser.add_argument("--threads", type=int, default=16, help="Concurrent writers")
+    arg_parser.add_argument("--artists", type=int, default=20, help="New artists every writer saves")
+    args = arg_parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="smukfest-upsert-"), "upsert.db")
+    database_url = f"sqlite:///{db_path}"
+    # Must be set before app.database's engine is created
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+
+    from sqlalchemy import select, func, text
+    from sqlalchemy.exc import IntegrityError
+    from scripts.generate_synthetic_data import generate, build_api_payload
+    from scripts.sync_artists_db import sync_database
+    from app import crud, models, schemas
+    from app.database import SessionLocal, engine
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, num_artists=args.artists + 10, num_contacts=0, num_users=2,
+                 assessment_ratio=0.0, reset=True)
+
+    with SessionLocal() as db:
+        slugs = list(db.execute(select(models.Artist.slug).order_by(models.Artist.id)).scalars())
+    concurrent_slugs, other_slugs = slugs[:args.artists], slugs[args.artists:]
+
+    # --- Partial update ---
+    slug = other_slugs[0]
+    with SessionLocal() as db:
+        created = crud.upsert_assessment(db, slug, schemas.RiskAssessmentCreate(
+            risk_level="low", remarks="Første vurdering", crowd_profile="Unge"))
+        updated = crud.upsert_assessment(db, slug, schemas.RiskAssessmentCreate(risk_level="high"))
+    check(created is not None and updated is not None, "upsert returns the saved assessment")
+    check(updated.id == created.id, "an update keeps the assessment id")
+    check(updated.risk_level == "high", "an update overwrites the fields that were sent")
+    check(updated.remarks == "Første vurdering" and updated.crowd_profile == "Unge",
+          "an update leaves fields that weren't sent untouched")
+
+    # --- Unknown artist ---
+    with SessionLocal() as db:
+        result = crud.upsert_assessment(db, "findes-ikke", schemas.RiskAssessmentCreate(risk_level="low"))
+        rows = db.execute(select(func.count()).where(models.RiskAssessment.artist_slug == "findes-ikke")).scalar_one()
+    check(result is None and rows == 0, "an unknown artist slug is rejected by the foreign key")
+
+    # --- Other integrity errors ---
+    # A trigger stands in for any constraint other than the artist foreign key
+    with SessionLocal() as db:
+        db.execute(text("CREATE TRIGGER check_reject_assessment BEFORE INSERT ON risk_assessments "
+                        "BEGIN SELECT RAISE(ABORT, 'CHECK constraint failed: check_reject_assessment'); END"))
+        db.commit()
+        try:
+            crud.upsert_assessment(db, other_slugs[1], schemas.RiskAssessmentCreate(risk_level="low"))
+            raised = None
+        except IntegrityError as e:
+            raised = e
+        finally:
+            db.rollback()
+            db.execute(text("DROP TRIGGER check_reject_assessment"))
+            db.commit()
+    check(raised is not None, f"other integrity errors are raised, not reported as an unknown artist ({raised and raised.orig})")
+
+    # --- Concurrent first saves ---
+    barrier = threading.Barrier(args.threads)
+    errors: List[str] = []
+
+    def writer(index: int):
+        barrier.wait()
+        with SessionLocal() as db:
+            for slug in concurrent_slugs:
+                try:
+                    saved = crud.upsert_assessment(db, slug, schemas.RiskAssessmentCreate(
+                        risk_level=["low", "medium", "high"][index % 3], notes=f"writer {index}"))
+                    if saved is None:
+                        errors.append(f"writer {index}: {slug} was rejected")
+                except Exception as e:
+                    errors.append(f"writer {index}: {slug}: {e}")
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with SessionLocal() as db:
+        counts = dict(db.execute(
+            select(models.RiskAssessment.artist_slug, func.count())
+            .where(models.RiskAssessment.artist_slug.in_(concurrent_slugs))
+            .group_by(models.RiskAssessment.artist_slug)
+        ).all())
+    check(not errors, f"{args.threads} concurrent writers x {args.artists} new artists raise no errors"
+          + (f" ({len(errors)} errors, first: {errors[0]})" if errors else ""))
+    check(len(counts) == len(concurrent_slugs) and set(counts.values()) == {1},
+          "concurrent saves leave exactly one assessment per artist")
+
+    # --- Sync removing an artist ---
+    def sync(payload) -> str:
+        """Runs a sync and commits it; the error, or None."""
+        with SessionLocal() as db:
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    sync_database(db, payload)
+                db.commit()
+                return None
+            except Exception as e:
+                db.rollback()
+                return str(e)
+
+    def assessment_of(db, slug):
+        return db.execute(select(models.RiskAssessment).where(models.RiskAssessment.artist_slug == slug)).scalars().first()
+
+    assessed_slug, unassessed_slug = concurrent_slugs[0], other_slugs[-1]
+    with SessionLocal() as db:
+        before = assessment_of(db, assessed_slug)
+        before = (before.id, before.risk_level, before.notes)
+    full_payload = build_api_payload(args.artists + 10)
+    payload = build_api_payload(args.artists + 10)
+    dropped = {assessed_slug, unassessed_slug}
+    payload["artists"] = [a for a in payload["artists"] if a["slug"] not in dropped]
+    payload["schedule"] = [e for e in payload["schedule"] if e["artist_slug"] not in dropped]
+    payload["artist_slugs_from_api"] -= dropped
+    sync_error = sync(payload)
+    check(sync_error is None, "a sync that drops artists succeeds with foreign keys enforced"
+          + (f" ({sync_error})" if sync_error else ""))
+    with SessionLocal() as db:
+        kept = db.execute(select(models.Artist.slug).where(models.Artist.slug.in_(dropped))).scalars().all()
+        events = db.execute(select(func.count()).select_from(models.Event)
+                            .where(models.Event.artist_slug.in_(dropped))).scalar_one()
+        assessment = assessment_of(db, assessed_slug)
+        check(kept == [assessed_slug] and events == 0,
+              f"a dropped artist loses its events and is deleted unless it has an assessment (kept: {kept})")
+        check(assessment is not None, "the dropped artist's assessment is kept")
+        try:
+            crud.delete_artist(db, assessed_slug)
+            delete_error = None
+        except IntegrityError as e:
+            db.rollback()
+            delete_error = e
+        check(delete_error is not None and assessment_of(db, assessed_slug) is not None,
+              "the foreign key refuses deleting an artist that has an assessment")
+
+    sync_error = sync(full_payload)
+    with SessionLocal() as db:
+        after = assessment_of(db, assessed_slug)
+        after = (after.id, after.risk_level, after.notes) if after is not None else None
+        back = db.execute(select(func.count()).select_from(models.Artist).where(models.Artist.slug.in_(dropped))).scalar_one()
+    check(sync_error is None and back == 2, "both artists are back after the next sync"
+          + (f" ({sync_error})" if sync_error else ""))
+    check(after == before, f"an artist missing from one sync and back in the next still has its assessment ({after})")
+
+    engine.dispose()
+    os.remove(db_path)
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Checks the change log behind the change feed (app/change_log.py, `GET /api/changes`).
+
+Runs against a small synthetic database whose log gets a few thousand random upserts and
+deletes ("churn") on top of the generated data:
+  - `compact()` keeps only the latest row per key below the horizon, drops the deletes there,
+    leaves the newest `retain` versions untouched and records the compaction,
+  - a client reading from 0 (or from a version before the horizon) gets `reset` on the first page
+    and, following `next_since` and `reset_through`, reaches the end of the log in a finite number
+    of pages with the same state as replaying the uncompacted log,
+  - a `since` inside the compacted part without `reset_through` resets again, a stale
+    `reset_through` (the log was compacted again mid-read) restarts the reset, and a client past
+    the horizon reads on without a reset,
+  - the HTTP endpoint passes `reset_through` through.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_change_log.py --churn 3000 --retain 100 --page 100
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.checks import check, finish
+
+State = Dict[Tuple[str, str], Any]
+
+def apply(state: State, changes: List[Dict[str, Any]]) -> None:
+    for change in changes:
+        if change["operation"] == "delete":
+            state.pop((change["entity"], change["key"]), None)
+        else:
+            state[(change["entity"], change["key"])] = change["data"]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check change-log compaction and the change feed's paging.")
+    arg_parser.add_argument("--churn", type=int, default=3000, help="Random changes added to the log")
+    arg_parser.add_argument("--retain", type=int, default=100, help="Versions kept exactly by compact()")
+    arg_parser.add_argument("--page", type=int, default=100, help="Changes per page")
+    args = arg_parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="smukfest-change-log-"), "changes.db")
+    database_url = f"sqlite:///{db_path}"
+    # Must be set before app.database's engine is created
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+    os.environ.setdefault("SECRET_KEY", "change-log-check")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+
+    from sqlalchemy import select
+    from fastapi.testclient import TestClient
+    from scripts.generate_synthetic_data import generate
+    from app import change_log, models
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.database import SessionLocal, engine
+    from app.main import app
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, num_artists=60, num_contacts=20, num_users=2, reset=True)
+
+    rng = random.Random(2025)
+
+    def churn(db, count: int) -> None:
+        keys = [f"kunstner-{i}" for i in range(200)]
+        change_log.record_many(db, [
+            ("artist", rng.choice(keys), "delete", None) if rng.random() < 0.15
+            else ("artist", rng.choice(keys), "upsert", {"title": f"Titel {rng.randrange(10 ** 6)}"})
+            for _ in range(count)
+        ])
+        db.commit()
+
+    def full_log(db) -> List[Dict[str, Any]]:
+        return [dict(row._mapping) for row in db.execute(
+            select(models.ChangeLog.id, models.ChangeLog.entity, models.ChangeLog.key,
+                   models.ChangeLog.operation, models.ChangeLog.data).order_by(models.ChangeLog.id))]
+
+    def read_all(db, since: int, reset_through: Optional[int] = None, limit: int = args.page):
+        """Pages from `since` to the end; (state, pages, first page) for a client with an empty copy."""
+        state: State = {}
+        first = None
+        for pages in range(1, 10_000):
+            page = change_log.get_changes(db, since, limit, reset_through)
+            first = first or page
+            if page["reset"]:
+                state.clear()
+            apply(state, page["changes"])
+            since, reset_through = page["next_since"], page["reset_through"]
+            if not page["has_more"]:
+                return state, pages, first
+        return None, pages, first
+
+    # --- Compaction ---
+    with SessionLocal() as db:
+        churn(db, args.churn)
+        before = full_log(db)
+        expected: State = {}
+        apply(expected, before)
+        head = change_log.head(db)
+        removed = change_log.compact(db, retain=args.retain)
+        horizon = change_log.compacted_through(db)
+        after = full_log(db)
+
+    check(horizon == head - args.retain and removed == len(before) - len(after) and removed > 0,
+          f"compact() compacts up to head - retain ({horizon}) and reports the {removed} rows it removed")
+    compacted = [row for row in after if row["id"] <= horizon]
+    check(all(row["operation"] == "upsert" for row in compacted), "no deletes are left in the compacted part")
+    check(len({(row["entity"], row["key"]) for row in compacted}) == len(compacted),
+          "the compacted part has one row per key")
+    newer_keys = {(row["entity"], row["key"]) for row in after if row["id"] > horizon}
+    latest = {}
+    for row in before:
+        latest[(row["entity"], row["key"])] = row
+    check(all(latest[(row["entity"], row["key"])]["id"] == row["id"] or (row["entity"], row["key"]) in newer_keys
+              for row in compacted),
+          "each kept row below the horizon is its key's latest row (or is superseded above the horizon)")
+    check([row for row in before if row["id"] > horizon] == [row for row in after if row["id"] > horizon],
+          f"the newest {args.retain} versions are untouched")
+    check(len(compacted) > args.page, f"the compacted part ({len(compacted)} rows) takes more than one page of {args.page}")
+    with SessionLocal() as db:
+        check(change_log.compact(db, retain=args.retain) == 0, "compacting again without new changes removes nothing")
+
+    # --- Paging across the horizon ---
+    with SessionLocal() as db:
+        state, pages, first = read_all(db, 0)
+        check(state is not None and first["reset"],
+              f"a reset read from 0 reaches the end of the log ({pages} pages of {args.page})")
+        check(state == expected, f"and ends with the state of the uncompacted log ({len(expected)} keys)")
+
+        state, pages, first = read_all(db, horizon // 2)
+        check(state == expected and first["reset"] and first["since"] == horizon // 2,
+              "a client behind the horizon gets a reset and the same state")
+
+        first = change_log.get_changes(db, 0, args.page)
+        again = change_log.get_changes(db, first["next_since"], args.page)
+        resumed = change_log.get_changes(db, first["next_since"], args.page, first["reset_through"])
+        check(first["reset_through"] == horizon and again["reset"] and again["changes"][0]["version"] == first["changes"][0]["version"],
+              "without reset_through, a since inside the compacted part resets again")
+        check(not resumed["reset"] and resumed["changes"][0]["version"] > first["next_since"],
+              "with reset_through the next page continues after next_since")
+
+        last = change_log.get_changes(db, horizon, args.page)
+        check(not last["reset"] and last["reset_through"] is None and all(c["version"] > horizon for c in last["changes"]),
+              "a client at the horizon reads on without a reset")
+
+        # The log is compacted again while a reset read is under way
+        churn(db, args.retain * 3)
+        check(change_log.compact(db, retain=args.retain) > 0, "a second compaction moves the horizon")
+        restarted = change_log.get_changes(db, first["next_since"], args.page, first["reset_through"])
+        check(restarted["reset"] and restarted["compacted_through"] > horizon,
+              "a reset_through from before the new compaction restarts the reset")
+        state, pages, _ = read_all(db, first["next_since"], first["reset_through"])
+        current: State = {}
+        apply(current, full_log(db))
+        check(state == current, f"and ends with the current state ({pages} pages)")
+
+    # --- HTTP ---
+    with SessionLocal() as db:
+        admin = db.execute(select(models.User).where(models.User.role == models.UserRoleEnum.ADMIN)).scalars().first()
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, create_access_token({"sub": admin.username, "role": admin.role.value}))
+    page = client.get(f"/api/changes?since=0&limit={args.page}").json()
+    following = client.get(f"/api/changes?since={page['next_since']}&limit={args.page}&reset_through={page['reset_through']}").json()
+    check(page["reset"] and page["reset_through"] and not following["reset"]
+          and following["changes"][0]["version"] > page["next_since"],
+          "GET /api/changes returns reset_through and continues a reset read with it")
+
+    engine.dispose()
+    os.remove(db_path)
+    finish()
+
+if __name__ == "__main__":
+    main()
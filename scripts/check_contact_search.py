@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Checks the contact full-text search (app/models.py `CONTACTS_FTS_DDL`, app/crud.py
+`contact_match_expression` and `get_all_contacts`, `/contacts?search=`).
+
+Runs against a small synthetic database with a handful of known contacts on top:
+  - the triggers keep contacts_fts in sync: a created contact is indexed (with æ/ø/å folded to
+    ae/oe/aa and the digits-only phone), an update replaces its row (the old terms no longer
+    match), a deleted row leaves the index, and the index has exactly one row per contact,
+  - a phone number is found typed with or without spaces, and digit runs shorter than
+    MIN_PHONE_SEARCH_DIGITS aren't phone searches,
+  - "Fønsgård", "FØNSGÅRD" and "Foensgaard" find the same contact (likewise æ and å in names),
+  - every word matches as a prefix ("føns", "stage man"), all words must match, the best match
+    ranks first, and searches without words or with FTS5 syntax don't fail.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_contact_search.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.checks import check, finish
+
+CONTACTS = [
+    # (category, role, name, phone)
+    ("HØJSKOLEN", "Stage Manager", "Bjørn Fønsgård", "23 46 43 19"),
+    ("ANSL", "Security", "Mette Æbelø", "+45 40 11 22 33"),
+    ("THE HOOD", "Produktionsleder", "Åse Ågård", "51515151"),
+    ("ANSL", "Stage Hand", "Peter Kvist", "20 30 40 50"),
+    ("BJØRNEBANDEN", "Back up", "Lise Holt", "31 31 31 31"),
+]
+
+def main():
+    db_path = os.path.join(tempfile.mkdtemp(prefix="smukfest-contact-search-"), "contacts.db")
+    database_url = f"sqlite:///{db_path}"
+    # Must be set before app.database's engine is created
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+    os.environ.setdefault("SECRET_KEY", "contact-search-check")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+
+    from sqlalchemy import select, text
+    from fastapi.testclient import TestClient
+    from scripts.generate_synthetic_data import generate
+    from app import crud, models, schemas
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.database import SessionLocal, engine
+    from app.main import app
+    from app.utils import fold_danish, phone_digits
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, num_artists=5, num_contacts=40, num_users=2, assessment_ratio=0.0, reset=True)
+
+    def fts_row(db, contact_id):
+        return db.execute(text("SELECT name, role, category, phone, phone_digits FROM contacts_fts WHERE rowid = :id"),
+                          {"id": contact_id}).first()
+
+    def search(db, query):
+        return [contact.name for contact in crud.get_all_contacts(db, search=query)]
+
+    # --- Triggers ---
+    with SessionLocal() as db:
+        ids = {}
+        for category, role, name, phone in CONTACTS:
+            contact = crud.create_contact(db, schemas.ContactCreate(category=category, role=role, name=name, phone=phone))
+            ids[name] = contact.id
+        row = fts_row(db, ids["Bjørn Fønsgård"])
+        check(row is not None and tuple(row) == ("bjoern foensgaard", "stage manager", "hoejskolen", "23 46 43 19", "23464319"),
+              f"an inserted contact is indexed with folded text and the digits-only phone ({tuple(row) if row else None})")
+
+        update = schemas.ContactCreate(category="ANSL", role="Security", name="Peter Holm", phone="20 30 40 99")
+        crud.update_contact(db, ids["Peter Kvist"], update)
+        row = fts_row(db, ids["Peter Kvist"])
+        check(row is not None and row.name == "peter holm" and row.phone_digits == "20304099",
+              "an update replaces the contact's index row")
+        check(search(db, "Kvist") == [] and search(db, "Holm") == ["Peter Holm"] and search(db, "20304050") == [],
+              "the old name and phone no longer match after an update")
+
+        contact = db.get(models.Contact, ids["Peter Kvist"])
+        db.delete(contact)
+        db.commit()
+        check(fts_row(db, ids["Peter Kvist"]) is None and search(db, "Holm") == [],
+              "a deleted contact leaves the index")
+
+        crud.delete_contact(db, ids["Åse Ågård"])
+        check(fts_row(db, ids["Åse Ågård"]) is not None and search(db, "Ågård") == [],
+              "a soft-deleted contact stays indexed but isn't found")
+        crud.update_contact(db, ids["Åse Ågård"], schemas.ContactCreate(
+            category="THE HOOD", role="Produktionsleder", name="Åse Ågård", phone="51515151"))
+
+        contacts = db.execute(select(models.Contact)).scalars().all()
+        indexed = dict(db.execute(text("SELECT rowid, name FROM contacts_fts")).all())
+        check(len(indexed) == len(contacts)
+              and all(indexed.get(contact.id) == fold_danish(contact.name) for contact in contacts),
+              f"the index has exactly one up-to-date row per contact ({len(indexed)} rows, {len(contacts)} contacts)")
+
+    # --- Phone numbers ---
+    with SessionLocal() as db:
+        check(all(search(db, query) == ["Bjørn Fønsgård"] for query in ("23464319", "23 46 43 19", "2346", "+23-46")),
+              "a phone number is found with and without spaces, and by its first digits")
+        check(search(db, "40112233") == ["Mette Æbelø"] and search(db, "+45 40 11") == ["Mette Æbelø"],
+              "an international number is found by its digits")
+        check(crud.contact_match_expression("23") == '"23"*' and phone_digits("2 3") == "23",
+              "a digit run shorter than MIN_PHONE_SEARCH_DIGITS is only a word search")
+
+    # --- Danish letters ---
+    with SessionLocal() as db:
+        for spellings, name in (
+            (("Fønsgård", "fønsgård", "FØNSGÅRD", "Foensgaard", "foensgaard"), "Bjørn Fønsgård"),
+            (("Æbelø", "æbelø", "Aebeloe", "AEBELOE"), "Mette Æbelø"),
+            (("Ågård", "ågård", "Aagaard", "AAGAARD"), "Åse Ågård"),
+        ):
+            results = {spelling: search(db, spelling) for spelling in spellings}
+            check(all(result == [name] for result in results.values()),
+                  f"{', '.join(spellings)} all find {name} ({sorted({len(r) for r in results.values()})} results)")
+        check(search(db, "Hoejskolen") == ["Bjørn Fønsgård"] and search(db, "højskolen") == ["Bjørn Fønsgård"],
+              "the category is folded too")
+
+    # --- Prefixes, ranking and odd input ---
+    with SessionLocal() as db:
+        check(search(db, "føns") == ["Bjørn Fønsgård"] and search(db, "foens") == ["Bjørn Fønsgård"],
+              "a word matches as a prefix, before and after folding")
+        check(search(db, "fønsgård stage man") == ["Bjørn Fønsgård"] and search(db, "fønsgård security") == [],
+              "every word must match")
+        ranked = search(db, "bjørn")
+        check(ranked == ["Bjørn Fønsgård", "Lise Holt"], f"a name match ranks above a category match ({ranked})")
+        check(crud.contact_match_expression("  -- ") is None and len(search(db, "  -- ")) > len(CONTACTS),
+              "a search without words doesn't filter")
+        failed = []
+        for query in ('"', 'NEAR(a b)', 'name:søren', 'a OR', '*', 'sø*ren', '^fønsgård', '(-)'):
+            try:
+                search(db, query)
+            except Exception as e:
+                failed.append(f"{query!r}: {e}")
+        check(not failed, f"FTS5 syntax in a search doesn't fail ({'; '.join(failed)})")
+
+    # --- HTTP ---
+    with SessionLocal() as db:
+        admin = db.execute(select(models.User).where(models.User.role == models.UserRoleEnum.ADMIN)).scalars().first()
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, create_access_token({"sub": admin.username, "role": admin.role.value}))
+    response = client.get("/contacts", params={"search": "foensgaard"})
+    check(response.status_code == 200 and "Bjørn Fønsgård" in response.text and "Mette Æbelø" not in response.text,
+          "/contacts?search= uses the same search")
+
+    engine.dispose()
+    os.remove(db_path)
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Checks the Danish datetime formatting (`app/datetime_format.py`) against the implementation it
+replaced: `strftime` under `locale.setlocale(LC_TIME, 'da_DK.UTF-8')`, with the festival-day
+handling from the old `utils.format_datetime`.
+
+  - If the da_DK.UTF-8 locale is installed (it is in the Docker image), every format the templates
+    and routes use is compared with the old implementation for every half hour of two weeks
+    (as datetimes and as ISO strings, with and without festival mode).
+  - Always: a set of known outputs, N/A handling, aware datetimes in different time zones (which
+    compare equal, so they must not share a cache entry), and that formatting from many threads
+    leaves the process locale untouched.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_datetime_format.py
+"""
+
+import locale
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from app import datetime_format
+from app.datetime_format import format_datetime
+from scripts.checks import check, finish
+
+# Every format passed to the date filters and format_datetime in app/
+FORMATS = [
+    "%a, %d %b %H:%M", # Default
+    "%H:%M",
+    "%A %H:%M, %d/%m-%Y",
+    "%A, %d/%m-%Y %H:%M",
+    "%a %H:%M",
+    "%H:%M, %d/%m-%Y",
+    "%A %-d/%-m",
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%d. %B %Y",
+]
+
+# --- The replaced implementation (utils.format_datetime before app/datetime_format.py) ---
+
+def legacy_festival_day_name(event_time: datetime) -> str:
+    festival_date = event_time - timedelta(days=1) if event_time.hour < 6 else event_time
+    danish_days = {'Monday': 'Mandag', 'Tuesday': 'Tirsdag', 'Wednesday': 'Onsdag', 'Thursday': 'Torsdag',
+                   'Friday': 'Fredag', 'Saturday': 'Lørdag', 'Sunday': 'Søndag'}
+    english_day = festival_date.strftime('%A')
+    return danish_days.get(english_day, english_day)
+
+def legacy_format_datetime(value, format_str="%a, %d %b %H:%M", use_festival_day=False) -> str:
+    dt_object = None
+    if isinstance(value, datetime):
+        dt_object = value
+    elif isinstance(value, str):
+        from dateutil import parser
+        try:
+            dt_object = parser.isoparse(value)
+        except (ValueError, parser.ParserError):
+            pass
+    if dt_object is None:
+        return "N/A"
+    if use_festival_day and dt_object.hour < 6 and ('%A' in format_str or '%a' in format_str):
+        festival_day_name = legacy_festival_day_name(dt_object)
+        time_part = dt_object.strftime(format_str.replace('%A', '{}').replace('%a', '{}'))
+        return time_part.format(festival_day_name if '%A' in format_str else festival_day_name[:3])
+    return dt_object.strftime(format_str)
+
+def compare_with_locale() -> None:
+    try:
+        previous = locale.setlocale(locale.LC_TIME)
+        locale.setlocale(locale.LC_TIME, "da_DK.UTF-8")
+    except locale.Error:
+        print("note the da_DK.UTF-8 locale is not installed: skipping the comparison with the old implementation")
+        return
+    try:
+        start = datetime(2025, 7, 28) # Two weeks around the festival, every half hour, across a month boundary
+        values = [start + timedelta(minutes=30 * i) for i in range(14 * 48)]
+        mismatches = []
+        compared = 0
+        for format_str in FORMATS:
+            for festival in (False, True):
+                for value in values:
+                    for item in (value, value.isoformat()):
+                        expected = legacy_format_datetime(item, format_str, festival)
+                        actual = format_datetime(item, format_str, festival)
+                        compared += 1
+                        if actual != expected:
+                            mismatches.append(f"{item!r} {format_str!r} festival={festival}: {actual!r} != {expected!r}")
+        check(not mismatches, f"identical to strftime under da_DK.UTF-8 for {compared:,} values"
+              + (f" ({len(mismatches)} differ, first: {mismatches[0]})" if mismatches else ""))
+    finally:
+        locale.setlocale(locale.LC_TIME, previous)
+
+def main():
+    compare_with_locale()
+
+    # --- Known outputs ---
+    evening = datetime(2025, 7, 30, 20, 0)
+    night = datetime(2025, 7, 31, 1, 30)
+    examples = [
+        (format_datetime(evening), "ons, 30 jul 20:00"),
+        (format_datetime(evening, "%A %H:%M, %d/%m-%Y", use_festival_day=True), "onsdag 20:00, 30/07-2025"),
+        (format_datetime(night, "%A %H:%M, %d/%m-%Y"), "torsdag 01:30, 31/07-2025"),
+        (format_datetime(night, "%A %H:%M, %d/%m-%Y", use_festival_day=True), "Onsdag 01:30, 31/07-2025"),
+        (format_datetime(night, "%a %H:%M", use_festival_day=True), "Ons 01:30"),
+        (format_datetime("2025-08-02", "%A %-d/%-m"), "lørdag 2/8"),
+        (format_datetime(datetime(2025, 12, 1), "%d. %B %Y"), "01. december 2025"),
+        (format_datetime(datetime(2025, 5, 4, 9, 5), "%a %d %b %H:%M%p"), "søn 04 maj 09:05"),
+        (format_datetime("2025-07-30T20:00:00", "%Y-%m-%d %H:%M:%S"), "2025-07-30 20:00:00"),
+        (format_datetime(evening, "100%% %H"), "100% 20"),
+    ]
+    for actual, expected in examples:
+        check(actual == expected, f"{expected!r}" + ("" if actual == expected else f" (got {actual!r})"))
+    check(format_datetime(None) == "N/A" and format_datetime("ikke en dato") == "N/A" and format_datetime(42) == "N/A",
+          "None, unparsable strings and other types are N/A")
+
+    # --- Time zones ---
+    utc = datetime(2025, 7, 30, 18, 0, tzinfo=timezone.utc)
+    copenhagen = utc.astimezone(timezone(timedelta(hours=2)))
+    check(format_datetime(utc, "%H:%M") == "18:00" and format_datetime(copenhagen, "%H:%M") == "20:00",
+          "equal aware datetimes in different time zones don't share a cache entry")
+
+    # --- Threads and the process locale ---
+    locale_before = locale.setlocale(locale.LC_TIME)
+    datetime_format.clear_cache()
+    errors: List[str] = []
+
+    def worker(offset: int):
+        for i in range(2000):
+            value = evening + timedelta(minutes=offset + i)
+            expected = f"{datetime_format.DAY_NAMES[value.weekday()]} {value:%H:%M}"
+            if format_datetime(value, "%A %H:%M") != expected:
+                errors.append(f"{value}: {format_datetime(value, '%A %H:%M')!r}")
+
+    threads = [threading.Thread(target=worker, args=(i * 7,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check(not errors, "8 threads formatting at once get correct results")
+    check(locale.setlocale(locale.LC_TIME) == locale_before, f"the process locale is untouched ({locale_before})")
+
+    finish()
+
+if __name__ == "__main__":
+    main()
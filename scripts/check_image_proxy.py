@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Checks for the artist image proxy (`/img/{slug}/{size}`, app/image_proxy.py) against a local
+stand-in for the festival's image CDN.
+
+A small HTTP server on 127.0.0.1 serves generated PNG images (and a 404 and an HTML page) and
+counts the requests per path. The artists of a synthetic database are pointed at it, and the
+checks verify that:
+  - a proxied image is served with an image content type and the right caching headers,
+  - each upstream image is fetched once, also when many requests for it arrive at once,
+  - a request with the current `?v=` is served from disk without a database query,
+  - an outdated `?v=` redirects to the current URL; an unknown size or artist is a 404,
+  - an upstream image that can't be fetched (404, not an image) redirects to the upstream URL and
+    isn't fetched again right away,
+  - `prewarm()` fetches exactly the missing images and removes the ones no artist uses anymore,
+  - with Pillow installed: the variants are JPEGs within their size (thumbs are square).
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_image_proxy.py --threads 16
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.checks import check, finish
+
+def make_png(width: int, height: int, seed: int) -> bytes:
+    """A noisy RGB PNG (noise, so the resized JPEG is smaller than the original)."""
+    rng = random.Random(seed)
+    rows = b"".join(b"\x00" + bytes(rng.getrandbits(8) for _ in range(width * 3)) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+class StandInCDN:
+    """Serves /artists/<n>.png images, /broken.html (not an image) and 404s; counts requests per path."""
+
+    def __init__(self):
+        self.hits: Counter = Counter()
+        self.images = {}
+        cdn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                cdn.hits[self.path] += 1
+                if self.path in cdn.images:
+                    body, content_type = cdn.images[self.path], "image/png"
+                elif self.path == "/broken.html":
+                    body, content_type = b"<html><body>Ikke et billede</body></html>", "text/html"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add_image(self, index: int) -> str:
+        path = f"/artists/{index}.png"
+        self.images[path] = make_png(300 + index % 7 * 20, 200, seed=index)
+        return self.base_url + path
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check the artist image proxy against a local stand-in CDN.")
+    arg_parser.add_argument("--threads", type=int, default=16, help="Concurrent requests for one uncached image")
+    args = arg_parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="smukfest-images-")
+    database_url = f"sqlite:///{os.path.join(workdir, 'images.db')}"
+    # Must be set before app.database's engine and app.image_proxy are created
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["IMAGE_CACHE_DIR"] = os.path.join(workdir, "images")
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+    os.environ.setdefault("SECRET_KEY", "image-proxy-check")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+
+    from sqlalchemy import select, update
+    from fastapi.testclient import TestClient
+    from scripts.generate_synthetic_data import generate
+    from app import image_proxy, models, read_models
+    from app.database import SessionLocal, engine
+    from app.query_log import count_queries
+    from app.main import app
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, num_artists=12, num_contacts=0, num_users=2, assessment_ratio=0.0, reset=True)
+
+    cdn = StandInCDN()
+    with SessionLocal() as db:
+        slugs = list(db.execute(select(models.Artist.slug).order_by(models.Artist.id)).scalars())
+        image_urls = {slug: cdn.add_image(i) for i, slug in enumerate(slugs[:10])}
+        image_urls[slugs[10]] = cdn.base_url + "/missing.png"
+        image_urls[slugs[11]] = cdn.base_url + "/broken.html"
+        for slug, url in image_urls.items():
+            db.execute(update(models.Artist).where(models.Artist.slug == slug).values(image_url=url))
+        db.commit()
+
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+        print("note Pillow is not installed: the proxy serves the original images unresized")
+
+    client = TestClient(app)
+    slug, url = slugs[0], image_urls[slugs[0]]
+    upstream_path = url[len(cdn.base_url):]
+
+    # --- First request, then from disk ---
+    response = client.get(f"/img/{slug}/thumb", follow_redirects=False)
+    check(response.status_code == 200 and response.headers["content-type"].startswith("image/"),
+          "an uncached image is fetched and served as an image")
+    check(response.headers.get("cache-control") == image_proxy.SHORT_CACHE,
+          "without ?v= the image is cached briefly")
+    src = image_proxy.image_src(slug, url, "card")
+    client.get(src, follow_redirects=False) # Writes the card variant from the stored original
+    response = client.get(src, follow_redirects=False)
+    check(response.status_code == 200 and response.headers.get("cache-control") == image_proxy.IMMUTABLE,
+          "with the current ?v= the image is cached as immutable")
+    with count_queries(engine) as counter:
+        response = client.get(src, follow_redirects=False)
+    check(response.status_code == 200 and counter.count == 0, "a cached variant is served without a database query")
+    check(cdn.hits[upstream_path] == 1, f"the upstream image was fetched once for two sizes (fetched {cdn.hits[upstream_path]}x)")
+
+    # --- Concurrent requests for one uncached image ---
+    concurrent_slug = slugs[1]
+    concurrent_path = image_urls[concurrent_slug][len(cdn.base_url):]
+    barrier = threading.Barrier(args.threads)
+    statuses: List[int] = []
+
+    def request_detail():
+        thread_client = TestClient(app)
+        barrier.wait()
+        statuses.append(thread_client.get(f"/img/{concurrent_slug}/detail", follow_redirects=False).status_code)
+
+    threads = [threading.Thread(target=request_detail) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check(statuses == [200] * args.threads and cdn.hits[concurrent_path] == 1,
+          f"{args.threads} concurrent requests fetch the upstream image once (fetched {cdn.hits[concurrent_path]}x)")
+
+    # --- Outdated versions, unknown sizes and artists ---
+    response = client.get(f"/img/{slug}/thumb?v=0123456789abcdef", follow_redirects=False)
+    check(response.status_code == 302 and response.headers["location"] == image_proxy.image_src(slug, url, "thumb"),
+          "an outdated ?v= redirects to the current image URL")
+    check(client.get(f"/img/{slug}/huge", follow_redirects=False).status_code == 404, "an unknown size is a 404")
+    check(client.get("/img/findes-ikke/thumb", follow_redirects=False).status_code == 404, "an unknown artist is a 404")
+
+    # --- Upstream failures ---
+    for failing_slug, label in ((slugs[10], "an upstream 404"), (slugs[11], "an upstream HTML page")):
+        failing_url = image_urls[failing_slug]
+        failing_path = failing_url[len(cdn.base_url):]
+        first = client.get(f"/img/{failing_slug}/thumb", follow_redirects=False)
+        second = client.get(f"/img/{failing_slug}/card", follow_redirects=False)
+        check(first.status_code == 302 and first.headers["location"] == failing_url and second.status_code == 302,
+              f"{label} redirects to the upstream URL")
+        check(cdn.hits[failing_path] == 1, f"{label} is not fetched again right away (fetched {cdn.hits[failing_path]}x)")
+
+    # --- Prewarming ---
+    hits_before = sum(cdn.hits.values())
+    with SessionLocal() as db:
+        result = image_proxy.prewarm(read_models.get_image_urls(db))
+    fetched = sum(cdn.hits.values()) - hits_before
+    check(result["images"] == 12 and result["warmed"] == 10 and result["failed"] == 2,
+          f"prewarm completes the 10 images with missing sizes ({result})")
+    check(fetched == 8, f"prewarm makes one upstream request per image not on disk yet ({fetched} requests)")
+    with SessionLocal() as db:
+        result = image_proxy.prewarm(read_models.get_image_urls(db))
+    check(result["warmed"] == 0 and sum(cdn.hits.values()) - hits_before == 8,
+          "a second prewarm has nothing to fetch (and doesn't retry the failed images yet)")
+
+    with SessionLocal() as db:
+        db.execute(update(models.Artist).where(models.Artist.slug == slug).values(image_url=cdn.add_image(99)))
+        db.commit()
+        result = image_proxy.prewarm(read_models.get_image_urls(db))
+    check(result["warmed"] == 1 and result["removed"] == 1, f"a changed image is fetched and the old one removed ({result})")
+    check(not os.path.exists(os.path.join(image_proxy.IMAGE_CACHE_DIR, image_proxy.url_key(url))),
+          "the old image's files are gone")
+
+    # --- Resizing ---
+    if Image is not None:
+        for size_name, size in image_proxy.SIZES.items():
+            path = image_proxy.cached_variant(image_proxy.url_key(image_urls[slugs[2]]), size_name)
+            with Image.open(path) as image:
+                width, height = image.size
+                within = width <= size.width and height <= size.width and (not size.square or width == height)
+                check(image.format in ("JPEG", "PNG") and within,
+                      f"the {size_name} variant is {image.format} {width}x{height} (max {size.width})")
+
+    cdn.server.shutdown()
+    engine.dispose()
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Checks the keyset pagination of `GET /api/artists` and `GET /api/events` (app/crud.py
+`encode_cursor`, `decode_cursor`, `_keyset_page`).
+
+Runs against a small synthetic database, with extra artists sharing a title and extra events
+sharing a start time so the pages have to break ties on the unique last column:
+  - following `next_cursor` from the first page returns every artist and every event exactly
+    once, in (title, id) and (start_time, event_id) order, for several page sizes, and the last
+    page has no cursor,
+  - `decode_cursor` round-trips `encode_cursor` and raises ValueError for garbage, a cursor with
+    the wrong number of values and one with values of the wrong type,
+  - `?cursor=garbage` (and the other bad cursors) gives HTTP 400 on both endpoints.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_keyset_pagination.py
+"""
+
+import base64
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.checks import check, finish
+
+PAGE_SIZES = (1, 7, 50, 1000)
+
+def main():
+    db_path = os.path.join(tempfile.mkdtemp(prefix="smukfest-keyset-"), "keyset.db")
+    database_url = f"sqlite:///{db_path}"
+    # Must be set before app.database's engine is created
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+    os.environ.setdefault("SECRET_KEY", "keyset-check")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+
+    from sqlalchemy import select
+    from fastapi.testclient import TestClient
+    from scripts.generate_synthetic_data import generate
+    from app import crud, models
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.database import SessionLocal, engine
+    from app.main import app
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, num_artists=80, num_contacts=0, num_users=2, assessment_ratio=0.0, reset=True)
+
+    # Ties on the first ordering column
+    with SessionLocal() as db:
+        stage_id = db.execute(select(models.Stage.id)).scalars().first()
+        tied_start = datetime(2025, 8, 7, 21, 0)
+        for i in range(12):
+            db.add(models.Artist(slug=f"samme-navn-{i}", title="Samme Navn"))
+            db.add(models.Event(artist_slug=f"samme-navn-{i}", stage_id=stage_id, start_time=tied_start))
+        db.commit()
+        artist_ids = [a.id for a in db.execute(select(models.Artist).order_by(models.Artist.title, models.Artist.id)).scalars()]
+        event_ids = [e.event_id for e in db.execute(select(models.Event).order_by(models.Event.start_time, models.Event.event_id)).scalars()]
+
+    def read_all(get_page, key, limit):
+        """Follows next_cursor from the first page; the ids in order, or None if it doesn't end."""
+        ids, cursor = [], None
+        with SessionLocal() as db:
+            for _ in range(10_000):
+                rows, cursor = get_page(db, limit=limit, cursor=cursor)
+                ids.extend(getattr(row, key) for row in rows)
+                if cursor is None:
+                    return ids
+        return None
+
+    # --- Paging ---
+    for name, get_page, key, expected in (
+        ("artists", crud.get_artists_page, "id", artist_ids),
+        ("events", crud.get_events_page, "event_id", event_ids),
+    ):
+        for limit in PAGE_SIZES:
+            ids = read_all(get_page, key, limit)
+            check(ids == expected,
+                  f"{name}, {limit} per page: every row exactly once, in order "
+                  f"({len(ids) if ids is not None else 'no end'} of {len(expected)})")
+
+    with SessionLocal() as db:
+        rows, cursor = crud.get_artists_page(db, limit=len(artist_ids))
+        check(len(rows) == len(artist_ids) and cursor is None, "a page holding the last row has no next cursor")
+
+    # --- Cursors ---
+    columns = [models.Event.start_time, models.Event.event_id]
+    values = [datetime(2025, 8, 7, 21, 0), 42]
+    check(crud.decode_cursor(crud.encode_cursor(values), columns) == values, "decode_cursor round-trips encode_cursor")
+
+    def encoded(raw: str) -> str:
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    bad_cursors = {
+        "garbage": "garbage",
+        "not JSON": encoded("ikke json"),
+        "not a list": encoded('{"id": 1}'),
+        "too few values": encoded('["2025-08-07T21:00:00"]'),
+        "too many values": encoded('["2025-08-07T21:00:00", 1, 2]'),
+    }
+    bad_event_cursors = {
+        **bad_cursors,
+        "a bad datetime": encoded('["i morgen", 1]'),
+        "a string for an id": encoded('["2025-08-07T21:00:00", "1"]'),
+    }
+    bad_artist_cursors = {**bad_cursors, "a number for a title": encoded("[1, 1]")}
+    for label, cursor in bad_event_cursors.items():
+        try:
+            crud.decode_cursor(cursor, columns)
+            raised = False
+        except ValueError:
+            raised = True
+        check(raised, f"decode_cursor raises ValueError for {label}")
+
+    # --- HTTP ---
+    with SessionLocal() as db:
+        admin = db.execute(select(models.User).where(models.User.role == models.UserRoleEnum.ADMIN)).scalars().first()
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, create_access_token({"sub": admin.username, "role": admin.role.value}))
+    for path, key, expected, bad in (
+        ("/api/artists", "id", artist_ids, bad_artist_cursors),
+        ("/api/events", "event_id", event_ids, bad_event_cursors),
+    ):
+        ids, cursor = [], None
+        for _ in range(1000):
+            page = client.get(path, params={"limit": 25, **({"cursor": cursor} if cursor else {})}).json()
+            ids.extend(item[key] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        check(ids == expected, f"GET {path} pages through every row exactly once")
+        statuses = {label: client.get(path, params={"cursor": cursor}).status_code for label, cursor in bad.items()}
+        check(all(status == 400 for status in statuses.values()),
+              f"GET {path}?cursor=garbage and the other bad cursors give 400 ({sorted(set(statuses.values()))})")
+
+    engine.dispose()
+    os.remove(db_path)
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Per-route SQL query budgets.
+
+Renders every route in `app/main.py` through the TestClient against a synthetic database and
+counts the SQL statements each request executes (see `query_log.count_queries`). Every route has
+an explicit budget; the script exits non-zero when a request exceeds it, so a change to the
+`joinedload` options in `app/crud.py` that turns `event.artist`, `event.stage` or
+`artist.assessment` into per-row lazy loads is caught before it ships. It also exits non-zero when
+a registered route has neither a budget nor an entry in UNBUDGETED_ROUTES, so new routes get one.
+
+The budgets count the authenticated user lookup as one statement.
+
+Usage:
+    python scripts/check_query_budgets.py             # 1x synthetic festival
+    python scripts/check_query_budgets.py --scale 3 -v  # show the statements of failing routes
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+# --- Budgets ---
+# (label, method, path, JSON body, maximum number of statements, expected status code)
+# "{slug}", "{date}", "{contact_id}" and "{stage_id}" are filled in from the dataset. Bodies of
+# FORM_PATHS are sent as an HTML form instead of JSON.
+QUERY_BUDGETS: List[Tuple[str, str, str, Optional[Dict[str, Any]], int, int]] = [
+    ("GET /", "GET", "/", None, 6, 200), # One page of artists and of the schedule, the cards' events, the filter options
+    ("GET /?filter_date=&filter_risk=", "GET", "/?filter_date={date}&filter_risk=high", None, 6, 200),
+    ("GET /?q=", "GET", "/?q=orkestr", None, 8, 200), # Includes building the artist search index
+    ("GET /api/overview-index", "GET", "/api/overview-index", None, 4, 200), # Includes building the index
+    ("GET /artists/{slug}", "GET", "/artists/{slug}", None, 2, 200),
+    ("GET /calendar", "GET", "/calendar", None, 5, 200),
+    ("GET /calendar?date=", "GET", "/calendar?date={date}", None, 5, 200),
+    ("GET /calendar/print?date=", "GET", "/calendar/print?date={date}", None, 4, 200),
+    ("GET /now?at=", "GET", "/now?at={date}T20:00:00", None, 4, 200), # Includes building the schedule index
+    ("GET /api/now-next?at=", "GET", "/api/now-next?at={date}T20:00:00", None, 3, 200),
+    ("GET /analytics?date=", "GET", "/analytics?date={date}", None, 5, 200), # Includes computing the heatmap
+    ("GET /api/analytics?date=", "GET", "/api/analytics?date={date}", None, 3, 200), # Cached heatmap
+    ("GET /contacts", "GET", "/contacts", None, 3, 200),
+    ("GET /contacts?search=", "GET", "/contacts?search=sen", None, 3, 200),
+    ("GET /admin/assessments", "GET", "/admin/assessments", None, 2, 200),
+    ("GET /admin/contacts", "GET", "/admin/contacts", None, 3, 200),
+    ("GET /admin/sync-runs", "GET", "/admin/sync-runs", None, 2, 200),
+    ("POST /api/assessments/{slug}", "POST", "/api/assessments/{slug}",
+     {"risk_level": "high", "remarks": "Budget check"}, 3, 200), # Includes the change-log insert
+    ("POST /api/assessments/batch", "POST", "/api/assessments/batch",
+     {"items": [{"artist_slug": "{slug}", "risk_level": "low"}, {"artist_slug": "findes-ikke", "risk_level": "low"}]},
+     4, 200), # Includes the change-log insert
+    ("POST /api/contacts", "POST", "/api/contacts",
+     {"category": "ANSL", "role": "Stage Manager", "name": "Budget Check", "phone": "12 34 56 78"}, 4, 200), # Includes the change-log insert
+    ("PUT /api/contacts/{contact_id}", "PUT", "/api/contacts/{contact_id}",
+     {"category": "ANSL", "role": "Back up", "name": "Budget Check", "phone": "87 65 43 21"}, 5, 200), # Includes the change-log insert
+    ("DELETE /api/contacts/{contact_id}", "DELETE", "/api/contacts/{contact_id}", None, 4, 200), # Includes the change-log insert
+    ("PUT /api/stages/{stage_id}/capacity", "PUT", "/api/stages/{stage_id}/capacity", {"capacity": 5000}, 4, 200),
+    ("GET /api/artists", "GET", "/api/artists?limit=50", None, 2, 200),
+    ("GET /api/events", "GET", "/api/events?limit=50", None, 2, 200),
+    ("GET /api/assessments", "GET", "/api/assessments?limit=50", None, 2, 200),
+    ("GET /api/artists/search", "GET", "/api/artists/search?q=artsit", None, 3, 200), # Includes building the index
+    ("GET /api/contacts/suggest", "GET", "/api/contacts/suggest?q=sen", None, 3, 200), # Includes building the index
+    ("GET /api/changes?since=0", "GET", "/api/changes?since=0", None, 3, 200),
+    ("GET /api/slow-queries", "GET", "/api/slow-queries", None, 1, 200),
+    ("DELETE /api/slow-queries", "DELETE", "/api/slow-queries", None, 1, 200),
+    ("GET /api/compression-stats", "GET", "/api/compression-stats", None, 1, 200),
+    ("DELETE /api/compression-stats", "DELETE", "/api/compression-stats", None, 1, 200),
+    ("GET /api/sync-runs", "GET", "/api/sync-runs", None, 2, 200),
+    ("GET /api/data-version", "GET", "/api/data-version", None, 2, 200),
+    ("GET /sw.js", "GET", "/sw.js", None, 0, 200),
+    ("GET /img/{unknown}/thumb", "GET", "/img/findes-ikke/thumb", None, 1, 404), # Artist image lookup
+    ("GET /api-status", "GET", "/api-status", None, 0, 200),
+    ("GET /login", "GET", "/login", None, 1, 303), # Logged in users are redirected to /
+    ("POST /login", "POST", "/login", {"username": "admin", "password": "smukfest"}, 1, 303), # generate()'s password
+    ("GET /logout", "GET", "/logout", None, 0, 303),
+]
+
+FORM_PATHS = {"/login"}
+
+# Registered routes that can't be measured with a single request, and why
+UNBUDGETED_ROUTES: Dict[Tuple[str, str], str] = {
+    ("GET", "/api/stream"): "an endless event stream; only the login lookup touches the database",
+}
+
+def unbudgeted_routes(app, urls: List[Tuple[str, str]]) -> List[str]:
+    """
+    The (method, path) pairs of the app's routes (not FastAPI's /docs and /openapi.json) that no
+    budget's URL reaches and that aren't in UNBUDGETED_ROUTES.
+    """
+    from fastapi.routing import APIRoute
+    from starlette.routing import Match
+
+    routes = [route for route in app.routes if isinstance(route, APIRoute)]
+    covered = set()
+    for method, url in urls:
+        scope = {"type": "http", "method": method, "path": url.split("?")[0]}
+        for route in routes:
+            if route.matches(scope)[0] == Match.FULL:
+                covered.add((method, route.path))
+                break
+    return [
+        f"{method} {route.path}"
+        for route in routes for method in sorted(route.methods - {"HEAD"})
+        if (method, route.path) not in covered and (method, route.path) not in UNBUDGETED_ROUTES
+    ]
+
+def check_budgets(scale: float, verbose: bool) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Generates a dataset, runs every route once and returns one result row per budget, and the
+    registered routes without a budget.
+    """
+    db_path = os.path.join(tempfile.mkdtemp(prefix="smukfest-budgets-"), "budgets.db")
+    database_url = f"sqlite:///{db_path}"
+    # Must be set before the app (and app.database's engine) is imported
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "query-budget-check")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+
+    from sqlalchemy import select
+    from fastapi.testclient import TestClient
+    from scripts.generate_synthetic_data import generate
+    from app import crud, models
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.database import SessionLocal, engine
+    from app.query_log import count_queries
+    from app.main import app
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, scale=scale, reset=True)
+
+    with SessionLocal() as db:
+        slug = db.execute(select(models.Artist.slug).join(models.Event).order_by(models.Artist.id).limit(1)).scalar_one()
+        contact_id = db.execute(select(models.Contact.id).order_by(models.Contact.id).limit(1)).scalar_one()
+        stage_id = db.execute(select(models.Stage.id).order_by(models.Stage.id).limit(1)).scalar_one()
+        festival_date = crud.get_festival_dates(db)[0].isoformat()
+        admin = crud.get_user_by_username(db, "admin")
+        token = create_access_token({"sub": admin.username, "role": admin.role.value})
+
+    client = TestClient(app)
+
+    results = []
+    urls = []
+    for label, method, path, body, budget, expected_status in QUERY_BUDGETS:
+        url = path.format(slug=slug, date=festival_date, contact_id=contact_id, stage_id=stage_id)
+        urls.append((method, url))
+        if body and "items" in body:
+            body = {"items": [dict(item, artist_slug=item["artist_slug"].format(slug=slug)) for item in body["items"]]}
+        body_kwargs = {"data": body} if path in FORM_PATHS else {"json": body}
+        # /logout and /login replace the cookie; every request starts logged in as the admin
+        client.cookies.clear()
+        client.cookies.set(COOKIE_NAME, token)
+        with contextlib.redirect_stdout(io.StringIO()), count_queries(engine) as counter:
+            response = client.request(method, url, follow_redirects=False, **body_kwargs)
+        results.append({
+            "route": label,
+            "budget": budget,
+            "queries": counter.count,
+            "status_code": response.status_code,
+            "ok": counter.count <= budget and response.status_code == expected_status,
+            "statements": counter.statements if verbose else None,
+        })
+
+    engine.dispose()
+    os.remove(db_path)
+    return results, unbudgeted_routes(app, urls)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check the number of SQL statements per route against its budget.")
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="Festival size multiplier of the test dataset")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="Print the statements of failing routes")
+    args = arg_parser.parse_args()
+
+    results, missing = check_budgets(args.scale, args.verbose)
+
+    print(f"{'route':<38} {'status':>6} {'queries':>8} {'budget':>7}")
+    for r in results:
+        marker = "" if r["ok"] else "  <-- FAIL"
+        print(f"{r['route']:<38} {r['status_code']:>6} {r['queries']:>8} {r['budget']:>7}{marker}")
+        if not r["ok"] and r["statements"]:
+            for statement in r["statements"]:
+                print(f"    {statement}")
+
+    if missing:
+        print("\nRoutes without a query budget:")
+        for route in missing:
+            print(f"    {route}")
+
+    failed = [r for r in results if not r["ok"]]
+    if failed or missing:
+        sys.exit(f"\n{len(failed)} route(s) exceeded their query budget or returned an unexpected status, "
+                 f"{len(missing)} route(s) have no budget.")
+    print(f"\nAll {len(results)} routes are within their query budgets.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Checks the "now and next" schedule index (app/schedule_index.py) against a brute-force scan.
+
+Builds random stage schedules with overlapping sets, sets without an end time, sets starting at
+the same time and one long set overlapping everything after it, and checks at every start and end
+time (and a minute either side) that:
+  - the effective end time of a set without one is DEFAULT_SET_LENGTH after its start, capped at
+    the next set on the stage,
+  - `StageTimeline.playing` returns the latest started set still playing, like a scan of all sets,
+  - `StageTimeline.upcoming` returns the next sets starting after the time, like a scan.
+
+Then checks `GET /api/now-next` against the same brute force on a small synthetic database.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_schedule_index.py --stages 200 --sets 30
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List, Optional
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.checks import check, finish
+
+def random_rows(rng: random.Random, stage: str, count: int, first_id: int) -> List[SimpleNamespace]:
+    """One stage's sets in build_index's row shape, ordered by (start_time, event_id)."""
+    start = datetime(2025, 8, 6, 12, 0)
+    rows = []
+    for i in range(count):
+        start += timedelta(minutes=rng.choice([0, 15, 30, 45, 60, 90]))
+        length = timedelta(minutes=rng.choice([20, 45, 60, 90, 180]))
+        end_time = None if rng.random() < 0.3 else start + length
+        rows.append(SimpleNamespace(event_id=first_id + i, start_time=start, end_time=end_time,
+                                    artist_slug=f"kunstner-{first_id + i}", title=f"Kunstner {first_id + i}",
+                                    stage_name=stage))
+    if rows and rng.random() < 0.3: # A long set overlapping everything after it
+        rows[0].end_time = rows[-1].start_time + timedelta(hours=2)
+    return rows
+
+def effective_ends(rows, default_length: timedelta) -> List[datetime]:
+    ends = []
+    for i, row in enumerate(rows):
+        if row.end_time is not None:
+            ends.append(row.end_time)
+        elif i + 1 < len(rows):
+            ends.append(min(row.start_time + default_length, max(rows[i + 1].start_time, row.start_time)))
+        else:
+            ends.append(row.start_time + default_length)
+    return ends
+
+def brute_playing(rows, ends, at: datetime) -> Optional[int]:
+    playing = [row.event_id for row, end in zip(rows, ends) if row.start_time <= at < end]
+    return playing[-1] if playing else None
+
+def brute_upcoming(rows, at: datetime, count: int) -> List[int]:
+    return [row.event_id for row in rows if row.start_time > at][:count]
+
+def probe_times(rows, ends) -> List[datetime]:
+    minute = timedelta(minutes=1)
+    times = {t + d for row, end in zip(rows, ends) for t in (row.start_time, end) for d in (-minute, timedelta(0), minute)}
+    return sorted(times)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check the now-and-next schedule index against brute force.")
+    arg_parser.add_argument("--stages", type=int, default=200, help="Random stage schedules to check")
+    arg_parser.add_argument("--sets", type=int, default=30, help="Sets per stage")
+    args = arg_parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="smukfest-schedule-index-"), "schedule.db")
+    database_url = f"sqlite:///{db_path}"
+    # Must be set before app.database's engine is created
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+    os.environ.setdefault("SECRET_KEY", "schedule-index-check")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+
+    from sqlalchemy import select
+    from fastapi.testclient import TestClient
+    from scripts.generate_synthetic_data import generate
+    from app import models, schedule_index
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.database import SessionLocal, engine
+    from app.main import app
+
+    rng = random.Random(2025)
+
+    # --- Random timelines ---
+    wrong_ends = wrong_playing = wrong_upcoming = probes = 0
+    overlapping = missing_end = 0
+    for n in range(args.stages):
+        rows = random_rows(rng, f"Scene {n}", rng.randint(1, args.sets), n * 1000)
+        if not rows:
+            continue
+        timeline = schedule_index.ScheduleIndex(rows, version=()).timelines[0]
+        ends = effective_ends(rows, schedule_index.DEFAULT_SET_LENGTH)
+        wrong_ends += [s.end_time for s in timeline.sets] != ends
+        wrong_ends += [s.end_time_estimated for s in timeline.sets] != [row.end_time is None for row in rows]
+        missing_end += sum(row.end_time is None for row in rows)
+        overlapping += sum(ends[i] > rows[i + 1].start_time for i in range(len(rows) - 1))
+        for at in probe_times(rows, ends):
+            probes += 1
+            playing = timeline.playing(at)
+            wrong_playing += (playing.event_id if playing else None) != brute_playing(rows, ends, at)
+            count = rng.randint(0, schedule_index.MAX_NEXT)
+            wrong_upcoming += [s.event_id for s in timeline.upcoming(at, count)] != brute_upcoming(rows, at, count)
+
+    check(overlapping > 0 and missing_end > 0,
+          f"the schedules have overlapping sets ({overlapping}) and sets without an end time ({missing_end})")
+    check(wrong_ends == 0, f"effective end times match: end, or DEFAULT_SET_LENGTH capped at the next set ({wrong_ends} wrong)")
+    check(wrong_playing == 0, f"playing() matches a scan of all sets at {probes} times ({wrong_playing} wrong)")
+    check(wrong_upcoming == 0, f"upcoming() matches a scan of all sets at {probes} times ({wrong_upcoming} wrong)")
+
+    # --- Edge cases ---
+    start = datetime(2025, 8, 7, 20, 0)
+    def row(event_id, start_offset, end_offset):
+        return SimpleNamespace(event_id=event_id, start_time=start + timedelta(minutes=start_offset),
+                               end_time=start + timedelta(minutes=end_offset) if end_offset is not None else None,
+                               artist_slug=f"a{event_id}", title=None, stage_name="Scene")
+    timeline = schedule_index.ScheduleIndex([row(1, 0, 600), row(2, 30, 60), row(3, 90, 120)], ()).timelines[0]
+    check([timeline.playing(start + timedelta(minutes=m)).event_id for m in (0, 45, 75, 100, 300)] == [1, 2, 1, 3, 1],
+          "inside a long set, a shorter set started later plays while it lasts and the long set before and after")
+    check(timeline.playing(start + timedelta(minutes=600)) is None and timeline.playing(start - timedelta(minutes=1)) is None,
+          "nothing plays before the first start or at the last end")
+    timeline = schedule_index.ScheduleIndex([row(1, 0, None), row(2, 0, None), row(3, 20, None)], ()).timelines[0]
+    check([s.end_time - s.start_time for s in timeline.sets] == [timedelta(0), timedelta(minutes=20), schedule_index.DEFAULT_SET_LENGTH]
+          and timeline.playing(start).event_id == 2,
+          "sets without an end time starting together: the earlier one ends at once, the later one plays")
+    index = schedule_index.ScheduleIndex([row(1, 0, 60), SimpleNamespace(**{**vars(row(2, 0, 60)), "stage_name": "TBA"})], ())
+    check([t.name for t in index.timelines] == ["Scene"], "the TBA stage is left out")
+
+    # --- HTTP ---
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, num_artists=150, num_contacts=0, num_users=2, assessment_ratio=0.5, reset=True)
+    with SessionLocal() as db:
+        admin = db.execute(select(models.User).where(models.User.role == models.UserRoleEnum.ADMIN)).scalars().first()
+        all_rows = db.execute(
+            select(models.Event.event_id, models.Event.start_time, models.Event.end_time, models.Stage.name.label("stage_name"))
+            .join(models.Stage, models.Stage.id == models.Event.stage_id)
+            .order_by(models.Event.start_time, models.Event.event_id)
+        ).all()
+    by_stage = {}
+    for r in all_rows:
+        if r.stage_name != "TBA":
+            by_stage.setdefault(r.stage_name, []).append(r)
+    ends = {name: effective_ends(rows, schedule_index.DEFAULT_SET_LENGTH) for name, rows in by_stage.items()}
+
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, create_access_token({"sub": admin.username, "role": admin.role.value}))
+    times = sorted({r.start_time + timedelta(minutes=m) for r in all_rows[::7] for m in (-1, 0, 10)})
+    wrong = []
+    for at in times:
+        data = client.get("/api/now-next", params={"at": at.isoformat(), "next": 3}).json()
+        got = {stage["stage"]: ((stage["now"] or {}).get("event_id"), [s["event_id"] for s in stage["next"]])
+               for stage in data["stages"]}
+        expected = {}
+        for name, rows in by_stage.items():
+            playing, upcoming = brute_playing(rows, ends[name], at), brute_upcoming(rows, at, 3)
+            if playing or upcoming:
+                expected[name] = (playing, upcoming)
+        if got != expected:
+            wrong.append(at)
+    check(not wrong, f"GET /api/now-next matches brute force at {len(times)} times "
+          f"({len(wrong)} wrong{', first at ' + wrong[0].isoformat() if wrong else ''})")
+
+    engine.dispose()
+    os.remove(db_path)
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Checks the sync run history (app/sync_runs.py, `/admin/sync-runs`, `GET /api/sync-runs`) by
+running `run_sync` against a local stand-in for the festival API.
+
+A small HTTP server on 127.0.0.1 serves an API response in the festival's format (or an error
+status, or a body that isn't JSON). The checks run a series of syncs against a synthetic database
+and verify that:
+  - every run gets one sync_runs row, with all phase timings, the payload size and the row counts
+    of every operation,
+  - a fetch error and an unparsable response are recorded as failed runs with the error text and
+    only the phases they got through,
+  - the anomalies: a drop of more than DROP_THRESHOLD in artists or events against the previous
+    successful runs, a response without events, failed runs and a run that never finished,
+  - the JSON endpoint and the admin page show the runs and the anomalies, and are admin only.
+
+Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_sync_runs.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.checks import check, finish
+
+def api_payload(num_artists: int, with_events: bool = True) -> bytes:
+    """An API response with `num_artists` artists, each with one set (unless with_events is False)."""
+    artists = []
+    for i in range(num_artists):
+        artist = {"id": 1000 + i, "slug": f"kunstner-{i}", "title": f"Kunstner {i}", "previewText": "Tekst"}
+        if with_events:
+            start = datetime(2025, 8, 6, 14, 0) + timedelta(hours=i % 12, days=i % 4)
+            artist.update({
+                "startTime": start.isoformat(),
+                "endTime": (start + timedelta(hours=1)).isoformat(),
+                "location": {"name": f"Scene {i % 3}"},
+            })
+        artists.append(artist)
+    return json.dumps({"data": {"content": {"_artists": artists}}}).encode("utf-8")
+
+class StandInAPI:
+    """Serves `body` with `status` for every GET."""
+
+    def __init__(self):
+        self.status = 200
+        self.body = b""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(api.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(api.body)))
+                self.end_headers()
+                self.wfile.write(api.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/content"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="smukfest-sync-runs-")
+    database_url = f"sqlite:///{os.path.join(workdir, 'sync.db')}"
+    # Must be set before app.database's engine and app.image_proxy are created
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["IMAGE_CACHE_DIR"] = os.path.join(workdir, "images")
+    os.environ["SLOW_QUERY_THRESHOLD_MS"] = "-1"
+    os.environ.setdefault("SECRET_KEY", "sync-runs-check")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+
+    from sqlalchemy import select, func
+    from fastapi.testclient import TestClient
+    from scripts.generate_synthetic_data import generate
+    from scripts import sync_artists_db
+    from app import models, sync_runs
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.database import SessionLocal, engine
+    from app.main import app
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(database_url, num_artists=5, num_contacts=0, num_users=3, assessment_ratio=0.0, reset=True)
+
+    api = StandInAPI()
+    sync_artists_db.API_URL = api.url
+
+    def sync(body: bytes = None, status: int = 200, trigger: str = "scheduled") -> models.SyncRun:
+        api.body, api.status = body if body is not None else api.body, status
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync_artists_db.run_sync(trigger=trigger)
+        with SessionLocal() as db:
+            return db.execute(select(models.SyncRun).order_by(models.SyncRun.id.desc()).limit(1)).scalar_one()
+
+    # --- A normal run: timings, payload size and counts ---
+    body = api_payload(100)
+    first = sync(body, trigger="manual")
+    check(first.status == "success" and first.trigger == "manual" and first.error is None
+          and first.finished_at is not None and first.finished_at >= first.started_at,
+          "a sync is recorded as a successful run with its start and end")
+    phases = {name: getattr(first, f"{name}_ms") for name in sync_runs.PHASES}
+    check(all(value is not None and value >= 0 for value in phases.values())
+          and first.total_ms >= sum(phases.values()) * 0.999,
+          "every phase is timed and the phases add up to at most the total "
+          f"({', '.join(f'{name} {value:.1f}' for name, value in phases.items() if value is not None)}; total {first.total_ms:.1f} ms)")
+    check(first.payload_bytes == len(body), f"the payload size is recorded ({first.payload_bytes:,} bytes)")
+    check((first.api_artists, first.api_events, first.artists_inserted, first.artists_updated, first.artists_deleted,
+           first.stages_inserted, first.events_inserted, first.events_skipped) == (100, 100, 100, 0, 5, 3, 100, 0)
+          and first.changes_logged > 0,
+          "the API's counts and the rows inserted, updated and deleted are recorded")
+
+    second = sync()
+    check((second.artists_inserted, second.artists_updated, second.artists_deleted, second.events_deleted,
+           second.events_inserted, second.changes_logged) == (0, 100, 0, 100, 100, 0),
+          "an unchanged second sync updates the artists, recreates the events and logs no changes")
+    for _ in range(4):
+        sync()
+
+    # --- Anomalies ---
+    dropped = sync(api_payload(75))
+    at_threshold = sync(api_payload(81)) # Less than 20% below the (still 100) median
+    no_events = sync(api_payload(100, with_events=False))
+    fetch_failed = sync(status=500)
+    parse_failed = sync(b"<html>Vedligeholdelse</html>", status=200)
+    check(fetch_failed.status == "failed" and "Error fetching API data" in (fetch_failed.error or "")
+          and fetch_failed.fetch_ms is not None and fetch_failed.parse_ms is None and fetch_failed.artists_ms is None,
+          f"a fetch error is a failed run with the error and only the fetch phase ({fetch_failed.error!r})")
+    check(parse_failed.status == "failed" and "Error parsing API JSON" in (parse_failed.error or "")
+          and parse_failed.payload_bytes == len(b"<html>Vedligeholdelse</html>") and parse_failed.parse_ms is not None
+          and parse_failed.artists_ms is None,
+          "an unparsable response is a failed run with its size, the error and the fetch and parse phases")
+
+    with SessionLocal() as db:
+        stale = models.SyncRun(trigger="scheduled", status="running", started_at=datetime.utcnow() - timedelta(hours=2))
+        current = models.SyncRun(trigger="manual", status="running", started_at=datetime.utcnow())
+        db.add_all([stale, current])
+        db.commit()
+        stale_id, current_id = stale.id, current.id
+        history = {item["run"].id: [a["code"] for a in item["anomalies"]] for item in sync_runs.get_history(db, 100)}
+
+    check(all(not history[run_id] for run_id in range(first.id, first.id + 6)), "normal runs have no anomalies")
+    check(history[dropped.id] == ["artist_drop", "event_drop"],
+          f"25% fewer artists and events than the previous runs is flagged ({history[dropped.id]})")
+    check(not history[at_threshold.id], f"81 against a median of 100 is not ({history[at_threshold.id]})")
+    check(history[no_events.id] == ["no_events"], f"a response without events is flagged ({history[no_events.id]})")
+    check(history[fetch_failed.id] == ["failed"] and history[parse_failed.id] == ["failed"], "failed runs are flagged")
+    check(history[stale_id] == ["unfinished"] and not history[current_id],
+          "a run still running after STALE_RUN_MINUTES is flagged, one that just started isn't")
+
+    # --- Endpoint and page ---
+    with SessionLocal() as db:
+        users = {user.role.value: user for user in db.execute(select(models.User)).scalars()}
+        total_runs = db.execute(select(func.count()).select_from(models.SyncRun)).scalar_one()
+    client = TestClient(app)
+    admin = users["admin"]
+    client.cookies.set(COOKIE_NAME, create_access_token({"sub": admin.username, "role": admin.role.value}))
+
+    response = client.get("/api/sync-runs")
+    data = response.json()
+    check(response.status_code == 200 and data["count"] == total_runs == len(data["runs"])
+          and data["runs"][0]["id"] == current_id and data["baseline_runs"] == sync_runs.BASELINE_RUNS,
+          f"/api/sync-runs lists every run, newest first ({response.status_code}, {len(data.get('runs', []))} runs)")
+    by_id = {run["id"]: run for run in data.get("runs", [])}
+    drop = by_id[dropped.id]["anomalies"][0]
+    check(drop["code"] == "artist_drop" and drop["value"] == 75 and drop["baseline"] == 100 and abs(drop["change"] + 0.25) < 1e-9,
+          f"an anomaly carries the count, the baseline and the change ({drop})")
+    check(set(by_id[first.id]["phases_ms"]) == set(sync_runs.PHASES) and by_id[first.id]["counts"]["artists_inserted"] == 100,
+          "a run's phases and counts are in the JSON")
+    check(len(client.get("/api/sync-runs?limit=3").json()["runs"]) == 3 and client.get("/api/sync-runs?limit=0").status_code == 422,
+          "?limit= limits the runs and is validated")
+
+    page = client.get("/admin/sync-runs")
+    check(page.status_code == 200 and "Afvigelser" in page.text and "Færre kunstnere: 75 mod normalt 100 (-25%)" in page.text
+          and "API'et returnerede ingen events" in page.text and "Blev ikke færdig" in page.text,
+          "the admin page lists the runs and the anomalies")
+
+    if "user" in users:
+        user = users["user"]
+        client.cookies.set(COOKIE_NAME, create_access_token({"sub": user.username, "role": user.role.value}))
+        check(client.get("/api/sync-runs").status_code == 403 and client.get("/admin/sync-runs").status_code == 403,
+              "the history is admin only")
+
+    api.server.shutdown()
+    engine.dispose()
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Shared scaffolding of the scripts/check_*.py scripts: `check()` prints one "ok"/"FAIL" line per
+check and remembers the failures, `finish()` prints the summary and exits non-zero if any check
+failed.
+
+    from scripts.checks import check, finish
+    check(result == expected, "what is checked" + ("" if result == expected else f" (got {result!r})"))
+    finish()
+"""
+import sys
+from typing import List
+
+failures: List[str] = []
+
+def check(condition: bool, message: str) -> bool:
+    print(f"{'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+    return condition
+
+def finish() -> None:
+    print(f"\n{len(failures)} check(s) failed." if failures else "\nAll checks passed.")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Script to fill a SQLite database with a synthetic festival dataset for benchmarking and load testing.
+
+The dataset mimics the real Smukfest data: artists with Danish/international names, a handful of
+stages, 5-day festival editions (Wednesday-Sunday in August) with sets running past midnight,
+some events without an end time, partial risk assessment coverage, contacts and users.
+Artists, stages and events are written through `sync_database` (the same code path as the hourly
+API sync), so the generated rows look exactly like synced data.
+
+Usage:
+    python scripts/generate_synthetic_data.py --database-url sqlite:///./data/synthetic.db --scale 10 --reset
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Artist, Stage, Event, RiskAssessment, Contact, User, UserRoleEnum, ChangeLog, ChangeLogCompaction
+from app import change_log
+
+# --- Size of one "1x" festival (roughly the real 2025 lineup) ---
+BASE_ARTISTS = 200
+BASE_CONTACTS = 25
+BASE_USERS = 5
+ASSESSMENT_RATIO = 0.6          # Share of artists with a risk assessment
+MISSING_END_TIME_RATIO = 0.15   # Share of events without an end time
+SECOND_SET_RATIO = 0.1          # Share of artists playing twice in the same edition
+
+STAGE_NAMES = ['Bøgescenerne', 'Stjernescenen', 'Månen', 'The Hood', 'Udsigten', 'Live Camp', 'Slotskirken']
+FESTIVAL_DAYS_PER_EDITION = 5   # Wednesday to Sunday
+FIRST_EDITION_START = datetime(2025, 8, 6) # Wednesday
+
+# Opening hours per stage: (first set start hour, last set start hour; >= 24 means after midnight)
+STAGE_HOURS = {
+    'Bøgescenerne': (14, 25),
+    'Stjernescenen': (15, 24),
+    'Månen': (13, 26),
+    'The Hood': (16, 27),
+    'Udsigten': (12, 23),
+    'Live Camp': (18, 28),
+    'Slotskirken': (11, 20),
+}
+
+NAME_PARTS_FIRST = ['Søstrene', 'Den Blå', 'Kaptajn', 'Lille', 'Store', 'Nordlys', 'Gyldne', 'Electric',
+                    'Midnight', 'Fjord', 'Ørkenens', 'Ærlige', 'Stormy', 'Neon', 'Åben', 'Crystal']
+NAME_PARTS_LAST = ['Brødre', 'Hjerter', 'Orkester', 'Collective', 'Kids', 'Sound System', 'Drømme',
+                   'Kvartet', 'Rebels', 'Måger', 'Project', 'Band', 'Ensemble', 'Øjne', 'Dreams']
+NATIONALITIES = ['DK', 'DK', 'DK', 'SE', 'NO', 'UK', 'US', 'DE', 'NL', 'IS']
+LEVELS = ['low', 'medium', 'high']
+LEVEL_WEIGHTS = [0.5, 0.35, 0.15]
+CONTACT_CATEGORIES = ['ANSL', 'BØGE STAGE SECURITY', 'BØGE STAGE MANAGER', 'THE HOOD STAGE MANAGER',
+                      'STJERNEN OG MÅNEN STAGE SECURITY', 'MÅNEN STAGE MANAGER', 'LIVE CAMP STAGE MANAGER']
+CONTACT_ROLES = ['Stage Manager', 'Vagttelefon 24-7', 'Back up', 'Show dag production manager', 'Vagt alle dage']
+FIRST_NAMES = ['Mikkel', 'Birgitte', 'Søren', 'Ærling', 'Mathilde', 'Jesper', 'Trine', 'Nils', 'Åse', 'Kent']
+LAST_NAMES = ['Andersen', 'Sørensen', 'Lybæk', 'Østergaard', 'Hansen', 'Mejer', 'Bruun', 'Rohde']
+CHANNELS = ['BLÅ KANAL 2', 'BLÅ KANAL 6', 'BLÅ KANAL 10', 'BLÅ KANAL 12', 'ORANGE KANAL 9', None]
+
+# --- Payload generation ---
+
+def _artist_title(rng: random.Random, index: int) -> str:
+    return f"{rng.choice(NAME_PARTS_FIRST)} {rng.choice(NAME_PARTS_LAST)} {index}"
+
+def _slugify(title: str) -> str:
+    folded = title.lower().replace('æ', 'ae').replace('ø', 'oe').replace('å', 'aa')
+    return '-'.join(''.join(c if c.isalnum() else ' ' for c in folded).split())
+
+def build_api_payload(num_artists: int, seed: int = 2025, num_stages: int = len(STAGE_NAMES)) -> Dict[str, Any]:
+    """
+    Builds a parsed API payload in the shape returned by `fetch_and_parse_api_data`,
+    so it can be fed straight into `sync_database`.
+    """
+    rng = random.Random(seed)
+    stage_names = STAGE_NAMES[:num_stages]
+
+    artists_list: List[Dict[str, Any]] = []
+    for i in range(num_artists):
+        title = _artist_title(rng, i)
+        artists_list.append({
+            'slug': _slugify(title),
+            'title': title,
+            'image_url': f"https://images.example.invalid/artists/{i}.jpg" if rng.random() > 0.05 else None,
+            'nationality': rng.choice(NATIONALITIES),
+            'description': f"{title} spiller et energisk sæt. " * rng.randint(3, 20),
+            'spotify_link': None,
+        })
+
+    # Build a queue of sets: every artist plays once, some twice
+    sets = [a['slug'] for a in artists_list]
+    sets += [a['slug'] for a in artists_list if rng.random() < SECOND_SET_RATIO]
+    rng.shuffle(sets)
+
+    # Fill stages day by day; when an edition is full, move on to next year's festival
+    schedule_list: List[Dict[str, Any]] = []
+    edition = 0
+    while sets:
+        edition_start = FIRST_EDITION_START.replace(year=FIRST_EDITION_START.year + edition)
+        for day in range(FESTIVAL_DAYS_PER_EDITION):
+            festival_day = edition_start + timedelta(days=day)
+            for stage_name in stage_names:
+                first_hour, last_hour = STAGE_HOURS.get(stage_name, (14, 24))
+                t = festival_day + timedelta(hours=first_hour, minutes=rng.choice([0, 15, 30]))
+                closing = festival_day + timedelta(hours=last_hour)
+                while sets and t <= closing:
+                    duration = timedelta(minutes=rng.choice([45, 60, 60, 75, 90]))
+                    end_time = None if rng.random() < MISSING_END_TIME_RATIO else t + duration
+                    schedule_list.append({
+                        'artist_slug': sets.pop(),
+                        'stage_name': stage_name,
+                        'start_time': t.isoformat(),
+                        'end_time': end_time.isoformat() if end_time else None,
+                    })
+                    t += duration + timedelta(minutes=rng.choice([15, 30, 45]))
+            if not sets:
+                break
+        edition += 1
+
+    # A few sets are announced without a stage yet
+    for event in rng.sample(schedule_list, k=max(1, len(schedule_list) // 100)):
+        event['stage_name'] = 'TBA'
+
+    return {
+        "artists": artists_list,
+        "schedule": schedule_list,
+        "artist_slugs_from_api": {a['slug'] for a in artists_list},
+    }
+
+# --- Database population ---
+
+def generate(database_url: str, scale: float = 1.0, num_artists: Optional[int] = None,
+             num_contacts: Optional[int] = None, num_users: Optional[int] = None,
+             assessment_ratio: float = ASSESSMENT_RATIO, password: str = "smukfest",
+             seed: int = 2025, reset: bool = False) -> Dict[str, int]:
+    """Creates the schema (if needed) and fills `database_url` with a synthetic dataset. Returns row counts."""
+    # Imported here so DATABASE_URL for the app engine doesn't have to point at the target DB
+    from scripts.sync_artists_db import sync_database
+    from passlib.context import CryptContext # Same scheme as app/auth.py, without requiring SECRET_KEY
+
+    num_artists = num_artists if num_artists is not None else int(BASE_ARTISTS * scale)
+    num_contacts = num_contacts if num_contacts is not None else int(BASE_CONTACTS * scale)
+    num_users = num_users if num_users is not None else max(2, int(BASE_USERS * scale))
+    rng = random.Random(seed)
+
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        if reset:
+            print("Clearing existing data...")
+            for model in (RiskAssessment, Event, Contact, User, Artist, Stage, ChangeLog, ChangeLogCompaction):
+                db.execute(delete(model))
+            db.commit()
+
+        print(f"Generating {num_artists} artists and their schedule...")
+        payload = build_api_payload(num_artists, seed=seed)
+        sync_database(db, payload)
+        db.flush()
+
+        print(f"Generating risk assessments for ~{int(assessment_ratio * 100)}% of artists...")
+        assessments = []
+        now = datetime.utcnow()
+        for artist in payload['artists']:
+            if rng.random() >= assessment_ratio:
+                continue
+            assessments.append({
+                'artist_slug': artist['slug'],
+                'risk_level': rng.choices(LEVELS, LEVEL_WEIGHTS)[0],
+                'intensity_level': rng.choices(LEVELS, LEVEL_WEIGHTS)[0] if rng.random() > 0.1 else None,
+                'density_level': rng.choices(LEVELS, LEVEL_WEIGHTS)[0] if rng.random() > 0.1 else None,
+                'remarks': "Forventet stort fremmøde." if rng.random() > 0.5 else None,
+                'crowd_profile': "Blandet publikum, mange unge." if rng.random() > 0.5 else None,
+                'notes': None,
+                'updated_at': now,
+            })
+        db.bulk_insert_mappings(RiskAssessment, assessments)
+
+        print(f"Generating {num_contacts} contacts...")
+        contacts = []
+        for i in range(num_contacts):
+            phone_digits = f"{rng.randint(20000000, 99999999)}"
+            contacts.append({
+                'category': rng.choice(CONTACT_CATEGORIES),
+                'role': rng.choice(CONTACT_ROLES),
+                'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                'phone': ' '.join(phone_digits[j:j + 2] for j in range(0, 8, 2)),
+                'phone_digits': phone_digits, # bulk inserts bypass Contact's phone validator
+                'channel': rng.choice(CHANNELS),
+                'notes': "Svarer 24-7" if rng.random() < 0.1 else None,
+                'sort_order': i,
+                'is_active': rng.random() > 0.05,
+                'created_at': now,
+                'updated_at': now,
+            })
+        db.bulk_insert_mappings(Contact, contacts)
+        # Bulk inserts bypass crud, so log the assessments and contacts here (sync_database logged the rest)
+        change_log.record_snapshot(db, ('assessment', 'contact'))
+
+        print(f"Generating {num_users} users (password: '{password}')...")
+        hashed_password = CryptContext(schemes=["bcrypt"]).hash(password) # Hash once; bcrypt is deliberately slow
+        users = [{'username': 'admin', 'hashed_password': hashed_password, 'role': UserRoleEnum.ADMIN,
+                  'disabled': False, 'created_at': now}]
+        users += [{'username': f"user{i}", 'hashed_password': hashed_password, 'role': UserRoleEnum.USER,
+                   'disabled': False, 'created_at': now} for i in range(1, num_users)]
+        db.bulk_insert_mappings(User, users)
+
+        db.commit()
+
+    counts = {
+        "artists": len(payload['artists']),
+        "stages": len({e['stage_name'] for e in payload['schedule']}),
+        "events": len(payload['schedule']),
+        "assessments": len(assessments),
+        "contacts": len(contacts),
+        "users": len(users),
+    }
+    engine.dispose()
+    return counts
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Fill a SQLite database with a synthetic festival dataset.")
+    arg_parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./data/synthetic.db"),
+                            help="Target database (default: $DATABASE_URL or sqlite:///./data/synthetic.db)")
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="Festival size multiplier (1 = one festival)")
+    arg_parser.add_argument("--artists", type=int, help="Number of artists (overrides --scale)")
+    arg_parser.add_argument("--contacts", type=int, help="Number of contacts (overrides --scale)")
+    arg_parser.add_argument("--users", type=int, help="Number of users incl. 'admin' (overrides --scale)")
+    arg_parser.add_argument("--assessment-ratio", type=float, default=ASSESSMENT_RATIO,
+                            help="Share of artists with a risk assessment")
+    arg_parser.add_argument("--password", default="smukfest", help="Password for all generated users")
+    arg_parser.add_argument("--seed", type=int, default=2025, help="Random seed")
+    arg_parser.add_argument("--reset", action="store_true", help="Delete existing rows before generating")
+    args = arg_parser.parse_args()
+
+    print(f"Generating synthetic data into {args.database_url}...")
+    result = generate(
+        args.database_url, scale=args.scale, num_artists=args.artists, num_contacts=args.contacts,
+        num_users=args.users, assessment_ratio=args.assessment_ratio, password=args.password,
+        seed=args.seed, reset=args.reset,
+    )
+    print(f"Done: {result}")
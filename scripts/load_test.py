@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+HTTP load-test harness with a realistic traffic mix.
+
+Logs in as several users against a running instance of the app and replays a weighted mix of
+page views, contact searches, assessment saves and logins from concurrent worker threads. Halfway
+through the run a sync job rewrites the artist/event tables in-process (the same `sync_database`
+code path as the hourly sync), so its effect on latency shows up in the report. The result is
+written as JSON so runs can be compared between commits.
+
+Typical setup (synthetic database, see generate_synthetic_data.py):
+    python scripts/generate_synthetic_data.py --database-url sqlite:///./data/synthetic.db --scale 1 --reset
+    DATABASE_URL=sqlite:///./data/synthetic.db SECRET_KEY=loadtest uvicorn app.main:app --port 8000
+    python -m scripts.load_test --database-url sqlite:///./data/synthetic.db --duration 60 --json load.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+# Add project root to sys.path to allow importing 'app' modules
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Artist, Event, Contact, User, UserRoleEnum
+
+# Weighted traffic mix: (route label, weight). Assessment saves need an admin session.
+USER_MIX = [
+    ("GET /", 30),
+    ("GET /calendar", 20),
+    ("GET /artists/{slug}", 30),
+    ("GET /contacts", 17),
+    ("POST /login", 3),
+]
+ADMIN_MIX = USER_MIX + [("POST /api/assessments/{slug}", 15)]
+
+LEVELS = ['low', 'medium', 'high']
+REQUEST_TIMEOUT_S = 30
+
+# --- Test data discovery ---
+
+def load_test_data(database_url: str) -> Dict[str, Any]:
+    """Reads artist slugs, festival dates, contact names and usernames to build requests from."""
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        slugs = list(db.execute(select(Artist.slug)).scalars())
+        dates = sorted({d.date() for d in db.execute(select(Event.start_time)).scalars() if d})
+        contact_names = list(db.execute(select(Contact.name)).scalars())
+        users = list(db.execute(select(User.username, User.role).where(User.disabled == False)))
+        artist_count = db.execute(select(func.count(Artist.id))).scalar_one()
+    engine.dispose()
+
+    if not slugs or not users:
+        sys.exit("The database has no artists or users. Generate a dataset with generate_synthetic_data.py first.")
+
+    # Search terms: first names, last names and partial words, as people type them
+    search_terms = set()
+    for name in contact_names:
+        for part in name.split():
+            search_terms.add(part)
+            search_terms.add(part[:3])
+    return {
+        "slugs": slugs,
+        "dates": [d.isoformat() for d in dates] or [None],
+        "search_terms": sorted(search_terms) or ["a"],
+        "admins": [u for u, role in users if role == UserRoleEnum.ADMIN],
+        "users": [u for u, role in users if role != UserRoleEnum.ADMIN],
+        "artist_count": artist_count,
+    }
+
+# --- Result collection ---
+
+class Recorder:
+    """Thread-safe collection of (route, start offset, latency, status, ok) samples."""
+
+    def __init__(self):
+        self.samples: List[Tuple[str, float, float, Optional[int], bool]] = []
+        self.lock = threading.Lock()
+
+    def add(self, route: str, started: float, latency_ms: float, status_code: Optional[int], ok: bool):
+        with self.lock:
+            self.samples.append((route, started, latency_ms, status_code, ok))
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[rank], 2)
+
+def summarize(samples: List[Tuple[str, float, float, Optional[int], bool]], elapsed_s: float) -> Dict[str, Any]:
+    latencies = sorted(s[2] for s in samples)
+    errors = sum(1 for s in samples if not s[4])
+    status_codes: Dict[str, int] = defaultdict(int)
+    for s in samples:
+        status_codes[str(s[3]) if s[3] is not None else "exception"] += 1
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed_s, 2) if elapsed_s else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(latencies[-1], 2) if latencies else None,
+        "status_codes": dict(status_codes),
+    }
+
+# --- Virtual users ---
+
+class VirtualUser(threading.Thread):
+    """Logs in once and then issues requests from the weighted mix until `stop_event` is set."""
+
+    def __init__(self, base_url: str, username: str, password: str, is_admin: bool, data: Dict[str, Any],
+                 recorder: Recorder, run_started: float, stop_event: threading.Event, seed: int,
+                 think_time_s: float):
+        super().__init__(daemon=True)
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.data = data
+        self.recorder = recorder
+        self.run_started = run_started
+        self.stop_event = stop_event
+        self.rng = random.Random(seed)
+        self.think_time_s = think_time_s
+        mix = ADMIN_MIX if is_admin else USER_MIX
+        self.routes = [route for route, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.session = requests.Session()
+
+    def login(self, session: requests.Session) -> requests.Response:
+        return session.post(
+            f"{self.base_url}/login",
+            data={"username": self.username, "password": self.password},
+            allow_redirects=False, timeout=REQUEST_TIMEOUT_S,
+        )
+
+    def issue(self, route: str) -> requests.Response:
+        if route == "GET /":
+            return self.session.get(f"{self.base_url}/", timeout=REQUEST_TIMEOUT_S)
+        if route == "GET /calendar":
+            date = self.rng.choice(self.data["dates"])
+            return self.session.get(f"{self.base_url}/calendar", params={"date": date} if date else None,
+                                    timeout=REQUEST_TIMEOUT_S)
+        if route == "GET /artists/{slug}":
+            slug = self.rng.choice(self.data["slugs"])
+            return self.session.get(f"{self.base_url}/artists/{slug}", timeout=REQUEST_TIMEOUT_S)
+        if route == "GET /contacts":
+            term = self.rng.choice(self.data["search_terms"])
+            return self.session.get(f"{self.base_url}/contacts", params={"search": term}, timeout=REQUEST_TIMEOUT_S)
+        if route == "POST /api/assessments/{slug}":
+            slug = self.rng.choice(self.data["slugs"])
+            payload = {
+                "risk_level": self.rng.choice(LEVELS),
+                "intensity_level": self.rng.choice(LEVELS),
+                "density_level": self.rng.choice(LEVELS),
+                "remarks": f"Load test {datetime.now().isoformat(timespec='seconds')}",
+            }
+            return self.session.post(f"{self.base_url}/api/assessments/{slug}", json=payload,
+                                     timeout=REQUEST_TIMEOUT_S)
+        if route == "POST /login":
+            # A fresh login (separate session, so this user's cookie stays valid)
+            with requests.Session() as login_session:
+                return self.login(login_session)
+        raise ValueError(f"Unknown route: {route}")
+
+    @staticmethod
+    def is_ok(route: str, response: requests.Response) -> bool:
+        if route == "POST /login":
+            return response.status_code == 303 # Successful login redirects
+        # Artist pages can 404 briefly while a sync rewrites the tables; that still counts as an error
+        return response.status_code < 400 and not (response.history and "/login" in response.url)
+
+    def run(self):
+        login_response = self.login(self.session)
+        if login_response.status_code != 303:
+            print(f"Login failed for '{self.username}' ({login_response.status_code}); worker not started.")
+            return
+        while not self.stop_event.is_set():
+            route = self.rng.choices(self.routes, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                response = self.issue(route)
+                latency_ms = (time.perf_counter() - started) * 1000
+                self.recorder.add(route, started - self.run_started, latency_ms, response.status_code,
+                                  self.is_ok(route, response))
+            except requests.RequestException:
+                latency_ms = (time.perf_counter() - started) * 1000
+                self.recorder.add(route, started - self.run_started, latency_ms, None, False)
+            if self.think_time_s:
+                self.stop_event.wait(self.rng.expovariate(1 / self.think_time_s))
+
+# --- Mid-run sync ---
+
+def run_sync_job(database_url: str, artist_count: int, seed: int) -> Dict[str, Any]:
+    """
+    Re-syncs the synthetic lineup into `database_url` with `sync_database`, exactly like the hourly
+    job does with the real API payload (upsert artists, replace all events), and commits.
+    """
+    # Imported here so DATABASE_URL for the app engine doesn't have to point at the target DB
+    from scripts.sync_artists_db import sync_database
+    from scripts.generate_synthetic_data import build_api_payload
+
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    payload = build_api_payload(artist_count, seed=seed)
+    started = time.perf_counter()
+    error = None
+    with Session() as db:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()): # sync_database is chatty
+                sync_database(db, payload)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error = str(e)
+    engine.dispose()
+    return {"duration_s": round(time.perf_counter() - started, 3), "error": error}
+
+# --- Driver ---
+
+def run_load_test(base_url: str, database_url: str, duration_s: float, num_users: int, num_admins: int,
+                  password: str, sync_at_s: Optional[float], sync_seed: int, think_time_s: float,
+                  seed: int) -> Dict[str, Any]:
+    data = load_test_data(database_url)
+    if not data["admins"] and num_admins:
+        print("Warning: No admin users in the database; assessment saves are left out of the mix.")
+        num_admins = 0
+
+    # Admin workers first, then regular users (reusing accounts round-robin if there are few)
+    accounts = [(data["admins"][i % len(data["admins"])], True) for i in range(num_admins)]
+    user_pool = data["users"] or data["admins"]
+    accounts += [(user_pool[i % len(user_pool)], False) for i in range(max(0, num_users - num_admins))]
+
+    recorder = Recorder()
+    stop_event = threading.Event()
+    run_started = time.perf_counter()
+    workers = [
+        VirtualUser(base_url, username, password, is_admin, data, recorder, run_started, stop_event,
+                    seed + i, think_time_s)
+        for i, (username, is_admin) in enumerate(accounts)
+    ]
+    print(f"Starting {len(workers)} virtual users ({num_admins} admin) against {base_url} for {duration_s:g}s...")
+    for worker in workers:
+        worker.start()
+
+    sync_result = None
+    if sync_at_s is not None and sync_at_s < duration_s:
+        stop_event.wait(sync_at_s)
+        print(f"Running sync job at t={time.perf_counter() - run_started:.1f}s...")
+        sync_started = time.perf_counter() - run_started
+        sync_result = run_sync_job(database_url, data["artist_count"], sync_seed)
+        sync_result["started_at_s"] = round(sync_started, 3)
+        print(f"Sync job finished in {sync_result['duration_s']}s"
+              + (f" with error: {sync_result['error']}" if sync_result["error"] else "."))
+
+    stop_event.wait(max(0.0, duration_s - (time.perf_counter() - run_started)))
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout=REQUEST_TIMEOUT_S)
+    elapsed_s = time.perf_counter() - run_started
+
+    samples = list(recorder.samples)
+    by_route: Dict[str, List] = defaultdict(list)
+    for sample in samples:
+        by_route[sample[0]].append(sample)
+
+    report: Dict[str, Any] = {
+        "created_at": datetime.now().isoformat(),
+        "config": {
+            "base_url": base_url, "duration_s": duration_s, "users": len(workers), "admins": num_admins,
+            "think_time_s": think_time_s, "sync_at_s": sync_at_s, "seed": seed,
+            "dataset": {"artists": data["artist_count"], "festival_days": len(data["dates"])},
+        },
+        "elapsed_s": round(elapsed_s, 3),
+        "overall": summarize(samples, elapsed_s),
+        "routes": {route: summarize(by_route[route], elapsed_s) for route in sorted(by_route)},
+        "sync": sync_result,
+    }
+    if sync_result:
+        # Latency of the requests that started while the sync job was running
+        window_start = sync_result["started_at_s"]
+        window_end = window_start + sync_result["duration_s"]
+        during = [s for s in samples if window_start <= s[1] <= window_end]
+        report["during_sync"] = summarize(during, sync_result["duration_s"])
+    return report
+
+def print_report(report: Dict[str, Any]):
+    overall = report["overall"]
+    print(f"\nTotal: {overall['requests']} requests in {report['elapsed_s']:.1f}s "
+          f"({overall['throughput_rps']} req/s), error rate {overall['error_rate']:.2%}")
+    print(f"{'route':<32} {'reqs':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    rows = list(report["routes"].items())
+    if report.get("during_sync"):
+        rows.append(("(during sync)", report["during_sync"]))
+    for route, stats in rows:
+        print(f"{route:<32} {stats['requests']:>7} {stats['throughput_rps']:>8} {stats['p50_ms'] or 0:>9.1f} "
+              f"{stats['p95_ms'] or 0:>9.1f} {stats['p99_ms'] or 0:>9.1f} {stats['errors']:>7}")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Replay a weighted traffic mix against a running instance.")
+    arg_parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="URL of the running app")
+    arg_parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./data/synthetic.db"),
+                            help="Database the app is serving (used for test data and the mid-run sync)")
+    arg_parser.add_argument("--duration", type=float, default=60, help="Run time in seconds")
+    arg_parser.add_argument("--users", type=int, default=8, help="Number of concurrent virtual users")
+    arg_parser.add_argument("--admins", type=int, default=2, help="How many of the virtual users are admins")
+    arg_parser.add_argument("--password", default="smukfest", help="Password of the generated users")
+    arg_parser.add_argument("--think-time", type=float, default=0.0,
+                            help="Mean pause between requests per user in seconds (0 = closed loop)")
+    arg_parser.add_argument("--sync-at", type=float, help="Seconds into the run to fire the sync (default: halfway)")
+    arg_parser.add_argument("--no-sync", action="store_true", help="Don't run a sync job during the test")
+    arg_parser.add_argument("--sync-seed", type=int, default=2025,
+                            help="Seed for the synced lineup (use the generator's seed to keep slugs stable)")
+    arg_parser.add_argument("--seed", type=int, default=1, help="Random seed for the traffic mix")
+    arg_parser.add_argument("--json", help="Write the report to this JSON file (default: print to stdout)")
+    args = arg_parser.parse_args()
+
+    sync_at = None if args.no_sync else (args.sync_at if args.sync_at is not None else args.duration / 2)
+    report = run_load_test(
+        args.base_url, args.database_url, args.duration, args.users, min(args.admins, args.users),
+        args.password, sync_at, args.sync_seed, args.think_time, args.seed,
+    )
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-byte and peak memory of the streamed pages (`/`, `/admin/assessments`) against
+rendering the same context with a plain TemplateResponse.
+
+For each scale a synthetic database is generated and the measurements run in a fresh subprocess
+(like benchmark.py). Requests go straight through the ASGI app, middleware included, with
+`Accept-Encoding: identity`; the buffered variant is an extra route in that subprocess that
+builds the same context and returns `templates.TemplateResponse`. Reported per page and variant:
+  - TTFB: median time until the first body bytes are sent,
+  - total: median time until the last body bytes are sent,
+  - peak: peak traced Python memory during one request (tracemalloc, measured in a separate round),
+  - chunks and size of the body.
+
+Usage:
+    python scripts/measure_streaming.py                   # 1x, 10x and 100x festival size
+    python scripts/measure_streaming.py --scales 1 10 --rounds 5 --json streaming.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_ROUNDS = 7
+
+PAGES = {
+    "/": "/_measure/buffered/overview",
+    "/admin/assessments": "/_measure/buffered/admin-assessments",
+}
+
+# --- Measurements (run inside the per-scale subprocess) ---
+
+def add_buffered_routes(app, templates) -> None:
+    """The same pages rendered fully in memory, for comparison."""
+    from fastapi import Depends, Request
+    from app.main import get_db, get_admin_user, overview_context, admin_assessments_context
+    from app.auth import get_current_active_user
+
+    @app.get(PAGES["/"])
+    def buffered_overview(request: Request, db=Depends(get_db), user=Depends(get_current_active_user)):
+        return templates.TemplateResponse("index.html", overview_context(request, db, user))
+
+    @app.get(PAGES["/admin/assessments"])
+    def buffered_admin_assessments(request: Request, db=Depends(get_db), user=Depends(get_admin_user)):
+        return templates.TemplateResponse("admin_assessments.html", admin_assessments_context(request, db, user))
+
+async def fetch(app, path: str, cookie: str) -> Dict[str, Any]:
+    """One GET through the ASGI app, timing the first and last body bytes."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 50000), "server": ("measure", 80),
+        "headers": [(b"host", b"measure"), (b"cookie", cookie.encode()), (b"accept-encoding", b"identity")],
+    }
+    done = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    result = {"status": None, "ttfb_ms": None, "total_ms": None, "chunks": 0, "bytes": 0}
+    started = time.perf_counter()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            elapsed = (time.perf_counter() - started) * 1000
+            if result["ttfb_ms"] is None:
+                result["ttfb_ms"] = elapsed
+            result["total_ms"] = elapsed
+            result["chunks"] += 1
+            result["bytes"] += len(message["body"])
+
+    await app(scope, receive, send)
+    done.set()
+    assert result["status"] == 200, f"{path} returned {result['status']}"
+    return result
+
+def measure(rounds: int) -> List[Dict[str, Any]]:
+    os.environ.setdefault("SECRET_KEY", "measure-only-secret")
+    os.environ.setdefault("PRODUCTION_MODE", "false")
+    from app import crud
+    from app.auth import create_access_token, COOKIE_NAME
+    from app.database import SessionLocal
+    from app.main import app, templates
+
+    add_buffered_routes(app, templates)
+    with SessionLocal() as db:
+        admin = crud.get_user_by_username(db, "admin")
+        cookie = f"{COOKIE_NAME}={create_access_token({'sub': admin.username, 'role': admin.role.value})}"
+
+    async def run() -> List[Dict[str, Any]]:
+        results = []
+        for page, buffered_path in PAGES.items():
+            for variant, path in (("streamed", page), ("buffered", buffered_path)):
+                await fetch(app, path, cookie) # Warm-up (templates, indexes)
+                samples = [await fetch(app, path, cookie) for _ in range(rounds)]
+                tracemalloc.start()
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                await fetch(app, path, cookie)
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                tracemalloc.stop()
+                results.append({
+                    "page": page,
+                    "variant": variant,
+                    "rounds": rounds,
+                    "ttfb_ms": round(statistics.median(s["ttfb_ms"] for s in samples), 3),
+                    "total_ms": round(statistics.median(s["total_ms"] for s in samples), 3),
+                    "peak_kib": round(peak / 1024, 1),
+                    "chunks": samples[-1]["chunks"],
+                    "bytes": samples[-1]["bytes"],
+                })
+        return results
+
+    with contextlib.redirect_stdout(io.StringIO()): # The routes print on every request
+        return asyncio.run(run())
+
+# --- Driver ---
+
+def print_table(scale: float, results: List[Dict[str, Any]]) -> None:
+    print(f"\n=== Scale {scale:g}x ===")
+    print(f"{'page':<20} {'variant':<9} {'TTFB ms':>9} {'total ms':>9} {'peak KiB':>10} {'chunks':>7} {'KiB':>8}")
+    for r in results:
+        print(f"{r['page']:<20} {r['variant']:<9} {r['ttfb_ms']:>9.2f} {r['total_ms']:>9.2f} "
+              f"{r['peak_kib']:>10,.0f} {r['chunks']:>7} {r['bytes'] / 1024:>8,.0f}")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure TTFB and peak memory of the streamed pages.")
+    arg_parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES, help="Festival size multipliers")
+    arg_parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Timed requests per page and variant")
+    arg_parser.add_argument("--json", help="Write all results to this JSON file")
+    arg_parser.add_argument("--run-scale", action="store_true", help=argparse.SUPPRESS) # Internal: child process mode
+    args = arg_parser.parse_args()
+
+    if args.run_scale:
+        json.dump(measure(args.rounds), sys.stdout)
+        return
+
+    from scripts.generate_synthetic_data import generate
+
+    all_results: Dict[str, Any] = {"created_at": datetime.now().isoformat(), "scales": {}}
+    workdir = tempfile.mkdtemp(prefix="smukfest-streaming-")
+    for scale in args.scales:
+        db_path = os.path.join(workdir, f"streaming-{scale:g}x.db")
+        database_url = f"sqlite:///{db_path}"
+        print(f"Generating {scale:g}x dataset at {db_path}...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = generate(database_url, scale=scale, reset=True)
+
+        child_args = [sys.executable, os.path.abspath(__file__), "--run-scale", "--rounds", str(args.rounds)]
+        env = dict(os.environ, DATABASE_URL=database_url, SLOW_QUERY_THRESHOLD_MS="-1")
+        completed = subprocess.run(child_args, env=env, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr)
+            sys.exit(f"Measurement for scale {scale:g}x failed.")
+        results = json.loads(completed.stdout.strip().splitlines()[-1])
+        print_table(scale, results)
+        all_results["scales"][f"{scale:g}x"] = {"dataset": counts, "results": results}
+        os.remove(db_path)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(all_results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Import-time profile and startup budget for `app.main`.
+
+Imports the app in fresh interpreters with `python -X importtime`, reports the median import time
+(and how much of it is the framework libraries the app can't start without), the slowest modules,
+and fails when
+  - the median import of `app.main` exceeds the budget, or
+  - a module that must only be loaded on demand (scheduler, sync script, HTTP client, dateutil, NumPy,
+    Pillow, passlib) is imported at import time.
+
+Worker boot time matters for rolling restarts during the festival, so run this after changing
+imports in `app/`.
+
+Usage:
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --budget-ms 600 --rounds 10 --top 25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 1000
+DEFAULT_ROUNDS = 5
+
+# Modules that app.main must not import eagerly (they're loaded by the startup handler or on first use)
+LAZY_MODULES = [
+    "apscheduler",
+    "scripts.sync_artists_db",
+    "requests",
+    "dateutil",
+    "numpy",
+    "PIL",
+    "passlib",
+]
+
+# Libraries every request needs, so they're imported at startup; their import time is most of the total
+# and varies with the machine, the rest is the app's own modules and the lazy imports above
+FRAMEWORK_PACKAGES = ("fastapi", "starlette", "pydantic", "pydantic_core", "sqlalchemy", "jinja2", "jose")
+
+# Prints the loaded module names as JSON after importing the app, so lazy modules can be checked
+IMPORT_SNIPPET = "import sys, json; import app.main; print(json.dumps(sorted(sys.modules)))"
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Parses `-X importtime` output into (module, self_us, cumulative_us, depth) tuples."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def framework_us(rows: List[Tuple[str, int, int, int]]) -> int:
+    """Cumulative import time of the FRAMEWORK_PACKAGES modules not imported by one of them."""
+    total = 0
+    ancestors: List[Tuple[int, bool]] = [] # (depth, framework or inside one)
+    for name, _, cumulative_us, depth in reversed(rows): # importtime lists children before their parent
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+        inside = bool(ancestors) and ancestors[-1][1]
+        framework = name.split(".")[0] in FRAMEWORK_PACKAGES
+        if framework and not inside:
+            total += cumulative_us
+        ancestors.append((depth, framework or inside))
+    return total
+
+def profile_once() -> Tuple[List[Tuple[str, int, int, int]], List[str]]:
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "startup-profile")
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:") # The engine connects lazily; no file is needed
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        print(completed.stderr[-2000:])
+        sys.exit("Importing app.main failed.")
+    modules = json.loads(completed.stdout.strip().splitlines()[-1])
+    return parse_importtime(completed.stderr), modules
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Profile the import time of app.main against a budget.")
+    arg_parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                            help=f"Maximum median import time of app.main (default {DEFAULT_BUDGET_MS} ms)")
+    arg_parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Number of fresh interpreters")
+    arg_parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    args = arg_parser.parse_args()
+
+    totals_ms: List[float] = []
+    framework_ms: List[float] = []
+    last_rows: List[Tuple[str, int, int, int]] = []
+    loaded_modules: List[str] = []
+    for _ in range(args.rounds):
+        rows, loaded_modules = profile_once()
+        app_main = next(r for r in rows if r[0] == "app.main")
+        totals_ms.append(app_main[2] / 1000)
+        framework_ms.append(framework_us(rows) / 1000)
+        last_rows = rows
+
+    median_ms = statistics.median(totals_ms)
+    print(f"import app.main: median {median_ms:.1f} ms, min {min(totals_ms):.1f} ms over {args.rounds} rounds "
+          f"(budget {args.budget_ms:g} ms)")
+    print(f"  framework libraries ({', '.join(FRAMEWORK_PACKAGES)}): median {statistics.median(framework_ms):.1f} ms; "
+          f"the rest: median {statistics.median(t - f for t, f in zip(totals_ms, framework_ms)):.1f} ms")
+
+    # Slowest top-level imports of the app and its direct dependencies (by cumulative time)
+    print(f"\n{'module':<50} {'self ms':>9} {'cumul. ms':>10}")
+    for name, self_us, cumulative_us, _ in sorted(last_rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>10.1f}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"app.main imports in {median_ms:.1f} ms, over the {args.budget_ms:g} ms budget")
+    eager: Dict[str, List[str]] = {
+        lazy: [m for m in loaded_modules if m == lazy or m.startswith(lazy + ".")] for lazy in LAZY_MODULES
+    }
+    for lazy, found in eager.items():
+        if found:
+            failures.append(f"'{lazy}' is imported by app.main at import time; it should be loaded lazily")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("\nStartup is within budget and no lazy modules are imported eagerly.")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import json
 import sys
 import os
 from typing import List, Dict, Any, Tuple, Optional, Set
+from collections import Counter
 from datetime import datetime # Add datetime for timestamps
 from urllib.parse import urlparse # Import urlparse to handle the DATABASE_URL
 from dateutil import parser # Import dateutil parser
@@ -19,7 +20,14 @@ sys.path.append(PROJECT_ROOT)
 
 # Import necessary components from the app
 from app.database import SessionLocal, engine # Import session factory and engine
-from app.models import Base, Artist, Stage, Event # Import ORM models
+from app.models import Base, Artist, Stage, Event, RiskAssessment # Import ORM models
+from app import artist_search, schedule_index # In-memory indexes, invalidated after a sync
+from app import pubsub # Live updates to open pages
+from app import change_log # Change feed (/api/changes)
+from app import image_proxy, read_models # Artist images are fetched and resized after a sync
+from app import sync_runs # Run history (/admin/sync-runs)
+from app.sync_runs import SyncRunRecorder
+from app.utils import get_festival_day
 
 # --- Constants ---
 API_URL = "https://www.smukfest.dk/api/content?path=%2Fspilleplanen&simple=1&uid=mal85540"
@@ -40,22 +48,39 @@ else:
 print(f"Using database path: {DB_PATH}") # Add log to confirm path
 
 # --- API Fetching & Parsing ---
-def fetch_and_parse_api_data(url: str) -> Optional[Dict[str, Any]]:
-    """Fetches and parses the latest artist and schedule data from the Smukfest API."""
+def fetch_and_parse_api_data(url: str, run: Optional[SyncRunRecorder] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fetches and parses the latest artist and schedule data from the Smukfest API.
+    `run` gets the fetch and parse timings, the payload size and the API's counts (or the error).
+    """
+    run = run or SyncRunRecorder()
     print(f"Fetching latest data from {url}...")
     try:
+        run.begin("fetch")
         response = requests.get(url, timeout=30)
         response.raise_for_status()
+        run.payload_bytes = len(response.content)
         print("API data fetched successfully.")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching API data: {e}")
+        run.fail(f"Error fetching API data: {e}")
         return None
 
+    run.begin("parse")
+    parsed_data = parse_api_data(response, run)
+    run.end()
+    if parsed_data is not None:
+        run.count(api_artists=len(parsed_data["artists"]), api_events=len(parsed_data["schedule"]))
+    return parsed_data
+
+def parse_api_data(response: requests.Response, run: SyncRunRecorder) -> Optional[Dict[str, Any]]:
+    """The artists and schedule in an API response (see fetch_and_parse_api_data)."""
     try:
         raw_data = response.json()
         print("API JSON parsed successfully.")
     except json.JSONDecodeError as e:
         print(f"Error parsing API JSON: {e}")
+        run.fail(f"Error parsing API JSON: {e}")
         return None
 
     # --- Extract Content ---
@@ -63,8 +88,9 @@ def fetch_and_parse_api_data(url: str) -> Optional[Dict[str, Any]]:
         content = raw_data['data']['content']
         raw_artists = content.get('_artists', [])
         print(f"Found {len(raw_artists)} artist entries in API data. (Note: Stages/Schedule seem embedded)")
-    except (KeyError, TypeError) as e:
+    except (KeyError, TypeError, AttributeError) as e:
         print(f"Error accessing core content ('data.content'): {e}")
+        run.fail(f"Error accessing core content ('data.content'): {e}")
         return None
 
     # --- Process Artists and Generate Events Simultaneously ---
@@ -159,8 +185,16 @@ def fetch_and_parse_api_data(url: str) -> Optional[Dict[str, Any]]:
 
 # Removed setup_database function as Base.metadata.create_all handles it
 
-def sync_database(db: Session, parsed_data: Dict[str, Any]):
-    """Syncs the database with the parsed artist and schedule data using SQLAlchemy ORM."""
+MAX_SUMMARY_SLUGS = 50 # Changed artists listed by name in the sync summary
+
+def sync_database(db: Session, parsed_data: Dict[str, Any], run: Optional[SyncRunRecorder] = None) -> Optional[Dict[str, Any]]:
+    """
+    Syncs the database with the parsed artist and schedule data using SQLAlchemy ORM.
+    Returns a summary of what changed (see summarize_changes), or None if nothing was synced.
+    `run` gets the timings and row counts of the artist, stage and event phases; its "commit"
+    phase starts with the change log and is ended by the caller.
+    """
+    run = run or SyncRunRecorder()
 
     artists_to_sync = parsed_data.get("artists")
     schedule_to_sync = parsed_data.get("schedule")
@@ -168,16 +202,26 @@ def sync_database(db: Session, parsed_data: Dict[str, Any]):
 
     if not artists_to_sync or api_artist_slugs is None:
         print("Warning: Artist list or set of API slugs is missing from parsed data. Cannot sync artists.")
-        return # Exit if essential artist data is missing
+        run.fail("Artist list or set of API slugs is missing from parsed data")
+        return None # Exit if essential artist data is missing
+
+    run.begin("artists")
+    # Schedule before the sync (also before stale artists lose their events), for the summary
+    events_before = Counter(db.execute(select(Event.artist_slug, Event.stage_id, Event.start_time, Event.end_time)).all())
 
     # --- Sync Artists ---
     print(f"Syncing {len(artists_to_sync)} artists...")
     inserted_artists = 0
     updated_artists = 0
 
-    # Fetch existing artists into a dictionary {slug: id} for quick lookup
-    existing_artists_query = db.execute(select(Artist.slug, Artist.id))
-    existing_artists_map = {slug: id for slug, id in existing_artists_query}
+    # Fetch existing artists into a dictionary {slug: id} for quick lookup, plus the logged fields to spot real changes
+    existing_artists_query = db.execute(select(Artist.slug, Artist.id, *[getattr(Artist, f) for f in change_log.ARTIST_FIELDS]))
+    existing_artists_map = {}
+    existing_artist_fields = {}
+    for row in existing_artists_query:
+        existing_artists_map[row.slug] = row.id
+        existing_artist_fields[row.slug] = change_log.fields_data(row, change_log.ARTIST_FIELDS)
+    logged_changes = [] # (entity, key, operation, data) for the change log
     print(f"Found {len(existing_artists_map)} existing artists in DB.")
 
     artists_to_insert = []
@@ -202,6 +246,9 @@ def sync_database(db: Session, parsed_data: Dict[str, Any]):
             update_data['id'] = existing_artists_map[slug] # Add the id for matching
             artists_to_update.append(update_data)
             updated_artists += 1
+            logged_fields = change_log.fields_data(artist_fields, change_log.ARTIST_FIELDS)
+            if logged_fields != existing_artist_fields[slug]:
+                logged_changes.append(('artist', slug, 'upsert', logged_fields))
         else:
             # Prepare for bulk insert: add slug and created_at
             insert_data = artist_fields.copy()
@@ -209,6 +256,7 @@ def sync_database(db: Session, parsed_data: Dict[str, Any]):
             insert_data['created_at'] = now # Set created_at only for new artists
             artists_to_insert.append(insert_data)
             inserted_artists += 1
+            logged_changes.append(('artist', slug, 'upsert', change_log.fields_data(artist_fields, change_log.ARTIST_FIELDS)))
 
     # Perform bulk operations
     if artists_to_insert:
@@ -225,15 +273,29 @@ def sync_database(db: Session, parsed_data: Dict[str, Any]):
 
     # --- Delete Stale Artists (artists in DB but not in API) ---
     stale_slugs = set(existing_artists_map.keys()) - api_artist_slugs
+    deleted_slugs = set()
     if stale_slugs:
-        print(f"Found {len(stale_slugs)} stale artists to delete: {stale_slugs}")
-        delete_stmt = delete(Artist).where(Artist.slug.in_(stale_slugs))
-        result = db.execute(delete_stmt)
-        print(f"Deleted {result.rowcount} stale artists.")
+        print(f"Found {len(stale_slugs)} stale artists: {stale_slugs}")
+        # Their sets are off the programme, and the events.artist_slug foreign key would reject the delete otherwise
+        db.execute(delete(Event).where(Event.artist_slug.in_(stale_slugs)))
+        # An artist with a risk assessment is kept (the foreign key restricts the delete): assessments
+        # can't be re-synced, and an artist missing from one API response is often back in the next
+        assessed_slugs = set(db.execute(select(RiskAssessment.artist_slug).where(RiskAssessment.artist_slug.in_(stale_slugs))).scalars())
+        if assessed_slugs:
+            print(f"Keeping {len(assessed_slugs)} stale artists with a risk assessment: {assessed_slugs}")
+        deleted_slugs = stale_slugs - assessed_slugs
+        logged_changes += [('artist', slug, 'delete', None) for slug in sorted(deleted_slugs)]
+        if deleted_slugs:
+            delete_stmt = delete(Artist).where(Artist.slug.in_(deleted_slugs))
+            result = db.execute(delete_stmt)
+            print(f"Deleted {result.rowcount} stale artists.")
     else:
         print("No stale artists found to delete.")
 
+    run.count(artists_inserted=inserted_artists, artists_updated=updated_artists, artists_deleted=len(deleted_slugs))
+
     # --- Sync Stages ---
+    run.begin("stages")
     print("Syncing stages...")
     # Get unique stage names from the schedule, defaulting to 'TBA'
     api_stage_names = {event.get('stage_name', 'TBA') for event in schedule_to_sync}
@@ -260,7 +322,12 @@ def sync_database(db: Session, parsed_data: Dict[str, Any]):
     else:
         print("No new stages to insert.")
 
+    run.count(stages_inserted=len(stages_to_insert))
+
     # --- Sync Events ---
+    run.begin("events")
+    run.count(events_deleted=0, events_inserted=0, events_skipped=0)
+    events_after = Counter({event: count for event, count in events_before.items() if event[0] not in stale_slugs})
     if not schedule_to_sync:
         print("Warning: Event schedule list is missing or empty. Cannot sync events.")
     else:
@@ -318,25 +385,123 @@ def sync_database(db: Session, parsed_data: Dict[str, Any]):
             db.bulk_insert_mappings(Event, events_to_insert)
             print("Bulk insert events finished.")
         print(f"Event insertion complete. Inserted: {len(events_to_insert)}, Skipped: {skipped_events}, Parse Errors: {parse_errors}")
+        run.count(events_deleted=deleted_rows.rowcount, events_inserted=len(events_to_insert),
+                  events_skipped=skipped_events + parse_errors)
+        events_after = Counter(
+            (e['artist_slug'], e['stage_id'], e['start_time'], e['end_time']) for e in events_to_insert
+        )
+
+    # --- Change Log ---
+    run.begin("commit")
+    # Events are compared as (artist, stage, start, end), since a sync recreates every event row
+    events_added = events_after - events_before
+    events_removed = events_before - events_after
+    stage_names = {stage_id: name for name, stage_id in stages_map.items()}
+    added_keys = {change_log.event_key(slug, start) for slug, _, start, _ in events_added}
+    logged_changes += [
+        ('event', key, 'delete', None)
+        for key in sorted({change_log.event_key(slug, start) for slug, _, start, _ in events_removed} - added_keys)
+    ]
+    logged_changes += [
+        ('event', change_log.event_key(slug, start), 'upsert', change_log.event_data(slug, stage_names.get(stage_id), start, end))
+        for slug, stage_id, start, end in sorted(events_added, key=lambda e: (e[2], e[0]))
+    ]
+    change_log.record_many(db, logged_changes)
+    print(f"Logged {len(logged_changes)} changes.")
+    run.count(changes_logged=len(logged_changes))
+
+    return summarize_changes(artists_to_insert, deleted_slugs, events_added, events_removed)
+
+def summarize_changes(artists_inserted: List[Dict[str, Any]], deleted_slugs: Set[str],
+                      events_added: Counter, events_removed: Counter) -> Dict[str, Any]:
+    """
+    What a sync changed, compact enough to broadcast: artist and event counts, the changed artists
+    (added, removed, or with a moved/added/removed set; at most MAX_SUMMARY_SLUGS) and the festival
+    days whose schedule changed.
+    """
+    changed_events = list(events_added) + list(events_removed)
+    changed_slugs = sorted(
+        {a['slug'] for a in artists_inserted} | set(deleted_slugs) | {slug for slug, _, _, _ in changed_events if slug}
+    )
+    return {
+        "artists_added": len(artists_inserted),
+        "artists_removed": len(deleted_slugs),
+        "events_added": sum(events_added.values()),
+        "events_removed": sum(events_removed.values()),
+        "changed_artists": changed_slugs[:MAX_SUMMARY_SLUGS],
+        "changed_artists_total": len(changed_slugs),
+        "changed_days": sorted({get_festival_day(start).strftime("%Y-%m-%d") for _, _, start, _ in changed_events}),
+    }
+
+# --- Image Prewarming ---
+
+def prewarm_images():
+    """Fetches and resizes new artist images for the /img proxy, so the pages don't wait for the CDN."""
+    try:
+        with SessionLocal() as db:
+            image_urls = read_models.get_image_urls(db)
+        result = image_proxy.prewarm(image_urls)
+        print(f"Artist images: {result['images']} in use, {result['warmed']} fetched or resized, "
+              f"{result['failed']} failed, {result['removed']} unused removed.")
+    except Exception as e:
+        # The proxy fetches missing images on demand, so the sync itself still succeeded
+        print(f"Error while prewarming artist images: {e}")
+        logging.error(f"Error while prewarming artist images: {e}", exc_info=True)
 
 # --- Main Execution Logic ---
 
-def run_sync(): # Renamed from main
-    """Fetches data, parses it, and syncs it with the database."""
-    parsed_data = fetch_and_parse_api_data(API_URL)
+def save_run(run: SyncRunRecorder):
+    """Writes the run to the sync history (own session); a failure here never fails the sync."""
+    try:
+        with SessionLocal() as db:
+            sync_runs.save(db, run)
+    except Exception as e:
+        print(f"Error while recording the sync run: {e}")
+        logging.error(f"Error while recording the sync run: {e}", exc_info=True)
+
+def run_sync(trigger: str = "manual"): # Renamed from main
+    """Fetches data, parses it, and syncs it with the database. Every run is recorded in sync_runs."""
+    run = SyncRunRecorder(trigger)
+    save_run(run) # As "running", so a run that dies halfway still shows up
+    try:
+        sync(run)
+    except Exception as e:
+        run.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        run.finish()
+        save_run(run)
+        print(f"Sync run {run.status} in {run.total_ms:.0f} ms "
+              f"({', '.join(f'{name} {ms:.0f} ms' for name, ms in run.timings.items())}).")
+
+def sync(run: SyncRunRecorder):
+    parsed_data = fetch_and_parse_api_data(API_URL, run)
 
     if parsed_data:
         try:
             # Use a session context manager
             with SessionLocal() as db:
-                sync_database(db, parsed_data)
+                summary = sync_database(db, parsed_data, run)
                 db.commit() # Commit the transaction
+                removed = change_log.compact(db) # Keeps the change log bounded (own transaction)
+                if removed:
+                    print(f"Compacted the change log: removed {removed} superseded entries.")
+            run.end()
+            # Rebuild the in-memory indexes from the new artists and schedule on their next use
+            artist_search.invalidate()
+            schedule_index.invalidate()
+            if summary is not None:
+                print(f"Sync changes: {summary}")
+                pubsub.publish("sync", summary) # Open pages refresh their data if something changed
             print("Database sync completed successfully.")
             logging.info("Database sync completed successfully.")
+            run.begin("images")
+            prewarm_images()
         except Exception as e:
             # Session automatically rolls back on exception with context manager
             print(f"Error during database sync: {e}")
             logging.error(f"Error during database sync: {e}", exc_info=True)
+            run.fail(f"Error during database sync: {e}")
             # Re-raise the exception if needed, or handle appropriately
             # raise # Uncomment if the caller needs to know about the failure
     else:
@@ -43,7 +43,9 @@ docker run --rm \
         echo "--- (Inside Container) Initializing database (migrations & seeding) ---" && \
         python scripts/initialize_database.py && \
         echo "--- (Inside Container) Syncing artists/events ---" && \
-        python scripts/sync_artists_db.py \
+        python scripts/sync_artists_db.py && \
+        echo "--- (Inside Container) Building static files ---" && \
+        python scripts/build_static.py --quiet \
     '
     # Check exit code of the docker run command
     # The 'set -e' above should handle this, but explicit checking can be added if needed.